@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from django.db import IntegrityError, transaction
+from rest_framework.authtoken.models import Token
 from auth_app.models import User
-from django.contrib.auth import authenticate
+from auth_app.hashers import verify_password
 from profile_app.models import Profile
 
 
@@ -35,10 +37,9 @@ class RegistrationSerializer(serializers.ModelSerializer):
 
     Purpose:
         - Handles creating a new user account.
-        - Validates email uniqueness.
         - Ensures passwords match.
         - Assigns user type (customer or business).
-        - Automatically creates a related Profile object.
+        - Automatically creates a related Profile object and auth token.
 
     Fields:
         - username: Desired username
@@ -49,13 +50,18 @@ class RegistrationSerializer(serializers.ModelSerializer):
         - type: Type of user ('customer' or 'business', write-only)
 
     Validation:
-        - validate_email: Ensures email is unique.
         - validate_type: Ensures valid user type is selected.
         - validate: Ensures password and repeated_password match.
+        - Username and email uniqueness are enforced by the database
+          constraints; a violation is reported as a ValidationError on the
+          offending field.
 
     Behavior:
+        - User, profile and token are inserted in one transaction, without
+          pre-check queries.
         - On creation, splits username into first_name and last_name for Profile.
         - Sets the password securely using set_password.
+        - The token is available as `user.auth_token` afterwards.
     """
 
     user_id = serializers.IntegerField(read_only=True) 
@@ -64,12 +70,9 @@ class RegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'email', 'password', 'repeated_password', 'user_id', 'type']
+        extra_kwargs = {'username': {'validators': []}, 'email': {'validators': []}}
+        validators = []
 
-    def validate_email(self, value):
-            if User.objects.filter(email=value).exists():
-                raise serializers.ValidationError("Email is already in use.")
-            return value
-    
     def validate_type(self, value):
             if not value:
                     raise serializers.ValidationError("User type is required.")
@@ -82,26 +85,34 @@ class RegistrationSerializer(serializers.ModelSerializer):
             if data['password'] != data['repeated_password']:
                 raise serializers.ValidationError({'password': 'Passwords do not match'})
             return data
-        
-    def create(self, validated_data):
-            usernameForProfile = validated_data['username'],
-            names = usernameForProfile[0].split(' ')
-            firstname = names[0]
-            if len(names) >= 2:
-                 lastname = names[1]
-            else: 
-                 lastname = ""
 
+    @staticmethod
+    def profile_names(username):
+            names = username.split(' ')
+            return names[0], names[1] if len(names) >= 2 else ""
 
+    def create(self, validated_data):
+            firstname, lastname = self.profile_names(validated_data['username'])
             user = User(
             username=validated_data['username'],
-            email=validated_data['email'],
+            email=validated_data.get('email', ''),
             type=validated_data['type']
             )
             user.set_password(validated_data['password']) 
-            user.save()
-            Profile.objects.create(user=user, first_name=firstname, last_name=lastname  )
-            
+            try:
+                with transaction.atomic():
+                    user.save()
+                    Profile.objects.create(user=user, first_name=firstname, last_name=lastname)
+                    Token.objects.create(user=user)
+            except IntegrityError as exc:
+                # PostgreSQL names the constraint, SQLite the column.
+                message = str(exc)
+                table = User._meta.db_table
+                if 'unique_user_email' in message or f'{table}.email' in message:
+                    raise serializers.ValidationError({'email': ['Email is already in use.']})
+                if f'{table}_username_key' in message or f'{table}.username' in message:
+                    raise serializers.ValidationError({'username': ['A user with that username already exists.']})
+                raise
             return user
     
 
@@ -118,23 +129,17 @@ class LoginSerializer(serializers.Serializer):
         - password: Password (write-only)
 
     Validation:
-        - Checks that the username exists.
-        - Authenticates credentials using Django's `authenticate`.
-        - Raises ValidationError if credentials are invalid.
+        - Loads the user with a single query.
+        - Verifies the password on the password hashing pool
+          (auth_app.hashers), upgrading outdated hashes on success.
+        - Raises ValidationError if credentials are invalid or the user is inactive.
     """
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
 
     def validate(self, data):
-        username = data.get('username')
-        password = data.get('password')
-
-        user_obj = User.objects.filter(username=username).first()
-        if not user_obj:
-            raise serializers.ValidationError("Invalid credentials")
-
-        user = authenticate(username=user_obj.username, password=password)
-        if not user:
+        user = User.objects.filter(username=data.get('username')).first()
+        if not verify_password(user, data.get('password')):
             raise serializers.ValidationError("Invalid credentials")
         data['user'] = user
-        return data
\ No newline at end of file
+        return data
@@ -1,8 +1,17 @@
+import json
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.exceptions import Throttled
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework import generics, status
 from auth_app.api.seralizers import RegistrationSerializer, LoginSerializer
+from auth_app.authentication import prime_token_cache
+from auth_app.hashers import averify_password
+from auth_app.models import User
 
 class RegistrationView(generics.CreateAPIView):
     """
@@ -15,8 +24,8 @@ class RegistrationView(generics.CreateAPIView):
 
     Behavior:
         - Validates the request data using the serializer.
-        - Saves the user to the database.
-        - Creates or retrieves a token for the user.
+        - Saves the user, profile and token in one transaction.
+        - Primes the token authentication cache with the new token.
         - Returns user details along with the token in the response.
 
     Response Fields:
@@ -35,7 +44,8 @@ class RegistrationView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        token, created = Token.objects.get_or_create(user=user)
+        token = user.auth_token
+        prime_token_cache(token, user)
         return Response({
             'user_id': user.id,
             'username': user.username,
@@ -57,7 +67,8 @@ class LoginView(ObtainAuthToken):
     Behavior:
         - Validates the request data using the serializer.
         - Authenticates the user.
-        - Creates or retrieves a token for the user.
+        - Creates or retrieves a token for the user and primes the token
+          authentication cache with it.
         - Returns user details along with the token in the response.
 
     Response Fields:
@@ -76,9 +87,61 @@ class LoginView(ObtainAuthToken):
           serializer.is_valid(raise_exception=True)
           user = serializer.validated_data['user']
           token, created = Token.objects.get_or_create(user=user)
+          prime_token_cache(token, user)
           return Response({
               'user_id': user.id,
               'username': user.username,
               'email': user.email,
               'token': token.key
-          })
\ No newline at end of file
+          })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    """
+    Async-native variant of LoginView for ASGI deployments.
+
+    Purpose:
+        - Same request and response format as LoginView.
+        - Under ASGI, sync DRF views share one thread per event loop, so a
+          burst of logins serializes behind each other's password hashing.
+          This view awaits the user lookup, the hashing pool and the token
+          query instead, keeping the event loop free.
+
+    Behavior:
+        - Accepts JSON or form-encoded username and password.
+        - 400 on missing fields or invalid credentials, 429 when the
+          password hashing pool is saturated.
+
+    HTTP Methods:
+        - POST: Authenticate the user and return their token.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return JsonResponse({'detail': 'JSON parse error'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            data = request.POST
+        errors = {field: ['This field is required.'] for field in ('username', 'password') if not data.get(field)}
+        if errors:
+            return JsonResponse(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await User.objects.filter(username=data['username']).afirst()
+        try:
+            valid = await averify_password(user, data['password'])
+        except Throttled as exc:
+            return JsonResponse({'detail': str(exc.detail)}, status=exc.status_code)
+        if not valid:
+            return JsonResponse({'non_field_errors': ['Invalid credentials']}, status=status.HTTP_400_BAD_REQUEST)
+
+        token, created = await Token.objects.aget_or_create(user=user)
+        prime_token_cache(token, user)
+        return JsonResponse({
+            'user_id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'token': token.key
+        })
@@ -0,0 +1,216 @@
+"""
+Token authentication with a two-tier cache in front of the authtoken table.
+
+DRF's TokenAuthentication runs a Token + User join on every request. The
+CachingTokenAuthentication class keeps resolved tokens in:
+
+    - a per-process LRU (AUTH_TOKEN_CACHE_SIZE entries, AUTH_TOKEN_LOCAL_TTL
+      seconds), which answers repeat requests without any I/O, and
+    - optionally a shared Django cache (AUTH_TOKEN_CACHE_ALIAS, entries live
+      AUTH_TOKEN_SHARED_TTL seconds), so a token resolved by one process is
+      known to the others.
+
+Entries are dropped when their token is deleted or their user is saved or
+deleted (see auth_app.signals). Other processes only see that for the shared
+tier, so the local TTL is kept short: it is the longest a revoked token can
+still be accepted by a process that did not make the change.
+
+Cache keys are derived from a SHA-256 of the token, never the token itself,
+and users are stored in the shared tier without their password hash.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _token_cache_key(key):
+    return 'auth_token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def _user_cache_key(user_id):
+    return f'auth_token_user:{user_id}'
+
+
+class LocalTokenCache:
+    """Thread-safe LRU of token key -> (user, token, expires_at)."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.keys_by_user = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                self._discard(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, user, token):
+        expires_at = time.monotonic() + _setting('AUTH_TOKEN_LOCAL_TTL', 30)
+        with self.lock:
+            self._discard(key)
+            self.entries[key] = (user, token, expires_at)
+            self.keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self.entries) > _setting('AUTH_TOKEN_CACHE_SIZE', 10000):
+                self._discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        with self.lock:
+            self._discard(key)
+
+    def discard_user(self, user_id):
+        with self.lock:
+            for key in list(self.keys_by_user.get(user_id, ())):
+                self._discard(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_user.clear()
+
+    def _discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self.keys_by_user.get(entry[0].pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_user[entry[0].pk]
+
+
+local_token_cache = LocalTokenCache()
+
+
+def _shared_cache():
+    alias = _setting('AUTH_TOKEN_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def _shared_entries(token, user):
+    """
+    Cache entries for the shared tier. The password hash never leaves the
+    process: the user is stored with that field deferred (Django loads it
+    from the database if a request needs it, and save() leaves it alone),
+    and the token carries that same user instead of its own cached row.
+    """
+    user = copy.copy(user)
+    user.__dict__.pop('password', None)
+    token = copy.copy(token)
+    token.user = user
+    return {
+        _token_cache_key(token.key): (user, token),
+        _user_cache_key(user.pk): token.key,
+    }
+
+
+def prime_token_cache(token, user=None):
+    """Store a token (and its user) in both cache tiers."""
+    user = user or token.user
+    local_token_cache.set(token.key, user, token)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.set_many(_shared_entries(token, user), _setting('AUTH_TOKEN_SHARED_TTL', 60))
+
+
+def invalidate_token(key):
+    """Forget a single token in both tiers."""
+    local_token_cache.discard(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(_token_cache_key(key))
+
+
+def invalidate_user_tokens(user_id):
+    """Forget every cached token that belongs to `user_id`."""
+    local_token_cache.discard_user(user_id)
+    shared = _shared_cache()
+    if shared is not None:
+        key = shared.get(_user_cache_key(user_id))
+        if key is not None:
+            shared.delete_many([_token_cache_key(key), _user_cache_key(user_id)])
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication backed by the token cache.
+
+    Behavior:
+        - Local LRU hit: no I/O at all.
+        - Shared cache hit: one cache round trip, then primes the local LRU.
+        - Miss: the usual Token + User query, then primes both tiers.
+        - Inactive users and unknown tokens are rejected exactly like
+          TokenAuthentication and are never cached.
+
+    Each request receives its own copy of the cached user, so attributes
+    set on request.user during a request do not leak into later ones.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = local_token_cache.get(key)
+        if cached is None:
+            shared = _shared_cache()
+            cached = shared.get(_token_cache_key(key)) if shared is not None else None
+            if cached is not None:
+                local_token_cache.set(key, *cached)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            prime_token_cache(token, user)
+            cached = (user, token)
+        user, token = cached
+        return copy.copy(user), token
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of authenticate() for plain Django async views.
+
+        Uses the same cache tiers; a miss is resolved with the async ORM.
+        Returns (user, token), or None when no token header was sent.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain invalid characters.'))
+
+        cached = local_token_cache.get(key)
+        if cached is None:
+            shared = _shared_cache()
+            cached = await shared.aget(_token_cache_key(key)) if shared is not None else None
+            if cached is not None:
+                local_token_cache.set(key, *cached)
+        if cached is None:
+            try:
+                token = await Token.objects.select_related('user').aget(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+            local_token_cache.set(key, token.user, token)
+            shared = _shared_cache()
+            if shared is not None:
+                await shared.aset_many(_shared_entries(token, token.user), _setting('AUTH_TOKEN_SHARED_TTL', 60))
+            cached = (token.user, token)
+        user, token = cached
+        return copy.copy(user), token
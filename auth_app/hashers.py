@@ -0,0 +1,92 @@
+"""
+Password hashing helpers for the login path.
+
+TunablePBKDF2PasswordHasher:
+    Django's PBKDF2-SHA256 hasher with the iteration count taken from the
+    PASSWORD_PBKDF2_ITERATIONS setting. It keeps the `pbkdf2_sha256`
+    algorithm name, so existing hashes stay valid. When the setting changes,
+    `must_update` reports stored hashes with a different count, and they are
+    re-hashed on the user's next successful login.
+
+Verification pool:
+    PBKDF2 spends its time in hashlib, which releases the GIL. Running
+    verifications on a dedicated thread pool (PASSWORD_HASH_WORKERS threads,
+    one per core by default) caps the CPU spent on hashing and keeps it off
+    the request thread and the ASGI event loop. At most
+    PASSWORD_HASH_MAX_PENDING verifications may be queued or running; beyond
+    that, logins are rejected with 429 instead of piling up.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from rest_framework.exceptions import Throttled
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the iteration count read from settings."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None
+
+
+def _pool():
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+                _slots = threading.BoundedSemaphore(getattr(settings, 'PASSWORD_HASH_MAX_PENDING', workers * 16))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+    return _executor
+
+
+def _check(encoded, password):
+    """Runs on the pool: verify, and compute the upgraded hash if one is due."""
+    if encoded is None:
+        # Hash anyway so unknown usernames take as long as wrong passwords.
+        make_password(password)
+        return False, None
+    outdated = []
+    is_correct = check_password(password, encoded, setter=outdated.append)
+    return is_correct, make_password(password) if outdated else None
+
+
+def _submit(user, password):
+    pool = _pool()
+    if not _slots.acquire(blocking=False):
+        raise Throttled(detail='Too many login attempts in progress, please retry.')
+    future = pool.submit(_check, user.password if user is not None else None, password)
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def verify_password(user, password):
+    """
+    Check `password` for `user` (may be None) on the hashing pool.
+
+    Saves the upgraded hash on the calling thread when the stored one uses
+    outdated parameters. Returns False for inactive users.
+    """
+    is_correct, upgraded = _submit(user, password).result()
+    if upgraded is not None:
+        user.password = upgraded
+        user.save(update_fields=['password'])
+    return is_correct and user.is_active
+
+
+async def averify_password(user, password):
+    """Async variant of verify_password; awaits without blocking the event loop."""
+    is_correct, upgraded = await asyncio.wrap_future(_submit(user, password))
+    if upgraded is not None:
+        user.password = upgraded
+        await user.asave(update_fields=['password'])
+    return is_correct and user.is_active
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from auth_app.api.seralizers import LoginSerializer
+from auth_app.models import User
+
+PREFIX = 'bench_login_'
+PASSWORD = 'benchmark-password'
+
+
+def legacy_login(username, password):
+    """The previous LoginSerializer path: lookup, then authenticate (second lookup, hash on the caller)."""
+    user = User.objects.filter(username=username).first()
+    return user is not None and authenticate(username=user.username, password=password) is not None
+
+
+def pooled_login(username, password):
+    return LoginSerializer(data={'username': username, 'password': password}).is_valid()
+
+
+class Command(BaseCommand):
+    """
+    Benchmark login throughput in logins per second per core.
+
+    Purpose:
+        - Runs concurrent logins for a set of benchmark users through the
+          previous authenticate()-based path and through LoginSerializer
+          (single lookup, hashing pool), and prints logins/s and
+          logins/s/core for each.
+
+    Behavior:
+        - The benchmark users must be visible to the client threads, so
+          unlike the other benchmarks they cannot be rolled back: they are
+          committed and deleted again when the command finishes. The
+          command therefore only runs with DEBUG on, and refuses to start
+          if users named like the benchmark users already exist instead of
+          touching them.
+        - --iterations overrides PASSWORD_PBKDF2_ITERATIONS for the run, to
+          measure the cost of a different hashing work factor.
+    """
+    help = 'Measure login throughput (logins per second per core) of the old and the pooled login path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--logins', type=int, default=200, help='Logins per path.')
+        parser.add_argument('--threads', type=int, default=os.cpu_count() * 2, help='Concurrent clients.')
+        parser.add_argument('--iterations', type=int, default=None, help='PBKDF2 iterations for this run.')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG:
+            raise CommandError('benchmark_logins writes users to the database and only runs with DEBUG on.')
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError(f'Users named {PREFIX}* already exist; remove them or use another database.')
+        overrides = {}
+        if options['iterations']:
+            overrides['PASSWORD_PBKDF2_ITERATIONS'] = options['iterations']
+        with override_settings(**overrides):
+            self.run(options)
+
+    def run(self, options):
+        cores = os.cpu_count() or 1
+        password = make_password(PASSWORD)
+        usernames = [f'{PREFIX}{i}' for i in range(options['users'])]
+        User.objects.bulk_create([User(username=username, password=password) for username in usernames])
+        try:
+            self.stdout.write(f'{cores} cores, {options["threads"]} client threads, {options["logins"]} logins per path')
+            for name, login in (('authenticate', legacy_login), ('pooled', pooled_login)):
+                rate = self.measure(login, options)
+                self.stdout.write(f'{name:<14} {rate:>9.1f} logins/s {rate / cores:>9.1f} logins/s/core')
+        finally:
+            User.objects.filter(username__in=usernames).delete()
+
+    def measure(self, login, options):
+        total, users = options['logins'], options['users']
+        counter = iter(range(total))
+        lock = threading.Lock()
+        failures = []
+
+        def client():
+            try:
+                while True:
+                    with lock:
+                        i = next(counter, None)
+                    if i is None:
+                        return
+                    if not login(f'{PREFIX}{i % users}', PASSWORD):
+                        failures.append(i)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=client) for _ in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if failures:
+            self.stderr.write(f'{len(failures)} logins failed')
+        return total / elapsed
@@ -0,0 +1,140 @@
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from auth_app.api.seralizers import RegistrationSerializer
+from auth_app.models import User
+from coder_app.stats import invalidate_platform_stats
+from profile_app.models import Profile
+
+
+def _hash_password(value):
+    """Keep values that already are Django password hashes, hash the rest."""
+    if not value:
+        return make_password(None)
+    try:
+        identify_hasher(value)
+        return value
+    except ValueError:
+        return make_password(value)
+
+
+class Command(BaseCommand):
+    """
+    Bulk import user accounts from a CSV file.
+
+    Purpose:
+        - Migrates an existing account base (hundreds of thousands of rows)
+          in a fraction of the time one registration per account would take.
+
+    CSV columns:
+        - username (required), email, type ('customer' or 'business',
+          defaults to customer), password, first_name, last_name.
+        - password may be a Django password hash (kept as is), a raw
+          password (hashed on --workers processes) or empty (unusable
+          password, so the user has to reset it).
+        - first_name/last_name default to the split username, like
+          registration does.
+
+    Behavior:
+        - Rows are imported in batches of --batch-size. Each batch costs one
+          lookup for already taken usernames and emails, one bulk insert for
+          users and one for profiles, all in a single transaction.
+        - Rows whose username or email is already taken (in the database or
+          earlier in the file) or whose type is invalid are skipped and
+          reported.
+        - Tokens are not created; login creates them on first use.
+        - bulk_create sends no signals, so the cached platform statistics
+          are invalidated once at the end.
+    """
+    help = 'Bulk import users (with profiles) from a CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=1, help='Processes used to hash raw passwords.')
+
+    def handle(self, *args, **options):
+        try:
+            source = open(options['csv_file'], newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(exc)
+
+        self.imported, self.skipped = 0, []
+        self.seen_usernames, self.seen_emails = set(), set()
+        executor = ProcessPoolExecutor(options['workers']) if options['workers'] > 1 else None
+        with source:
+            reader = csv.DictReader(source)
+            if 'username' not in (reader.fieldnames or []):
+                raise CommandError('The CSV file needs a username column.')
+            batch = []
+            for line, row in enumerate(reader, start=2):
+                batch.append((line, row))
+                if len(batch) >= options['batch_size']:
+                    self.import_batch(batch, executor)
+                    batch = []
+            if batch:
+                self.import_batch(batch, executor)
+        if executor is not None:
+            executor.shutdown()
+
+        invalidate_platform_stats()
+
+        for line, reason in self.skipped[:50]:
+            self.stderr.write(f'line {line}: {reason}')
+        if len(self.skipped) > 50:
+            self.stderr.write(f'... and {len(self.skipped) - 50} more')
+        self.stdout.write(self.style.SUCCESS(f'Imported {self.imported} users, skipped {len(self.skipped)}.'))
+
+    def import_batch(self, batch, executor):
+        rows = []
+        for line, row in batch:
+            username = (row.get('username') or '').strip()
+            email = (row.get('email') or '').strip()
+            user_type = (row.get('type') or User.UserType.customer).strip()
+            if not username:
+                self.skipped.append((line, 'missing username'))
+            elif user_type not in User.UserType.values:
+                self.skipped.append((line, f'invalid type {user_type!r}'))
+            elif username in self.seen_usernames:
+                self.skipped.append((line, f'duplicate username {username!r}'))
+            elif email and email in self.seen_emails:
+                self.skipped.append((line, f'duplicate email {email!r}'))
+            else:
+                self.seen_usernames.add(username)
+                if email:
+                    self.seen_emails.add(email)
+                rows.append((line, username, email, user_type, row))
+
+        taken_usernames = set(User.objects.filter(username__in=[r[1] for r in rows]).values_list('username', flat=True))
+        taken_emails = set(User.objects.filter(email__in=[r[2] for r in rows if r[2]]).values_list('email', flat=True))
+        accepted = []
+        for entry in rows:
+            line, username, email, _, _ = entry
+            if username in taken_usernames:
+                self.skipped.append((line, f'username {username!r} already exists'))
+            elif email in taken_emails:
+                self.skipped.append((line, f'email {email!r} already exists'))
+            else:
+                accepted.append(entry)
+
+        passwords = [row.get('password') or '' for *_, row in accepted]
+        hashed = list(executor.map(_hash_password, passwords, chunksize=64)) if executor else list(map(_hash_password, passwords))
+
+        users, profiles = [], []
+        for (line, username, email, user_type, row), password in zip(accepted, hashed):
+            user = User(username=username, email=email, type=user_type, password=password)
+            first_name, last_name = RegistrationSerializer.profile_names(username)
+            users.append(user)
+            profiles.append(Profile(
+                user=user,
+                first_name=row.get('first_name') or first_name,
+                last_name=row.get('last_name') or last_name,
+            ))
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            Profile.objects.bulk_create(profiles)
+        self.imported += len(users)
+        self.stdout.write(f'{self.imported} users imported...')
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:10
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Registration used to check email uniqueness in Python only. Refuse to
+    continue if that let duplicates in, rather than picking an account to
+    change; they have to be resolved by hand first.
+    """
+    User = apps.get_model('auth_app', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values('email').annotate(n=Count('id')).filter(n__gt=1).values_list('email', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot add unique_user_email, these email addresses are used by more than one user: '
+            + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auth_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(condition=models.Q(('email', ''), _negated=True), fields=('email',), name='unique_user_email'),
+        ),
+    ]
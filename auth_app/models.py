@@ -12,6 +12,10 @@ class User (AbstractUser):
         - type: Type of user ('customer' or 'business').
         - created_at: Timestamp when the user was created.
 
+    Constraints:
+        - unique_user_email: Non-empty email addresses are unique. Enforced
+          by the database, so registration needs no pre-check query.
+
     UserType:
         - customer: Standard customer user.
         - business: Business user who can create offers.
@@ -25,4 +29,9 @@ class User (AbstractUser):
         business = 'business', 'business'
     username = models.CharField(max_length=150, unique=True)
     type = models.CharField(max_length=20, choices=UserType.choices, default=UserType.customer)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['email'], condition=~models.Q(email=''), name='unique_user_email'),
+        ]
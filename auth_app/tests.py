@@ -1,3 +1,170 @@
-from django.test import TestCase
+import pickle
+import threading
+from unittest import mock
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from auth_app import hashers
+from auth_app.authentication import CachingTokenAuthentication, _token_cache_key, local_token_cache
+from auth_app.models import User
 
-# Create your tests here.
+SHARED_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'tokens': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tokens'},
+}
+
+
+@override_settings(CACHES=SHARED_CACHES, AUTH_TOKEN_CACHE_ALIAS='tokens')
+class CachingTokenAuthenticationTests(TestCase):
+    """Both cache tiers answer repeat requests and forget revoked tokens and changed users."""
+
+    def setUp(self):
+        local_token_cache.clear()
+        self.addCleanup(local_token_cache.clear)
+        caches['tokens'].clear()
+        self.user = User.objects.create_user(username='user', password='secret-password', type='customer')
+        self.key = Token.objects.create(user=self.user).key
+        self.auth = CachingTokenAuthentication()
+        # A miss primes both tiers.
+        self.auth.authenticate_credentials(self.key)
+
+    def shared_entry(self):
+        return caches['tokens'].get(_token_cache_key(self.key))
+
+    def assertEvicted(self):
+        self.assertIsNone(local_token_cache.get(self.key))
+        self.assertIsNone(self.shared_entry())
+
+    def test_hits_need_no_queries(self):
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.key)
+        self.assertEqual((user.pk, token.key), (self.user.pk, self.key))
+
+        local_token_cache.clear()
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate_credentials(self.key)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIsNotNone(local_token_cache.get(self.key))
+
+    def test_shared_tier_never_stores_the_password_hash(self):
+        entry = self.shared_entry()
+        self.assertIsNotNone(entry)
+        self.assertNotIn(self.user.password.encode(), pickle.dumps(entry))
+
+        local_token_cache.clear()
+        user, _ = self.auth.authenticate_credentials(self.key)
+        self.assertIn('password', user.get_deferred_fields())
+        user.first_name = 'Changed'
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('secret-password'))
+
+    def test_deleted_token_is_rejected(self):
+        Token.objects.filter(key=self.key).delete()
+        self.assertEvicted()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+
+    def test_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEvicted()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+
+    def test_saved_user_is_reloaded(self):
+        self.user.type = 'business'
+        self.user.save()
+        self.assertEvicted()
+        user, _ = self.auth.authenticate_credentials(self.key)
+        self.assertEqual(user.type, 'business')
+
+    def test_deleted_user_is_rejected(self):
+        self.user.delete()
+        self.assertEvicted()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class LoginTests(TestCase):
+    """The sync and async login endpoints verify passwords on the hashing pool."""
+    urls = ('/api/login/', '/api/login/async/')
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', password='secret-password', type='customer')
+
+    def login(self, url, password='secret-password', username='user'):
+        return self.client.post(url, {'username': username, 'password': password}, content_type='application/json')
+
+    def test_valid_credentials_return_the_token(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.login(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['token'], Token.objects.get(user=self.user).key)
+                self.assertEqual(response.json()['user_id'], self.user.pk)
+
+    def test_invalid_credentials_are_rejected(self):
+        inactive = User.objects.create_user(username='inactive', password='secret-password', is_active=False)
+        for url in self.urls:
+            for username, password in (('user', 'wrong'), ('nobody', 'secret-password'), (inactive.username, 'secret-password')):
+                with self.subTest(url=url, username=username):
+                    self.assertEqual(self.login(url, password, username).status_code, 400)
+        self.assertFalse(Token.objects.exists())
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        self.assertIn('$1000$', self.user.password)
+        for url, iterations in zip(self.urls, (2000, 3000)):
+            with self.subTest(url=url), override_settings(PASSWORD_PBKDF2_ITERATIONS=iterations):
+                self.assertEqual(self.login(url).status_code, 200)
+                self.user.refresh_from_db()
+                self.assertIn(f'${iterations}$', self.user.password)
+                self.assertTrue(self.user.check_password('secret-password'))
+
+    def test_saturated_pool_returns_429(self):
+        hashers._pool()
+        with mock.patch.object(hashers, '_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            for url in self.urls:
+                with self.subTest(url=url):
+                    self.assertEqual(self.login(url).status_code, 429)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class RegistrationTests(TestCase):
+    """Registration writes user, profile and token together and reports duplicates as 400."""
+
+    def register(self, username='new user', email='new@example.com'):
+        return self.client.post('/api/registration/', {
+            'username': username, 'email': email, 'password': 'secret-password',
+            'repeated_password': 'secret-password', 'type': 'business',
+        }, content_type='application/json')
+
+    def test_creates_user_profile_and_token(self):
+        response = self.register()
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(pk=response.json()['user_id'])
+        self.assertEqual(response.json()['token'], user.auth_token.key)
+        self.assertEqual((user.profile.first_name, user.profile.last_name), ('new', 'user'))
+        self.assertTrue(user.check_password('secret-password'))
+
+    def test_duplicates_are_reported_on_their_field(self):
+        User.objects.create_user(username='taken', email='taken@example.com')
+        for field, data in (('username', {'username': 'taken'}), ('email', {'email': 'taken@example.com'})):
+            with self.subTest(field=field):
+                response = self.register(**data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+        self.assertEqual(User.objects.count(), 1)
+        # Empty emails are exempt from the unique constraint.
+        self.assertEqual(self.register(username='a', email='').status_code, 201)
+        self.assertEqual(self.register(username='b', email='').status_code, 201)
+
+    def test_failed_profile_insert_rolls_back_the_user(self):
+        with mock.patch('profile_app.models.Profile.objects.create', side_effect=IntegrityError('NOT NULL constraint failed')):
+            with self.assertRaises(IntegrityError):
+                self.register()
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Token.objects.exists())
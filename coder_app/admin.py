@@ -1,4 +1,4 @@
 from django.contrib import admin
-from .models import Offers, OfferDetails, Orders, Review
+from .models import Offers, OfferDetails, Orders, Review, BusinessOrderStats, BusinessRating, OrderEvent
 # Register your models here.
-admin.site.register([Offers, OfferDetails, Orders, Review])
\ No newline at end of file
+admin.site.register([Offers, OfferDetails, Orders, Review, BusinessOrderStats, BusinessRating, OrderEvent])
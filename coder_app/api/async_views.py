@@ -0,0 +1,204 @@
+"""
+Async-native GET handlers for the read-heavy endpoints.
+
+Under ASGI, the sync DRF views run through sync_to_async on a shared
+thread. The handlers here use the async ORM (aget, acount, afirst,
+aaggregate, async iteration), the async token authentication and async
+cache calls instead, so these GETs never leave the event loop except for
+the database round trips themselves.
+
+Each endpoint is exposed as a dispatcher built with `dispatch_async`.
+GET/HEAD requests go to the async handler. Every other method, and any GET
+variant that is not handled natively (cursor pagination on the offer list),
+is passed to the original DRF view, which keeps serving POST, PATCH and
+DELETE unchanged.
+
+Responses carry the same JSON and status codes as the DRF views, and the
+sync view's throttle classes are applied before the handler runs (Retry-After
+included). Content negotiation is limited to JSON: requests asking for
+another format (?format=..., or an Accept header listing text/html, as
+browsers send for the browsable API) are passed to the DRF view.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from auth_app.authentication import CachingTokenAuthentication
+from auth_app.models import User
+from coder_app.models import OfferDetails, Orders, BusinessOrderStats
+from coder_app.search import get_search_backend
+from coder_app import response_cache
+from coder_app.stats import aget_platform_stats
+from .seralizers import OfferSeralizer, OfferDetailRetrieveSeralizer, BaseSerializer
+from .views import (
+    OfferListView,
+    OfferKeysetPagination,
+    OfferDetailRetrieveView,
+    OrderBusinessCountViewInProgress,
+    OrderBusinessCountViewCompleted,
+    BaseInfoView,
+    base_info_etag,
+)
+
+authentication = CachingTokenAuthentication()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return JsonResponse(
+        data, status=status, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def error_response(exc):
+    """Render an APIException the way DRF's default exception handler does."""
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = json_response(detail, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        response['WWW-Authenticate'] = authentication.authenticate_header(None)
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+async def authenticate(request):
+    result = await authentication.aauthenticate(request)
+    request.user, request.auth = result if result is not None else (AnonymousUser(), None)
+
+
+def require_authentication(request):
+    if not request.user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+
+
+def wants_json(request):
+    """False for requests negotiating another renderer than JSON."""
+    if request.GET.get(api_settings.URL_FORMAT_OVERRIDE, 'json') != 'json':
+        return False
+    return 'text/html' not in request.headers.get('Accept', '')
+
+
+async def check_throttles(request, view_class, args, kwargs):
+    """Apply `view_class`'s throttles like APIView.initial() does."""
+    if not view_class.throttle_classes:
+        return
+    drf_request = Request(request)
+    drf_request.user, drf_request.auth = request.user, request.auth
+    view = view_class(request=drf_request, args=args, kwargs=kwargs, format_kwarg=None, headers={})
+    # Throttles keep their history in the (sync) Django cache.
+    await sync_to_async(view.check_throttles)(drf_request)
+
+
+def dispatch_async(handler, sync_view, native=None):
+    """
+    Build a view that serves GET/HEAD with the async `handler` and hands
+    every other request to `sync_view` (a DRF view function).
+
+    `native(request)` may return False to send a GET to the sync view too.
+    """
+    sync_handler = sync_to_async(sync_view)
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        if (request.method in ('GET', 'HEAD') and wants_json(request)
+                and (native is None or native(request))):
+            try:
+                await authenticate(request)
+                await check_throttles(request, sync_view.view_class, args, kwargs)
+                return await handler(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return error_response(exc)
+        return await sync_handler(request, *args, **kwargs)
+
+    view.handler = handler
+    view.sync_view = sync_view
+    return view
+
+
+async def offer_list(request):
+    """
+    GET /api/offers/ with the filters, search, ordering and page-number
+    pagination of OfferListView.
+    """
+    drf_request = Request(request)
+    view = OfferListView(request=drf_request, args=(), kwargs={}, format_kwarg=None)
+    if drf_request.query_params.get('search'):
+        # Resolving the backend may inspect the schema once per process.
+        await sync_to_async(get_search_backend)()
+    queryset = view.filter_queryset(view.get_queryset())
+
+    paginator = view.pagination_class.fallback_class()
+    page = await paginator.apaginate_queryset(queryset, drf_request, view)
+    serializer = OfferSeralizer(page, many=True, context={'request': drf_request})
+    return json_response(paginator.get_paginated_response(serializer.data).data)
+
+
+def offer_list_is_native(request):
+    paginator = OfferKeysetPagination
+    return (paginator.cursor_query_param not in request.GET
+            and request.GET.get(paginator.mode_query_param) != 'cursor')
+
+
+async def offer_detail_retrieve(request, pk):
+    require_authentication(request)
+    cached = await response_cache.aget_detail(pk)
+    if cached is not None:
+        updated_at, data = cached
+    else:
+        try:
+            detail = await OfferDetails.objects.select_related('offer').aget(pk=pk)
+        except OfferDetails.DoesNotExist:
+            raise exceptions.NotFound('No OfferDetails matches the given query.')
+        updated_at, data = detail.offer.updated_at, None
+
+    not_modified = response_cache.not_modified(request, 'offerdetail', pk, updated_at)
+    if not_modified is not None:
+        return not_modified
+    if data is None:
+        data = OfferDetailRetrieveSeralizer(detail).data
+        await response_cache.aset_detail(pk, updated_at, data)
+    return response_cache.with_validators(json_response(data), 'offerdetail', pk, updated_at)
+
+
+async def _order_count(request, business_user_id, order_status, key):
+    require_authentication(request)
+    user = request.user
+    if user.id != business_user_id or user.type != 'business':
+        if not await User.objects.filter(id=business_user_id, type='business').aexists():
+            raise exceptions.NotFound('No User matches the given query.')
+        return json_response({key: 0})
+    return json_response({key: await BusinessOrderStats.acount_for(user.id, order_status)})
+
+
+async def order_count_in_progress(request, business_user_id):
+    return await _order_count(request, business_user_id, Orders.Status.in_progress, 'order_count')
+
+
+async def order_count_completed(request, business_user_id):
+    return await _order_count(request, business_user_id, Orders.Status.completed, 'completed_order_count')
+
+
+async def base_info(request):
+    data = BaseSerializer(await aget_platform_stats()).data
+    etag = base_info_etag(data)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = json_response(data)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'BASE_INFO_MAX_AGE', 60))
+    return response
+
+
+offer_list_view = dispatch_async(offer_list, OfferListView.as_view(), native=offer_list_is_native)
+offer_detail_retrieve_view = dispatch_async(offer_detail_retrieve, OfferDetailRetrieveView.as_view())
+order_count_in_progress_view = dispatch_async(order_count_in_progress, OrderBusinessCountViewInProgress.as_view())
+order_count_completed_view = dispatch_async(order_count_completed, OrderBusinessCountViewCompleted.as_view())
+base_info_view = dispatch_async(base_info, BaseInfoView.as_view())
@@ -1,9 +1,16 @@
 from rest_framework import serializers
 from profile_app.models import Profile
 from auth_app.models import User
-from coder_app.models import Offers, OfferDetails, Orders, Review
+from coder_app.models import Offers, OfferDetails, Orders, Review, BusinessOrderStats, BusinessRating
+from functools import partial
+from django.db import transaction
+from django.utils import timezone
 from django.db.models import Min, Max, Avg, Sum, Count
 from profile_app.api.serializers import UserDetailsSerializer
+from coder_app.search import get_search_backend
+from coder_app import response_cache
+from coder_app.stats import adjust_platform_stats
+from core import thumbnails
 
 
 
@@ -52,8 +59,10 @@ class OfferSeralizer(serializers.ModelSerializer):
     Includes:
         - Basic offer information
         - Related offer details (URLs only)
-        - Minimum price and delivery time (aggregated)
+        - Minimum price and delivery time (denormalized columns on Offers)
         - Business user details
+        - Thumbnail URLs per size and format, read from Offers.image_derivatives
+          (empty until generated, see core/thumbnails.py)
 
     Read-only:
         All computed fields are derived from related data.
@@ -62,23 +71,74 @@ class OfferSeralizer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
     user = serializers.SerializerMethodField()
     details = DetailOfferSeralizer(many=True, read_only=True)
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False, read_only=True)
+    min_delivery_time = serializers.IntegerField(read_only=True)
     user_details = UserDetailsSerializer(source='user.profile', read_only=True) 
-
-    def get_min_price(self, obj):
-     return obj.details.aggregate(min_price=Min('price'))['min_price']
-    
-    def get_min_delivery_time(self, obj):
-        return obj.details.aggregate(min_delivery_time=Min('delivery_time'))['min_delivery_time']
+    thumbnails = serializers.SerializerMethodField()
 
     def get_user(self, obj):
-        return obj.user.id         
+        return obj.user_id
+
+    def get_thumbnails(self, obj):
+        return thumbnails.derivative_urls(obj, 'image', 'image_derivatives', self.context.get('request'))
 
 
     class Meta:
         model = Offers
-        fields = ['id', 'user', 'title', 'image' ,'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'user_details']
+        fields = ['id', 'user', 'title', 'image' ,'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'user_details', 'thumbnails']
+
+
+def build_offer(user, offer_data, rating=0):
+    """
+    Build an unsaved offer and its unsaved details from validated data,
+    with the cached minimums and the owner's `rating` already set.
+    """
+    offer_data = dict(offer_data)
+    details_data = offer_data.pop('details', [])
+    offer = Offers(**offer_data, user=user)
+    details = [OfferDetails(offer=offer, **detail_data) for detail_data in details_data]
+    offer.apply_minimums(details)
+    offer.apply_rating(rating)
+    return offer, details
+
+
+class OfferBatchCreateSeralizer(serializers.ListSerializer):
+    """
+    List serializer for creating many offers of one business user at once.
+
+    Behavior:
+        - Every offer and detail is validated before anything is written.
+        - Offers and details are inserted with one bulk_create each (in
+          batches of `batch_size`) inside a single transaction.
+        - bulk_create sends no signals, so the search index, the cached
+          platform statistics and the thumbnail jobs of uploaded images are
+          handled explicitly.
+    """
+    batch_size = 1000
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        rating = BusinessRating.average_for(user.pk)
+        offers, details = [], []
+        for offer_data in validated_data:
+            offer, offer_details = build_offer(user, offer_data, rating)
+            offers.append(offer)
+            details.extend(offer_details)
+
+        with transaction.atomic():
+            Offers.objects.bulk_create(offers, batch_size=self.batch_size)
+            OfferDetails.objects.bulk_create(details, batch_size=self.batch_size)
+            get_search_backend().index_many(offers)
+            transaction.on_commit(partial(self.after_commit, offers))
+        return offers
+
+    @staticmethod
+    def after_commit(offers):
+        """What the Offers post_save signal does for a single created offer."""
+        adjust_platform_stats(offer_count=len(offers))
+        for offer in offers:
+            if isinstance(offer.image.name, str) and offer.image.name:
+                thumbnails.schedule(offer, 'image', 'image_derivatives')
 
 
 class OfferCreateSeralizer(serializers.ModelSerializer):
@@ -88,6 +148,9 @@ class OfferCreateSeralizer(serializers.ModelSerializer):
     Behavior:
         - Requires at least three offer detail entries.
         - Automatically assigns the authenticated user as owner.
+        - Validates every detail before writing, then inserts the offer and
+          all details (one bulk_create) with the cached minimums in one transaction.
+        - With many=True, uses OfferBatchCreateSeralizer.
 
     Validation:
         - Ensures features do not contain numeric values.
@@ -99,29 +162,28 @@ class OfferCreateSeralizer(serializers.ModelSerializer):
     class Meta:
         model = Offers
         fields = ['id', 'title', 'image', 'description', 'details']
+        list_serializer_class = OfferBatchCreateSeralizer
 
-
-    def create(self, validated_data):
- 
-        details_data = validated_data.pop('details', [])
-        user = self.context['request'].user
+    def validate(self, data):
+        details_data = data.get('details', [])
         if len(details_data) < 3:
-             raise serializers.ValidationError(
-                        {"error": "a Offer must have at least three details  "}
-             )
-        offer = Offers.objects.create(**validated_data, user=user)
-
+            raise serializers.ValidationError(
+                {"error": "a Offer must have at least three details  "}
+            )
         for detail_data in details_data:
-            features = detail_data.get('features', [])
-
-            for feature in features:
+            for feature in detail_data.get('features', []):
                 if isinstance(feature, int):
                     raise serializers.ValidationError(
                         {"error": "features must not contain numbers"}
                     )
-            OfferDetails.objects.create(offer=offer, **detail_data)
-
+        return data
 
+    def create(self, validated_data):
+        user = self.context['request'].user
+        offer, details = build_offer(user, validated_data, BusinessRating.average_for(user.pk))
+        with transaction.atomic():
+            offer.save()
+            OfferDetails.objects.bulk_create(details)
         return offer
 
 
@@ -151,29 +213,28 @@ class OfferDetailSeralizer(serializers.ModelSerializer):
 
     Includes:
         - All related offer detail links
-        - Aggregated minimum price
-        - Aggregated minimum delivery time
+        - Minimum price (denormalized column on Offers)
+        - Minimum delivery time (denormalized column on Offers)
         - Owner user ID
+        - Thumbnail URLs per size and format (see core/thumbnails.py)
     """
 
     details = OfferDetailSeralizerHyperlinked(many=True, read_only=True)
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False, read_only=True)
+    min_delivery_time = serializers.IntegerField(read_only=True)
     user = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
 
     def get_user(self, obj):
-        return obj.user.id
-    
+        return obj.user_id
 
-    def get_min_price(self, obj):
-        return obj.details.aggregate(min_price=Min('price'))['min_price']
+    def get_thumbnails(self, obj):
+        return thumbnails.derivative_urls(obj, 'image', 'image_derivatives', self.context.get('request'))
     
-    def get_min_delivery_time(self, obj):#
-        return obj.details.aggregate(min_delivery_time=Min('delivery_time'))['min_delivery_time']
     class Meta:
         model = Offers
-        fields = ['id', 'user', 'title', 'image' ,'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time',]
+        fields = ['id', 'user', 'title', 'image' ,'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'thumbnails']
 
 class OfferDetailRetrieveSeralizer(serializers.ModelSerializer):
     """
@@ -186,19 +247,35 @@ class OfferDetailRetrieveSeralizer(serializers.ModelSerializer):
     class Meta:
         model = OfferDetails
         fields = ['id', 'title', 'revisions',  'delivery_time_in_days', 'price', 'features', 'offer_type']
+class DetailUpdateSeralizer(DetailCreateSeralizer):
+    """
+    Serializer for detail entries sent when updating an offer.
+
+    Same fields as DetailCreateSeralizer, except that `id` is writable so a
+    detail can be addressed by id instead of by offer_type.
+    """
+    id = serializers.IntegerField(required=False)
+
+
 class OfferDetailUpdateSeralizer(serializers.ModelSerializer):
     """
     Serializer for updating an existing offer and its details.
 
     Behavior:
         - Updates the offer title.
-        - Updates existing detail entries or creates new ones.
-        - Offer type is mandatory for each detail.
+        - Matches each incoming detail to an existing one by id, or else by
+          offer_type; unmatched details are created.
+        - Offer type (or id) is mandatory for each detail; a detail to be
+          created needs all its fields, otherwise the request fails with 400.
+        - Writes only the fields whose values changed, with one bulk_update
+          in a single transaction; an unchanged PATCH writes nothing.
+        - Recomputes the cached minimums only if a price or delivery time
+          changed or a detail was added.
 
     Restrictions:
         Image and description cannot be modified here.
     """
-    details = DetailCreateSeralizer(many=True)
+    details = DetailUpdateSeralizer(many=True)
     id = serializers.IntegerField(read_only=True)
     image = serializers.FileField(read_only=True)
     description = serializers.CharField(read_only=True)
@@ -207,32 +284,70 @@ class OfferDetailUpdateSeralizer(serializers.ModelSerializer):
         model = Offers
         fields = ['id', 'image', 'description', 'title', 'details']
 
+    detail_fields = ['title', 'revisions', 'delivery_time', 'price', 'features', 'offer_type']
+    # Model field -> request field required to add a detail.
+    new_detail_fields = {
+        'title': 'title', 'revisions': 'revisions', 'delivery_time': 'delivery_time_in_days',
+        'price': 'price', 'features': 'features',
+    }
+    minimum_fields = {'price', 'delivery_time'}
 
     def update(self, instance, validated_data):
-        instance.title = validated_data.get('title', instance.title)
-        instance.save()
-        existing_details = list(OfferDetails.objects.filter(offer=instance))
         details_data = validated_data.get('details', [])
-        for i, detail_data in enumerate(details_data):
+        existing = list(OfferDetails.objects.filter(offer=instance)) if details_data else []
+        by_id = {detail.id: detail for detail in existing}
+        by_type = {detail.offer_type: detail for detail in existing}
+
+        changed_fields, changed_details, new_details = set(), {}, []
+        for detail_data in details_data:
+            detail_data = dict(detail_data)
+            detail_id = detail_data.pop('id', None)
             offer_type = detail_data.get('offer_type')
-            if not offer_type:
-                raise serializers.ValidationError("Offer type is required.")
-            if i < len(existing_details):
-                detail_instance = existing_details[i]
-                detail_instance.title = detail_data.get('title', detail_instance.title)
-                detail_instance.revisions = detail_data.get('revisions', detail_instance.revisions)
-                detail_instance.delivery_time = detail_data.get('delivery_time', detail_instance.delivery_time)
-                detail_instance.price = detail_data.get('price', detail_instance.price)
-                detail_instance.features = detail_data.get('features', detail_instance.features)
-                detail_instance.offer_type = offer_type
-                detail_instance.save()
+            if detail_id is not None:
+                detail = by_id.get(detail_id)
+                if detail is None:
+                    raise serializers.ValidationError({"details": f"Detail {detail_id} does not belong to this offer."})
+            elif offer_type:
+                detail = by_type.get(offer_type)
             else:
-                OfferDetails.objects.create(offer=instance,title=detail_data.get('title'),revisions=detail_data.get('revisions', 0),delivery_time=detail_data.get('delivery_time_in_days', 0),price=detail_data.get('price', 0),features=detail_data.get('features', []),offer_type=offer_type)
+                raise serializers.ValidationError("Offer type is required.")
 
-        return instance
+            if detail is None:
+                missing = [name for field, name in self.new_detail_fields.items() if field not in detail_data]
+                if missing:
+                    raise serializers.ValidationError(
+                        {"details": f"New {offer_type} detail is missing: {', '.join(missing)}."}
+                    )
+                new_details.append(OfferDetails(offer=instance, **detail_data))
+                continue
+
+            for field in self.detail_fields:
+                if field in detail_data and getattr(detail, field) != detail_data[field]:
+                    setattr(detail, field, detail_data[field])
+                    changed_fields.add(field)
+                    changed_details[detail.id] = detail
+
+        offer_fields = []
+        if 'title' in validated_data and validated_data['title'] != instance.title:
+            instance.title = validated_data['title']
+            offer_fields.append('title')
+        if new_details or changed_fields & self.minimum_fields:
+            instance.apply_minimums(existing + new_details)
+            offer_fields += ['min_price', 'min_delivery_time']
+        if not (offer_fields or changed_details):
+            return instance
+
+        with transaction.atomic():
+            if changed_details:
+                OfferDetails.objects.bulk_update(changed_details.values(), fields=sorted(changed_fields))
+                # bulk_update sends no signals; the offer's own save below covers its entry.
+                transaction.on_commit(partial(response_cache.invalidate_details, list(changed_details)))
+            if new_details:
+                OfferDetails.objects.bulk_create(new_details)
+            instance.save(update_fields=offer_fields + ['updated_at'])
 
+        return instance
 
-    
 
 
 
@@ -244,6 +359,8 @@ class OrdersSerializer(serializers.ModelSerializer):
         - Accepts offer_detail_id as input.
         - Automatically assigns customer and business users.
         - Exposes read-only fields from related offer detail.
+        - Increments the business's order counters and the offer's
+          order_count in the same transaction.
     """
     id = serializers.IntegerField(read_only=True)
     title = serializers.CharField(source='offer_detail.title', read_only=True)
@@ -270,12 +387,15 @@ class OrdersSerializer(serializers.ModelSerializer):
         offer_detail = OfferDetails.objects.get(id=offer_detail_id)
         user = self.context['request'].user
 
-        order = Orders.objects.create(
-            customer_user=user,
-            business_user=offer_detail.offer.user,
-            offer_detail=offer_detail,
-            **validated_data
-        )
+        with transaction.atomic():
+            order = Orders.objects.create(
+                customer_user=user,
+                business_user=offer_detail.offer.user,
+                offer_detail=offer_detail,
+                **validated_data
+            )
+            BusinessOrderStats.record_transition(order.business_user_id, None, order.status)
+            Offers.record_orders(1, pk=offer_detail.offer_id)
         return order
 
 
@@ -286,6 +406,11 @@ class OrderDetailSerializer(serializers.ModelSerializer):
     Update rules:
         - Only the 'status' field can be updated.
         - Any other field update is rejected.
+        - Only the transitions in Orders.TRANSITIONS are accepted
+          (in_progress -> completed or canceled).
+        - A change is applied only if the order is still in the status it
+          was read in, and is booked with Orders.record_transitions (order
+          event, counters, time-to-complete) in the same transaction.
     """
     
     id = serializers.IntegerField(read_only=True)
@@ -321,16 +446,44 @@ class OrderDetailSerializer(serializers.ModelSerializer):
         return data
 
     def update(self, instance, validated_data):
-        instance.status = validated_data.get('status', instance.status)
-
+        old_status = instance.status
 
         if 'status' in validated_data:
-            instance.status = validated_data['status']
+            new_status = validated_data['status']
         else:
             raise serializers.ValidationError({"status": "This field is required for update."})
-        instance.save()
+        if new_status == old_status:
+            return instance
+        if not Orders.can_transition(old_status, new_status):
+            raise serializers.ValidationError(
+                {"status": f"An order cannot change from '{old_status}' to '{new_status}'."}
+            )
+        with transaction.atomic():
+            now = timezone.now()
+            if not Orders.objects.filter(pk=instance.pk, status=old_status).update(status=new_status, updated_at=now):
+                raise serializers.ValidationError({"status": "The order status was changed concurrently."})
+            Orders.record_transitions(instance.business_user_id, [(instance.pk, old_status, instance.created_at)], new_status)
+        instance.status = new_status
+        instance.updated_at = now
         return instance
 
+class OrderBulkStatusSeralizer(serializers.Serializer):
+    """
+    Input of the bulk order status endpoint.
+
+    Fields:
+        - ids: Order ids to move (duplicates are ignored, at most `max_ids`).
+        - status: Target status for all of them.
+    """
+    max_ids = 1000
+
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=max_ids)
+    status = serializers.ChoiceField(choices=Orders.Status.choices)
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
 class ReviewListSeralizer(serializers.ModelSerializer):
     """
     Serializer for listing and creating reviews.
@@ -393,33 +546,48 @@ class ReviewDetailSeralizer(serializers.ModelSerializer):
         return instance
 
 
+class BusinessRatingSeralizer(serializers.ModelSerializer):
+    """
+    Serializer for the precomputed review aggregates of a business.
+
+    Fields:
+        - business_user: Business user ID
+        - review_count: Number of reviews
+        - average_rating: Average rate, rounded to one decimal
+        - histogram: Review counts per whole rate (index 0 to 10)
+    """
+
+    average_rating = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BusinessRating
+        fields = ['business_user', 'review_count', 'average_rating', 'histogram']
+
+    def get_average_rating(self, obj):
+        return round(obj.average_rating, 1)
+
+
 class BaseSerializer(serializers.Serializer):
     """
     Serializer providing aggregated platform statistics.
 
+    Input:
+        The statistics dict returned by coder_app.stats.get_platform_stats.
+
     Returns:
         - Total review count
         - Average review rating
         - Number of business profiles
         - Total number of offers
     """
-    review_count = serializers.SerializerMethodField()
+    review_count = serializers.IntegerField()
     average_rating = serializers.SerializerMethodField()
-    business_profile_count = serializers.SerializerMethodField()
-    offer_count = serializers.SerializerMethodField()
-
-    def get_review_count(self, obj):
-        return Review.objects.count()  
+    business_profile_count = serializers.IntegerField()
+    offer_count = serializers.IntegerField()
 
     def get_average_rating(self, obj):
-        rating_average = Review.objects.aggregate(avg=Avg('rate'))['avg'] or 0
-        return round(rating_average, 1)
-
-    def get_business_profile_count(self, obj):
-       business_user =  User.objects.filter(type='business')
-       return business_user.count()
-
-    def get_offer_count(self, obj):
-        return Offers.objects.count()
+        if not obj['review_count']:
+            return 0
+        return round(obj['rating_sum'] / obj['review_count'], 1)
 
 
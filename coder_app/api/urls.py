@@ -1,17 +1,37 @@
+from django.conf import settings
 from django.urls import path
-from .views import OfferListView, OfferDetailView, OfferDetailRetrieveView, OrderListCreateView, OrderDetailView, OrderBusinessCountViewInProgress, OrderBusinessCountViewCompleted, ReviewListView, ReviewDetailView, BaseInfoView
+from . import async_views
+from .views import OfferListView, OfferBatchCreateView, OfferDetailView, OfferDetailRetrieveView, OrderListCreateView, OrderDetailView, OrderBulkStatusView, BusinessDashboardView, OrderBusinessCountViewInProgress, OrderBusinessCountViewCompleted, ReviewListView, ReviewDetailView, BusinessRatingListView, BusinessRatingView, BaseInfoView
+
+if getattr(settings, 'ASYNC_API_VIEWS', False):
+    offer_list_view = async_views.offer_list_view
+    offer_detail_retrieve_view = async_views.offer_detail_retrieve_view
+    order_count_in_progress_view = async_views.order_count_in_progress_view
+    order_count_completed_view = async_views.order_count_completed_view
+    base_info_view = async_views.base_info_view
+else:
+    offer_list_view = OfferListView.as_view()
+    offer_detail_retrieve_view = OfferDetailRetrieveView.as_view()
+    order_count_in_progress_view = OrderBusinessCountViewInProgress.as_view()
+    order_count_completed_view = OrderBusinessCountViewCompleted.as_view()
+    base_info_view = BaseInfoView.as_view()
 
 
 urlpatterns = [
-    path('offers/', OfferListView.as_view(), name='offer-list'),
+    path('offers/', offer_list_view, name='offer-list'),
+    path('offers/batch/', OfferBatchCreateView.as_view(), name='offer-batch-create'),
     path('offers/<int:pk>/', OfferDetailView.as_view(), name='offer-details'),
-    path('offerdetails/<int:pk>/', OfferDetailRetrieveView.as_view(), name='offer-retrieve-details'),
+    path('offerdetails/<int:pk>/', offer_detail_retrieve_view, name='offer-retrieve-details'),
     path('orders/', OrderListCreateView.as_view(), name='order-list-create'),
+    path('orders/bulk-status/', OrderBulkStatusView.as_view(), name='order-bulk-status'),
     path('orders/<int:pk>/', OrderDetailView.as_view(), name='order-detail'),
-    path('order-count/<int:business_user_id>/', OrderBusinessCountViewInProgress.as_view(), name='orderbusinesscountInProgress-view'),
-    path('completed-order-count/<int:business_user_id>/', OrderBusinessCountViewCompleted.as_view(), name='orderbusinesscountCompleted-view'),
+    path('order-count/<int:business_user_id>/', order_count_in_progress_view, name='orderbusinesscountInProgress-view'),
+    path('completed-order-count/<int:business_user_id>/', order_count_completed_view, name='orderbusinesscountCompleted-view'),
+    path('business-dashboard/', BusinessDashboardView.as_view(), name='business-dashboard'),
     path('reviews/', ReviewListView.as_view(), name='review-list'),
     path('reviews/<int:pk>/', ReviewDetailView.as_view(), name='review-details'),
-    path('base-info/', BaseInfoView.as_view(), name='base-info-list'),
+    path('business-ratings/', BusinessRatingListView.as_view(), name='business-rating-list'),
+    path('business-ratings/<int:business_user_id>/', BusinessRatingView.as_view(), name='business-rating'),
+    path('base-info/', base_info_view, name='base-info-list'),
 
 ]
\ No newline at end of file
@@ -1,6 +1,8 @@
+import hashlib
+import json
 from profile_app.models import Profile
 from auth_app.models import User
-from coder_app.models import Offers, OfferDetails, Orders, Review
+from coder_app.models import Offers, OfferDetails, Orders, Review, BusinessOrderStats, BusinessRating
 
 from rest_framework.views import APIView
 from .seralizers import (
@@ -11,8 +13,10 @@ from .seralizers import (
     OfferDetailUpdateSeralizer,
     OrdersSerializer,
     OrderDetailSerializer,
+    OrderBulkStatusSeralizer,
     ReviewListSeralizer,
     ReviewDetailSeralizer,
+    BusinessRatingSeralizer,
     BaseSerializer
 )
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -33,13 +37,23 @@ from rest_framework.generics import (
     ListAPIView
 )
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from rest_framework.pagination import PageNumberPagination
+from core.pagination import AsyncPageNumberMixin, KeysetPagination
 from django_filters.rest_framework import FilterSet, NumberFilter, DjangoFilterBackend
-from django.db.models import Min, Max
+from django.db.models import Min, Max, Prefetch, Q
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from coder_app.stats import get_platform_stats
+from coder_app.search import get_search_backend
+from coder_app import response_cache
 
 
-class OfferListPagination(PageNumberPagination):
+class OfferListPagination(AsyncPageNumberMixin, PageNumberPagination):
     # Default number of items per page
     page_size = 5
 
@@ -50,6 +64,39 @@ class OfferListPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class OfferKeysetPagination(KeysetPagination):
+    # Cursor mode is opt-in; regular requests keep page-number pagination
+    fallback_class = OfferListPagination
+    page_size = 5
+    max_page_size = 100
+    orderings = [
+        '-updated_at', 'updated_at', 'min_price', '-min_price',
+        '-rating', 'rating', '-order_count', 'order_count', '-popularity', 'popularity',
+    ]
+
+
+class OrderListPagination(PageNumberPagination):
+    # Default number of items per page
+    page_size = 20
+
+    # Allow client to override page size
+    page_size_query_param = 'page_size'
+
+    # Maximum allowed page size
+    max_page_size = 100
+
+
+class OrderKeysetPagination(KeysetPagination):
+    # Cursor mode is opt-in; regular requests use page-number pagination
+    fallback_class = OrderListPagination
+    orderings = ['-created_at', 'created_at']
+
+
+class ReviewKeysetPagination(KeysetPagination):
+    # Reviews stay unpaginated unless cursor mode is requested
+    orderings = ['-updated_at', 'updated_at']
+
+
 class OfferFilterSet(FilterSet):
     creator_id = NumberFilter(field_name='user__id', lookup_expr='exact')
 
@@ -59,6 +106,20 @@ class OfferFilterSet(FilterSet):
 
 
 
+class OfferSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that delegates the `search` parameter to the configured
+    full-text backend (coder_app.search), which filters and ranks by relevance.
+    An explicit `ordering` parameter still takes precedence over the ranking.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms)
+
+
 class OfferListView(ListCreateAPIView):
     """
     List all offers or create a new offer.
@@ -72,34 +133,46 @@ class OfferListView(ListCreateAPIView):
 
     Filtering:
         - creator_id: Filter offers by creator (business user ID).
-        - min_price: Filter offers by minimum price (based on offer details).
-        - max_delivery_time: Filter offers by maximum delivery time.
+        - min_price: Filter offers by minimum price (cached Offers.min_price column).
+        - max_delivery_time: Filter offers by maximum delivery time (cached Offers.min_delivery_time column).
 
     Search:
         - title
         - description
+        Full-text search through OfferSearchFilter, ranked by relevance.
 
     Ordering:
         - updated_at
         - min_price
+        - rating: the owner's average review rating
+        - order_count: number of orders placed for the offer
+        - popularity: order_count + OFFER_POPULARITY_RATING_WEIGHT * rating
+        rating, order_count and popularity are denormalized, indexed columns
+        on Offers, so sorting never aggregates over Orders or Review.
 
     Pagination:
-        Uses OfferListPagination.
+        Uses OfferListPagination. `?pagination=cursor` switches to keyset
+        pagination on (<ordering key>, id), following `ordering`.
+
+    Query plan:
+        The owner and its profile are joined in, detail ids are prefetched
+        in one extra query and the minimums are plain columns, so a page
+        costs a fixed number of queries regardless of its size.
     """
     permission_classes = [IsBusinessUser]
-    pagination_class = OfferListPagination
+    pagination_class = OfferKeysetPagination
     queryset = Offers.objects.all()
 
     # Enable filtering, searching and ordering
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        OfferSearchFilter,
         filters.OrderingFilter
     ]
 
     filterset_class = OfferFilterSet
     search_fields = ['title', 'description']
-    ordering_fields = ['updated_at', 'min_price']
+    ordering_fields = ['updated_at', 'min_price', 'rating', 'order_count', 'popularity']
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -110,7 +183,9 @@ class OfferListView(ListCreateAPIView):
         max_delivery_time = self.request.query_params.get('max_delivery_time')
         min_price = self.request.query_params.get('min_price')
 
-        queryset = Offers.objects.all()
+        queryset = Offers.objects.select_related('user__profile').prefetch_related(
+            Prefetch('details', queryset=OfferDetails.objects.only('id', 'offer_id'))
+        )
 
 
         if max_delivery_time is not None:
@@ -120,7 +195,7 @@ class OfferListView(ListCreateAPIView):
                 raise ValidationError("max_delivery_time must be an integer.")
 
             queryset = queryset.filter(
-                details__delivery_time__lte=max_delivery_time
+                min_delivery_time__lte=max_delivery_time
             )
 
         if min_price is not None:
@@ -129,11 +204,37 @@ class OfferListView(ListCreateAPIView):
             except ValueError:
                 raise ValidationError({"min_price": "Must be a number."})
 
-            queryset = queryset.annotate(
-                min_price=Min('details__price')
-            ).filter(min_price__gte=min_price)
+            queryset = queryset.filter(min_price__gte=min_price)
 
-        return queryset.distinct()
+        return queryset
+
+
+
+class OfferBatchCreateView(APIView):
+    """
+    Create many offers for the authenticated business user in one request.
+
+    Permissions:
+        Only business users are allowed to access this endpoint.
+
+    Behavior:
+        - POST: Accepts a list of offers in the OfferCreateSeralizer format.
+          All offers are validated first; if any is invalid nothing is
+          written and the per-offer errors are returned.
+        - Valid batches are inserted with bulk_create (offers, then details)
+          in a single transaction and returned with their details.
+    """
+    permission_classes = [IsBusinessUser]
+    max_batch_size = 1000
+
+    def post(self, request):
+        serializer = OfferCreateSeralizer(
+            data=request.data, many=True, max_length=self.max_batch_size, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        offers = serializer.save()
+        created = Offers.objects.filter(id__in=[offer.id for offer in offers]).prefetch_related('details').order_by('id')
+        return Response(OfferCreateSeralizer(created, many=True).data, status=status.HTTP_201_CREATED)
 
 
 
@@ -149,16 +250,34 @@ class OfferDetailView(RetrieveUpdateDestroyAPIView):
         - GET: Retrieve offer details.
         - PUT/PATCH: Update offer data.
         - DELETE: Remove the offer.
+
+    Caching:
+        - GET responses are cached per offer and host (coder_app.response_cache)
+          and carry ETag/Last-Modified derived from the offer's updated_at.
+        - A matching If-None-Match/If-Modified-Since is answered with 304
+          without serializing.
     """
     queryset = Offers.objects.all()
     serializer_class = OfferDetailSeralizer
     permission_classes = [IsOwnerFromOfffer, IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        offer = self.get_object()
-
-        serializer = self.get_serializer(offer, context={'request': request})
-        return Response(serializer.data)
+        # Any authenticated user may read any offer, so a cache hit needs no object check.
+        pk, host = kwargs['pk'], response_cache.host_key(request)
+        cached = response_cache.get_offer(pk, host)
+        if cached is not None:
+            updated_at, data = cached
+        else:
+            offer = self.get_object()
+            updated_at, data = offer.updated_at, None
+
+        not_modified = response_cache.not_modified(request, 'offer', pk, updated_at)
+        if not_modified is not None:
+            return not_modified
+        if data is None:
+            data = self.get_serializer(offer, context={'request': request}).data
+            response_cache.set_offer(pk, host, updated_at, data)
+        return response_cache.with_validators(Response(data), 'offer', pk, updated_at)
 
     def get_serializer_class(self):
         if self.request.method == 'PATCH' or self.request.method == 'PUT':
@@ -176,11 +295,34 @@ class OfferDetailRetrieveView(RetrieveAPIView):
 
     Behavior:
         - GET: Returns detailed information about one offer detail.
+
+    Caching:
+        - Responses are cached per detail (coder_app.response_cache) and
+          carry ETag/Last-Modified derived from the parent offer's updated_at.
+        - A matching If-None-Match/If-Modified-Since is answered with 304
+          without serializing.
     """
-    queryset = OfferDetails.objects.all()
+    queryset = OfferDetails.objects.select_related('offer')
     serializer_class = OfferDetailRetrieveSeralizer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        cached = response_cache.get_detail(pk)
+        if cached is not None:
+            updated_at, data = cached
+        else:
+            detail = self.get_object()
+            updated_at, data = detail.offer.updated_at, None
+
+        not_modified = response_cache.not_modified(request, 'offerdetail', pk, updated_at)
+        if not_modified is not None:
+            return not_modified
+        if data is None:
+            data = self.get_serializer(detail).data
+            response_cache.set_detail(pk, updated_at, data)
+        return response_cache.with_validators(Response(data), 'offerdetail', pk, updated_at)
+
 
 class OrderListCreateView(APIView):
     """
@@ -191,7 +333,11 @@ class OrderListCreateView(APIView):
         - Only customers are allowed to create orders.
 
     Behavior:
-        - GET: Returns all orders where the user is customer or business.
+        - GET: Returns a paginated list of orders where the user is customer
+          or business, newest first (OrderListPagination, or keyset pagination
+          with `?pagination=cursor`).
+        - GET with `?stream=1`: Streams every matching order as NDJSON, reading
+          the table in chunks of `stream_chunk_size` so memory stays flat.
         - POST: Creates a new order for an offer detail.
 
     Restrictions:
@@ -199,11 +345,28 @@ class OrderListCreateView(APIView):
     """
     permission_classes = [IsCustomerUser, IsAuthenticated]
     queryset = Orders.objects.all()
+    pagination_class = OrderKeysetPagination
+    stream_chunk_size = 2000
 
     def get(self, request):
-        orders = ( Orders.objects.filter(customer_user=request.user) |Orders.objects.filter(business_user=request.user))
-        serializer = OrdersSerializer(orders, many=True)
-        return Response(serializer.data)
+        orders = (
+            Orders.objects.filter(Q(customer_user=request.user) | Q(business_user=request.user))
+            .select_related('offer_detail')
+            .order_by('-created_at', '-id')
+        )
+        if request.query_params.get('stream') in ('1', 'true'):
+            return StreamingHttpResponse(self.stream_orders(orders), content_type='application/x-ndjson')
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        serializer = OrdersSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def stream_orders(self, orders):
+        serializer = OrdersSerializer()
+        encoder = JSONEncoder()
+        for order in orders.iterator(chunk_size=self.stream_chunk_size):
+            yield encoder.encode(serializer.to_representation(order)) + '\n'
 
     def post(self, request):
         offer_detail_id = request.data.get('offer_detail_id')
@@ -251,6 +414,62 @@ class OrderDetailView(RetrieveUpdateDestroyAPIView):
         return obj
 
 
+class OrderBulkStatusView(APIView):
+    """
+    Change the status of many orders of the authenticated business at once.
+
+    Permissions:
+        Only business users are allowed; only their own orders are changed.
+
+    Behavior:
+        - POST {"ids": [...], "status": "completed"}: Checks ownership of all
+          ids with one query, moves the owned orders with a single UPDATE and
+          adjusts the business's order counters.
+        - Returns 200 with one result per id: 'updated', 'unchanged',
+          'invalid_transition' (see Orders.TRANSITIONS), 'forbidden' or
+          'not_found'. Orders that are not the caller's are
+          left untouched; the others are still updated.
+    """
+    permission_classes = [IsBusinessUser]
+
+    def post(self, request):
+        serializer = OrderBulkStatusSeralizer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data['status']
+        results = Orders.bulk_set_status(request.user.id, serializer.validated_data['ids'], new_status)
+        return Response({
+            'status': new_status,
+            'updated': sum(result == 'updated' for result in results.values()),
+            'results': [{'id': order_id, 'result': result} for order_id, result in results.items()],
+        })
+
+
+class BusinessDashboardView(APIView):
+    """
+    Order statistics for the authenticated business user's dashboard.
+
+    Permissions:
+        Only authenticated business users; each sees their own figures.
+
+    Behavior:
+        - GET: Returns the order counters, the cancellation rate (canceled
+          share of closed orders), the median and average time-to-complete
+          in seconds (null before the first completion) and the
+          time-to-complete histogram (`le` is the bucket's upper bound in
+          seconds, null for the overflow bucket).
+
+    Notes:
+        All figures are read from the business's BusinessOrderStats row,
+        which is updated incrementally on every status change.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.type != 'business':
+            raise PermissionDenied('Only business users have a dashboard.')
+        return Response(BusinessOrderStats.dashboard_for(request.user.id))
+
+
 class OrderBusinessCountViewInProgress(APIView):
     """
     Return the number of in-progress orders for a business user.
@@ -263,16 +482,17 @@ class OrderBusinessCountViewInProgress(APIView):
 
     Notes:
         Only the business owner can see their order count.
+        The count is read from the business's BusinessOrderStats row.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, business_user_id):
-        business_user = get_object_or_404(User, id=business_user_id, type='business')
         user = request.user
-        if user.id != business_user.id:
+        if user.id != business_user_id or user.type != 'business':
+            get_object_or_404(User, id=business_user_id, type='business')
             return Response({"order_count": 0})
 
-        count = Orders.objects.filter(business_user=user,status="in_progress").count()
+        count = BusinessOrderStats.count_for(user.id, Orders.Status.in_progress)
         return Response({"order_count": count})
 
 
@@ -288,17 +508,18 @@ class OrderBusinessCountViewCompleted(APIView):
 
     Notes:
         Only the business owner can see their completed order count.
+        The count is read from the business's BusinessOrderStats row.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, business_user_id):
-        business_user = get_object_or_404(User,id=business_user_id,type='business')
         user = request.user
 
-        if user.id != business_user.id:
+        if user.id != business_user_id or user.type != 'business':
+            get_object_or_404(User, id=business_user_id, type='business')
             return Response({"completed_order_count": 0})
 
-        count = Orders.objects.filter(business_user=user,status="completed").count()
+        count = BusinessOrderStats.count_for(user.id, Orders.Status.completed)
         return Response({"completed_order_count": count})
 
 
@@ -334,9 +555,15 @@ class ReviewListView(generics.ListCreateAPIView):
         - updated_at
         - rating
 
+    Pagination:
+        Unpaginated by default. `?pagination=cursor` switches to keyset
+        pagination on (updated_at, id).
+
     Behavior:
         - GET: Returns a list of reviews.
         - POST: Creates a new review if the user is eligible.
+        - Creating a review updates the business's BusinessRating in the
+          same transaction.
 
     Restrictions:
         - A customer can review a business only once.
@@ -345,6 +572,7 @@ class ReviewListView(generics.ListCreateAPIView):
     queryset = Review.objects.all()
     serializer_class = ReviewListSeralizer
     permission_classes = [IsCustomerUserForReviews,IsAuthenticated]
+    pagination_class = ReviewKeysetPagination
     filter_backends = [DjangoFilterBackend,filters.OrderingFilter]
     filterset_class = ReviewFilter
     ordering_fields = ['updated_at', 'rating']
@@ -362,7 +590,13 @@ class ReviewListView(generics.ListCreateAPIView):
         seralizer = ReviewListSeralizer(data=request.data)
 
         if seralizer.is_valid():
-            seralizer.save(reviewer=user)
+            try:
+                # The Review post_save signal updates the business's BusinessRating.
+                with transaction.atomic():
+                    seralizer.save(reviewer=user)
+            except IntegrityError:
+                # A concurrent request won the race for the unique (reviewer, business_user) constraint.
+                return Response({'detail': 'You have already reviewed this business.'},status=status.HTTP_400_BAD_REQUEST)
             return Response(seralizer.data,status=status.HTTP_201_CREATED)
 
         return Response(seralizer.errors,status=status.HTTP_400_BAD_REQUEST)
@@ -379,6 +613,7 @@ class ReviewDetailView(APIView):
     Behavior:
         - PATCH: Partially update the review.
         - DELETE: Remove the review.
+        - Both update the business's BusinessRating in the same transaction.
 
     Update restrictions:
         Only the following fields can be updated:
@@ -401,7 +636,9 @@ class ReviewDetailView(APIView):
         serializer = ReviewDetailSeralizer(review,data=request.data,partial=True)
 
         if serializer.is_valid():
-            serializer.save()
+            # The Review signals update the business's BusinessRating in the same transaction.
+            with transaction.atomic():
+                serializer.save()
             return Response(serializer.data, status=200)
         return Response(serializer.errors, status=400)
 
@@ -411,11 +648,71 @@ class ReviewDetailView(APIView):
         if request.user != review.reviewer:
             return Response({'detail': 'Cannot delete this review.'},status=403)
 
+        # The Review post_delete signal updates the business's BusinessRating.
         review.delete()
 
         return Response({'detail': 'review deleted successfully.'},status=204)
 
 
+class BusinessRatingKeysetPagination(KeysetPagination):
+    # Business rankings stay unpaginated unless cursor mode is requested
+    orderings = ['-average_rating', '-review_count', 'average_rating', 'review_count']
+
+
+class BusinessRatingListView(ListAPIView):
+    """
+    List the review aggregates of all reviewed businesses.
+
+    Permissions:
+        - User must be authenticated.
+
+    Ordering:
+        - average_rating (default: highest first)
+        - review_count
+
+    Pagination:
+        Unpaginated by default. `?pagination=cursor` switches to keyset
+        pagination on (average_rating, id) or (review_count, id).
+
+    Behavior:
+        Reads BusinessRating only, so ranking businesses never scans Review.
+    """
+    queryset = BusinessRating.objects.all()
+    serializer_class = BusinessRatingSeralizer
+    permission_classes = [IsAuthenticated]
+    pagination_class = BusinessRatingKeysetPagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['average_rating', 'review_count']
+    ordering = ['-average_rating']
+
+
+class BusinessRatingView(APIView):
+    """
+    Return the review aggregates of a single business user.
+
+    Permissions:
+        - User must be authenticated.
+
+    Behavior:
+        - GET: Returns review_count, average_rating and the 0-10 histogram,
+          read from one BusinessRating row.
+        - Businesses without reviews get zeroed aggregates.
+        - Returns 404 if the business user does not exist.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, business_user_id, *args, **kwargs):
+        rating = BusinessRating.objects.filter(business_user_id=business_user_id).first()
+        if rating is None:
+            get_object_or_404(User, id=business_user_id, type=User.UserType.business)
+            rating = BusinessRating(business_user_id=business_user_id)
+        return Response(BusinessRatingSeralizer(rating).data)
+
+
+def base_info_etag(data):
+    return quote_etag(hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest())
+
+
 class BaseInfoView(APIView):
     """
     Return base application information.
@@ -425,10 +722,24 @@ class BaseInfoView(APIView):
 
     Behavior:
         - GET: Returns base data for the application.
+
+    Caching:
+        - Statistics come from the signal-maintained cache in coder_app.stats,
+          so steady-state requests do not touch the database.
+        - Responses carry an ETag and Cache-Control: public, max-age=BASE_INFO_MAX_AGE.
+        - A matching If-None-Match header is answered with 304 Not Modified.
     """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        serializer = BaseSerializer(data={})
-        serializer.is_valid()
-        return Response(serializer.data)
+        serializer = BaseSerializer(get_platform_stats())
+        data = serializer.data
+        etag = base_info_etag(data)
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'BASE_INFO_MAX_AGE', 60))
+        return response
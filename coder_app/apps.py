@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class CoderAppConfig(AppConfig):
     name = 'coder_app'
+
+    def ready(self):
+        from django.core import checks
+        from core import thumbnails
+        from coder_app import signals  # noqa: F401
+        checks.register(thumbnails.check_pillow)
@@ -0,0 +1,128 @@
+"""
+Helpers for generating synthetic data in bulk.
+
+Used by the benchmark management commands. Everything is written with
+bulk_create in fixed-size batches so millions of rows can be generated
+without holding them all in memory.
+"""
+import io
+import random
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from auth_app.models import User
+from profile_app.models import Profile
+from coder_app.models import Offers, OfferDetails, Orders, OrderEvent, Review, HOUR
+from coder_app.stats import invalidate_platform_stats
+
+BATCH_SIZE = 5000
+
+DETAIL_TEMPLATES = [
+    (OfferDetails.OfferTyp.basic, 1, 50, 7),
+    (OfferDetails.OfferTyp.standard, 3, 150, 5),
+    (OfferDetails.OfferTyp.premium, 5, 400, 3),
+]
+
+
+def seed_users(count, user_type, prefix, rng):
+    """Create `count` users of `user_type` together with their profiles."""
+    password = make_password('benchmark')
+    users = User.objects.bulk_create(
+        [User(username=f'{prefix}_{i}', email=f'{prefix}_{i}@example.com', password=password, type=user_type)
+         for i in range(count)],
+        batch_size=BATCH_SIZE,
+    )
+    Profile.objects.bulk_create(
+        [Profile(user=user, first_name=prefix, last_name=str(i), location=rng.choice(['Berlin', 'Hamburg', 'Munich']))
+         for i, user in enumerate(users)],
+        batch_size=BATCH_SIZE,
+    )
+    return users
+
+
+WORDS = [
+    'logo', 'design', 'website', 'seo', 'video', 'copywriting', 'app', 'branding', 'illustration',
+    'animation', 'wordpress', 'shop', 'marketing', 'podcast', 'editing', 'translation', 'photo',
+    'retouching', 'mobile', 'android', 'ios', 'backend', 'database', 'consulting', 'social', 'media',
+]
+
+
+def seed_offers(businesses, count, rng, words=WORDS, with_details=True):
+    """
+    Create `count` offers spread over `businesses`, each with a basic,
+    standard and premium detail. Returns the created details.
+    """
+    details = []
+    for start in range(0, count, BATCH_SIZE):
+        offers = []
+        for i in range(start, min(start + BATCH_SIZE, count)):
+            title = ' '.join(rng.sample(words, 2))
+            description = ' '.join(rng.choice(words) for _ in range(12))
+            offers.append(Offers(user=rng.choice(businesses), title=f'{title} {i}', image=None, description=description))
+        batch = []
+        for offer in offers if with_details else []:
+            factor = rng.uniform(0.5, 2)
+            offer_details = [
+                OfferDetails(offer=offer, revisions=revisions, title=offer_type, delivery_time=delivery_time,
+                             price=round(price * factor, 2), features=['feature'], offer_type=offer_type)
+                for offer_type, revisions, price, delivery_time in DETAIL_TEMPLATES
+            ]
+            offer.min_price = min(detail.price for detail in offer_details)
+            offer.min_delivery_time = min(detail.delivery_time for detail in offer_details)
+            batch.extend(offer_details)
+        Offers.objects.bulk_create(offers)
+        details.extend(OfferDetails.objects.bulk_create(batch))
+    return details
+
+
+def seed_orders(customers, details, count, rng):
+    """
+    Create `count` orders for random customers and offer details, with an
+    OrderEvent (random time-to-close up to two weeks) for every closed one.
+    """
+    statuses = [Orders.Status.in_progress, Orders.Status.completed, Orders.Status.canceled]
+    for start in range(0, count, BATCH_SIZE):
+        orders = []
+        for _ in range(start, min(start + BATCH_SIZE, count)):
+            detail = rng.choice(details)
+            orders.append(Orders(
+                customer_user=rng.choice(customers),
+                business_user_id=detail.offer.user_id,
+                offer_detail=detail,
+                status=rng.choices(statuses, weights=[3, 6, 1])[0],
+            ))
+        Orders.objects.bulk_create(orders)
+        OrderEvent.objects.bulk_create([
+            OrderEvent(
+                order=order, business_user_id=order.business_user_id, from_status=Orders.Status.in_progress,
+                to_status=order.status, duration=rng.uniform(HOUR, 14 * 24 * HOUR),
+            )
+            for order in orders if order.status != Orders.Status.in_progress
+        ])
+
+
+def seed_reviews(customers, businesses, count, rng):
+    """Create up to `count` reviews, at most one per (customer, business) pair."""
+    count = min(count, len(customers) * len(businesses))
+    pairs = set()
+    while len(pairs) < count:
+        pairs.add((rng.randrange(len(customers)), rng.randrange(len(businesses))))
+    Review.objects.bulk_create(
+        [Review(reviewer=customers[c], business_user=businesses[b], rate=rng.randint(0, 10), description='Benchmark review')
+         for c, b in pairs],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def rebuild_derived():
+    """
+    Bring every table and cache derived from the seeded rows up to date:
+    order counters, business ratings, offer sort scores, the search index
+    and the platform statistics (bulk_create sends no signals).
+    """
+    for command in ('reconcile_order_stats', 'reconcile_business_ratings', 'rebuild_offer_scores', 'rebuild_search_index'):
+        call_command(command, stdout=io.StringIO())
+    invalidate_platform_stats()
+
+
+def make_rng(seed):
+    return random.Random(seed)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import statistics
+import time
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework.authtoken.models import Token
+from auth_app.models import User
+from coder_app.api import async_views
+from ._seed import make_rng, seed_users, seed_offers, seed_orders
+
+
+class Command(BaseCommand):
+    """
+    Load test the async-native GET handlers against the sync DRF views.
+
+    Purpose:
+        - Seeds a dataset, then fires --requests requests per endpoint with
+          --concurrency requests in flight, once through the DRF view (run
+          via sync_to_async, as the ASGI handler runs sync views) and once
+          through the async handler, and reports requests per second and
+          p50/p99 latency for each.
+
+    Behavior:
+        - Requests are built with AsyncRequestFactory and call the views
+          directly, so the numbers exclude the ASGI server and middleware.
+        - The dataset lives in a transaction that is rolled back at the end.
+        - --json prints the results as JSON instead of a table.
+    """
+    help = 'Compare requests/s and p99 latency of the async-native views with the sync DRF views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--offers', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        rng = make_rng(options['seed'])
+        with transaction.atomic():
+            businesses = seed_users(20, User.UserType.business, 'bench_business', rng)
+            customers = seed_users(20, User.UserType.customer, 'bench_customer', rng)
+            details = seed_offers(businesses, options['offers'], rng)
+            seed_orders(customers, details, options['offers'], rng)
+            business = businesses[0]
+            token = Token.objects.create(user=business).key
+
+            endpoints = [
+                ('offer list', async_views.offer_list_view, '/api/offers/?page_size=20', {}),
+                ('offer list search', async_views.offer_list_view, '/api/offers/?search=logo&ordering=min_price', {}),
+                ('offer detail', async_views.offer_detail_retrieve_view, f'/api/offerdetails/{details[0].pk}/', {'pk': details[0].pk}),
+                ('order count', async_views.order_count_in_progress_view, '/api/order-count/', {'business_user_id': business.pk}),
+                ('completed count', async_views.order_count_completed_view, '/api/completed-order-count/', {'business_user_id': business.pk}),
+                ('base info', async_views.base_info_view, '/api/base-info/', {}),
+            ]
+            # The async views run their ORM calls through thread-sensitive
+            # sync_to_async, which lands on this thread and so sees the seeded rows.
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                results = async_to_sync(self.run_all)(endpoints, token, options)
+            transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"endpoint":<18} {"mode":<6} {"req/s":>9} {"p50 ms":>8} {"p99 ms":>8}')
+        for row in results:
+            self.stdout.write(
+                f'{row["endpoint"]:<18} {row["mode"]:<6} {row["rps"]:>9.1f} {row["p50_ms"]:>8.2f} {row["p99_ms"]:>8.2f}'
+            )
+
+    async def run_all(self, endpoints, token, options):
+        factory = AsyncRequestFactory()
+        headers = {'Authorization': f'Token {token}'}
+        results = []
+        for name, view, path, kwargs in endpoints:
+            modes = (('sync', sync_to_async(view.sync_view)), ('async', view))
+            for mode, call in modes:
+                results.append({'endpoint': name, 'mode': mode, **await self.load(
+                    lambda: call(factory.get(path, headers=headers), **kwargs), options)})
+        return results
+
+    async def load(self, send, options):
+        total, concurrency = options['requests'], options['concurrency']
+        latencies = []
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await send()
+                if hasattr(response, 'render'):
+                    response = await sync_to_async(response.render)()
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    raise RuntimeError(f'{response.status_code}: {response.content[:200]}')
+
+        await send()  # warm up caches (token, search backend, platform stats)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        return {
+            'requests': total,
+            'rps': total / elapsed,
+            'p50_ms': statistics.median(latencies),
+            'p99_ms': statistics.quantiles(latencies, n=100)[-1] if len(latencies) > 1 else latencies[0],
+        }
@@ -0,0 +1,276 @@
+import json
+import platform
+import statistics
+import time
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from auth_app.models import User
+from profile_app.models import Profile
+from coder_app.models import Offers, OfferDetails, Orders, Review, BusinessOrderStats, BusinessRating
+from ._seed import make_rng, seed_users, seed_offers, seed_orders, seed_reviews, rebuild_derived, DETAIL_TEMPLATES
+
+PREFIX = 'bench_endpoints'
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(values) - 1, round(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def offer_payload(title):
+    return {
+        'title': title,
+        'image': None,
+        'description': 'Benchmark offer',
+        'details': [
+            {'title': offer_type, 'revisions': revisions, 'delivery_time_in_days': delivery_time,
+             'price': price, 'features': ['feature'], 'offer_type': offer_type}
+            for offer_type, revisions, price, delivery_time in DETAIL_TEMPLATES
+        ],
+    }
+
+
+class QueryCounter:
+    """execute_wrapper counting the queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Endpoint:
+    """
+    One benchmarked request.
+
+    `prepare(i)` runs untimed before request number i and returns the
+    (client, path, data) to send; it creates whatever the request consumes
+    (an order to delete, a customer who has not reviewed yet, ...).
+    """
+
+    def __init__(self, name, method, prepare, expected=200, slow=False):
+        self.name = name
+        self.method = method
+        self.prepare = prepare
+        self.expected = expected
+        self.slow = slow
+
+
+class Command(BaseCommand):
+    """
+    Benchmark every API endpoint routed in core/urls.py and report JSON.
+
+    Purpose:
+        - Gives a reproducible baseline (throughput, p50/p95/p99 latency and
+          queries per request for each endpoint) to compare releases with.
+
+    Behavior:
+        - Seeds a dataset with the seed_data generator (--businesses,
+          --customers, --offers, --orders, --reviews, --seed), or uses the
+          data already in the database with --no-seed.
+        - Sends --requests sequential requests per endpoint through the DRF
+          test client, so the full middleware stack, authentication,
+          serializers and rendering are measured, but no network or server.
+          Password hashing endpoints (registration, login) get
+          --slow-requests requests.
+        - Queries are counted with a database execute_wrapper, which adds
+          no measurable overhead to the timings.
+        - Everything runs in one transaction that is rolled back at the end,
+          writes included.
+        - --only limits the run to endpoints whose name contains the value.
+        - Prints the JSON report, or writes it to --output.
+    """
+    help = 'Measure throughput, p50/p95/p99 latency and query counts of every API endpoint (JSON report).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint.')
+        parser.add_argument('--slow-requests', type=int, default=10, help='Requests per password hashing endpoint.')
+        parser.add_argument('--businesses', type=int, default=50)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--offers', type=int, default=5000)
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--no-seed', action='store_true', help='Benchmark against the existing data.')
+        parser.add_argument('--only', default=None)
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['no_seed']:
+                rng = make_rng(options['seed'])
+                businesses = seed_users(options['businesses'], User.UserType.business, f'{PREFIX}_business', rng)
+                customers = seed_users(options['customers'], User.UserType.customer, f'{PREFIX}_customer', rng)
+                details = seed_offers(businesses, options['offers'], rng)
+                seed_orders(customers, details, options['orders'], rng)
+                seed_reviews(customers, businesses, options['reviews'], rng)
+                rebuild_derived()
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                endpoints = self.build_endpoints(options)
+                if options['only']:
+                    endpoints = [endpoint for endpoint in endpoints if options['only'] in endpoint.name]
+                results = [self.measure(endpoint, options) for endpoint in endpoints]
+            transaction.set_rollback(True)
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connections['default'].vendor,
+                'seed': None if options['no_seed'] else options['seed'],
+                'scale': None if options['no_seed'] else {
+                    key: options[key] for key in ('businesses', 'customers', 'offers', 'orders', 'reviews')
+                },
+                'requests': options['requests'],
+                'slow_requests': options['slow_requests'],
+            },
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                target.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Report written to {options["output"]}.'))
+        else:
+            self.stdout.write(output)
+
+    def measure(self, endpoint, options):
+        total = options['slow_requests'] if endpoint.slow else options['requests']
+        latencies, queries = [], []
+        for i in range(total):
+            client, path, data = endpoint.prepare(i)
+            counter = QueryCounter()
+            send = getattr(client, endpoint.method.lower())
+            with connections['default'].execute_wrapper(counter):
+                start = time.perf_counter()
+                response = send(path, data, format='json') if data is not None else send(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(counter.count)
+            if response.status_code != endpoint.expected:
+                raise CommandError(
+                    f'{endpoint.name}: {endpoint.method} {path} returned {response.status_code}, '
+                    f'expected {endpoint.expected}: {response.content[:200]!r}'
+                )
+        latencies.sort()
+        return {
+            'endpoint': endpoint.name,
+            'method': endpoint.method,
+            'requests': total,
+            'rps': round(total / (sum(latencies) / 1000), 1),
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'max_ms': round(latencies[-1], 3),
+            'queries_min': min(queries),
+            'queries_median': statistics.median(queries),
+            'queries_max': max(queries),
+        }
+
+    def build_endpoints(self, options):
+        business = User.objects.filter(type=User.UserType.business, offers__isnull=False).first()
+        customer = User.objects.filter(type=User.UserType.customer).first()
+        if business is None or customer is None:
+            raise CommandError('The database needs a business with offers and a customer; drop --no-seed.')
+        admin = User.objects.create_user(username=f'{PREFIX}_admin', password='benchmark', is_staff=True)
+        password = 'benchmark-password'
+        login_user = User.objects.create_user(username=f'{PREFIX}_login', password=password)
+
+        # One fresh reviewer per review creation, created up front so their
+        # tokens are in the authentication cache like a real client's.
+        reviewer_count = max(options['requests'], options['slow_requests'])
+        reviewers = seed_users(reviewer_count, User.UserType.customer, f'{PREFIX}_reviewer', make_rng(0))
+        reviewed = User.objects.create_user(username=f'{PREFIX}_reviewed', type=User.UserType.business)
+        Profile.objects.create(user=reviewed)
+
+        def client_for(user):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+            return client
+
+        business_client, customer_client, admin_client = client_for(business), client_for(customer), client_for(admin)
+        anonymous = APIClient()
+        reviewer_clients = [client_for(reviewer) for reviewer in reviewers]
+
+        offer = Offers.objects.filter(user=business).first()
+        detail = OfferDetails.objects.filter(offer=offer).first()
+        own_review = Review.objects.create(reviewer=customer, business_user=reviewed, rate=5, description='Benchmark')
+        BusinessRating.record(reviewed.pk, new_rate=5)
+
+        def fixed(client, path, data=None):
+            return lambda i: (client, path, data)
+
+        def new_offer(i):
+            created = Offers.objects.create(user=business, title=f'Benchmark offer {i}', image=None, description='Benchmark')
+            OfferDetails.objects.bulk_create([
+                OfferDetails(offer=created, revisions=revisions, title=offer_type, delivery_time=delivery_time,
+                             price=price, features=['feature'], offer_type=offer_type)
+                for offer_type, revisions, price, delivery_time in DETAIL_TEMPLATES
+            ])
+            return business_client, f'/api/offers/{created.pk}/', None
+
+        def new_order(client):
+            def prepare(i):
+                order = Orders.objects.create(customer_user=customer, business_user=business, offer_detail=detail)
+                BusinessOrderStats.record_transition(business.pk, None, order.status)
+                Offers.record_orders(1, pk=offer.pk)
+                data = {'status': Orders.Status.completed} if client is business_client else None
+                return client, f'/api/orders/{order.pk}/', data
+            return prepare
+
+        def new_review(i):
+            return reviewer_clients[i], '/api/reviews/', {'business_user': reviewed.pk, 'rating': i % 11, 'description': 'Benchmark'}
+
+        def review_to_delete(i):
+            reviewer = reviewers[i]
+            review = Review.objects.filter(reviewer=reviewer, business_user=reviewed).first()
+            if review is None:
+                review = Review.objects.create(reviewer=reviewer, business_user=reviewed, rate=7, description='Benchmark')
+                BusinessRating.record(reviewed.pk, new_rate=7)
+            return reviewer_clients[i], f'/api/reviews/{review.pk}/', None
+
+        return [
+            Endpoint('registration', 'POST', lambda i: (anonymous, '/api/registration/', {
+                'username': f'{PREFIX}_registered_{i}', 'email': f'{PREFIX}_registered_{i}@example.com',
+                'password': password, 'repeated_password': password, 'type': 'customer',
+            }), expected=201, slow=True),
+            Endpoint('login', 'POST', fixed(anonymous, '/api/login/', {'username': login_user.username, 'password': password}), slow=True),
+            Endpoint('login async', 'POST', fixed(anonymous, '/api/login/async/', {'username': login_user.username, 'password': password}), slow=True),
+            Endpoint('profile detail', 'GET', fixed(customer_client, f'/api/profile/{business.pk}/')),
+            Endpoint('profile update', 'PATCH', fixed(customer_client, f'/api/profile/{customer.pk}/', {'location': 'Berlin'})),
+            Endpoint('business profiles', 'GET', fixed(customer_client, '/api/profiles/business/')),
+            Endpoint('customer profiles', 'GET', fixed(customer_client, '/api/profiles/customer/')),
+            Endpoint('offer list', 'GET', fixed(business_client, '/api/offers/')),
+            Endpoint('offer list search', 'GET', fixed(business_client, '/api/offers/?search=logo&ordering=min_price')),
+            Endpoint('offer list popularity cursor', 'GET', fixed(business_client, '/api/offers/?ordering=-popularity&pagination=cursor')),
+            Endpoint('offer create', 'POST', lambda i: (business_client, '/api/offers/', offer_payload(f'Benchmark offer {i}')), expected=201),
+            Endpoint('offer batch create', 'POST', lambda i: (business_client, '/api/offers/batch/', [
+                offer_payload(f'Benchmark batch offer {i} {n}') for n in range(10)
+            ]), expected=201),
+            Endpoint('offer detail', 'GET', fixed(business_client, f'/api/offers/{offer.pk}/')),
+            Endpoint('offer update', 'PATCH', lambda i: (business_client, f'/api/offers/{offer.pk}/', {'title': f'Benchmark title {i}'})),
+            Endpoint('offer delete', 'DELETE', new_offer, expected=204),
+            Endpoint('offer detail retrieve', 'GET', fixed(business_client, f'/api/offerdetails/{detail.pk}/')),
+            Endpoint('order list', 'GET', fixed(customer_client, '/api/orders/')),
+            Endpoint('order create', 'POST', fixed(customer_client, '/api/orders/', {'offer_detail_id': detail.pk}), expected=201),
+            Endpoint('order update', 'PATCH', new_order(business_client)),
+            Endpoint('order delete', 'DELETE', new_order(admin_client), expected=204),
+            Endpoint('order count', 'GET', fixed(business_client, f'/api/order-count/{business.pk}/')),
+            Endpoint('completed order count', 'GET', fixed(business_client, f'/api/completed-order-count/{business.pk}/')),
+            Endpoint('review list', 'GET', fixed(customer_client, f'/api/reviews/?business_user_id={business.pk}')),
+            Endpoint('review create', 'POST', new_review, expected=201),
+            Endpoint('review update', 'PATCH', lambda i: (customer_client, f'/api/reviews/{own_review.pk}/', {'rating': i % 11})),
+            Endpoint('review delete', 'DELETE', review_to_delete, expected=204),
+            Endpoint('business rating list', 'GET', fixed(customer_client, '/api/business-ratings/')),
+            Endpoint('business rating', 'GET', fixed(customer_client, f'/api/business-ratings/{business.pk}/')),
+            Endpoint('base info', 'GET', fixed(anonymous, '/api/base-info/')),
+            Endpoint('metrics', 'GET', fixed(admin_client, '/metrics/')),
+        ]
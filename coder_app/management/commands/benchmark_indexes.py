@@ -0,0 +1,111 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Min
+from coder_app.models import OfferDetails, Orders, Review
+from auth_app.models import User
+from ._seed import make_rng, seed_users, seed_offers, seed_orders, seed_reviews
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the composite indexes on Orders, Review and OfferDetails.
+
+    Purpose:
+        - Seeds a large synthetic dataset (1M orders by default).
+        - Runs the hot queries of the order-count, review-list and offer
+          minimum paths with the composite indexes dropped and again with
+          them in place, printing the query plan and latency of each.
+
+    Behavior:
+        - Everything runs inside one transaction that is rolled back at the
+          end, so the command can be pointed at a development database
+          without leaving benchmark rows or schema changes behind.
+        - The unique (reviewer, business_user) constraint is not dropped,
+          so the reviewer query can use it in both runs.
+    """
+    help = 'Seed a large dataset and compare query plans and latency with and without the composite indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1_000_000)
+        parser.add_argument('--businesses', type=int, default=1000)
+        parser.add_argument('--customers', type=int, default=10000)
+        parser.add_argument('--offers', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=50, help='Executions per query and phase.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = make_rng(options['seed'])
+        with transaction.atomic():
+            self.stdout.write('Seeding data...')
+            businesses = seed_users(options['businesses'], User.UserType.business, 'bench_business', rng)
+            customers = seed_users(options['customers'], User.UserType.customer, 'bench_customer', rng)
+            details = seed_offers(businesses, options['offers'], rng)
+            seed_orders(customers, details, options['orders'], rng)
+            seed_reviews(customers, businesses, options['reviews'], rng)
+
+            queries = self.build_queries(businesses[0], customers[0], details[0].offer_id)
+
+            self.drop_indexes()
+            self.analyze()
+            before = self.run_phase('without composite indexes', queries, options['repeat'])
+
+            self.create_indexes()
+            self.analyze()
+            after = self.run_phase('with composite indexes', queries, options['repeat'])
+
+            self.stdout.write('\nSummary (median ms):')
+            for name in queries:
+                self.stdout.write(f'  {name:<28} {before[name]:>9.3f} -> {after[name]:>9.3f}')
+            transaction.set_rollback(True)
+
+    def build_queries(self, business, customer, offer_id):
+        return {
+            'orders_in_progress_count': lambda: Orders.objects.filter(business_user=business, status=Orders.Status.in_progress),
+            'orders_completed_count': lambda: Orders.objects.filter(business_user=business, status=Orders.Status.completed),
+            'reviews_by_business': lambda: Review.objects.filter(business_user=business).order_by('-updated_at')[:20],
+            'reviews_by_reviewer': lambda: Review.objects.filter(reviewer=customer).order_by('-updated_at')[:20],
+            'offer_minimums': lambda: OfferDetails.objects.filter(offer_id=offer_id).values('offer').annotate(
+                min_price=Min('price'), min_delivery_time=Min('delivery_time')).order_by(),
+        }
+
+    def run_phase(self, label, queries, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {label} =='))
+        medians = {}
+        for name, build in queries.items():
+            queryset = build()
+            self.stdout.write(f'\n{name}\n{queryset.explain()}')
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                if name.endswith('_count'):
+                    build().count()
+                else:
+                    list(build())
+                timings.append((time.perf_counter() - start) * 1000)
+            medians[name] = statistics.median(timings)
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            self.stdout.write(f'median {medians[name]:.3f} ms, p95 {p95:.3f} ms')
+        return medians
+
+    def benchmarked_indexes(self):
+        for model in (Orders, Review, OfferDetails):
+            for index in model._meta.indexes:
+                yield model, index
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model, index in self.benchmarked_indexes():
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+
+    def create_indexes(self):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model, index in self.benchmarked_indexes():
+                cursor.execute(str(index.create_sql(model, editor)))
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
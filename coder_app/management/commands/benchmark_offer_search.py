@@ -0,0 +1,63 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from auth_app.models import User
+from coder_app.models import Offers
+from coder_app.search import SimpleSearchBackend, get_search_backend
+from ._seed import make_rng, seed_users, seed_offers
+
+QUERIES = [['logo'], ['website', 'design'], ['android'], ['video', 'editing'], ['web'], ['nonexistentterm']]
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the offer full-text search against plain icontains matching.
+
+    Purpose:
+        - Seeds a large offer table (500k offers by default), rebuilds the
+          search index and times a first results page plus the total match
+          count for a fixed set of queries with both backends.
+
+    Behavior:
+        - Runs inside a transaction that is rolled back at the end.
+    """
+    help = 'Compare offer search latency of the configured full-text backend and icontains matching.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=500_000)
+        parser.add_argument('--businesses', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        baseline = SimpleSearchBackend()
+        rng = make_rng(options['seed'])
+        with transaction.atomic():
+            self.stdout.write('Seeding offers...')
+            businesses = seed_users(options['businesses'], User.UserType.business, 'bench_business', rng)
+            seed_offers(businesses, options['offers'], rng, with_details=False)
+            backend.rebuild()
+
+            self.stdout.write(f'{"query":<20} {"backend":<12} {"matches":>8} {"page ms":>9} {"count ms":>9}')
+            for terms in QUERIES:
+                for candidate in (baseline, backend):
+                    page_ms, count_ms, matches = self.measure(candidate, terms, options['repeat'])
+                    self.stdout.write(
+                        f'{" ".join(terms):<20} {candidate.name:<12} {matches:>8} {page_ms:>9.2f} {count_ms:>9.2f}'
+                    )
+            transaction.set_rollback(True)
+
+    def measure(self, backend, terms, repeat):
+        page_timings, count_timings = [], []
+        matches = 0
+        for _ in range(repeat):
+            queryset = backend.search(Offers.objects.all(), terms)
+            start = time.perf_counter()
+            list(queryset[:20])
+            page_timings.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            matches = queryset.count()
+            count_timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(page_timings), statistics.median(count_timings), matches
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from core import thumbnails
+from coder_app.models import Offers
+from profile_app.models import Profile
+
+TARGETS = [
+    (Offers, 'image', 'image_derivatives'),
+    (Profile, 'file', 'file_derivatives'),
+]
+
+
+class Command(BaseCommand):
+    """
+    Generate the thumbnails of existing offer images and profile pictures.
+
+    Purpose:
+        - Backfills derivatives for uploads made before the thumbnail
+          pipeline existed or while Pillow was not installed, and rebuilds
+          them after THUMBNAIL_SIZES or THUMBNAIL_FORMATS changed (--all).
+
+    Behavior:
+        - Runs synchronously in this process, one upload at a time.
+        - Without --all, only uploads whose derivatives are missing or
+          belong to another file are processed.
+    """
+    help = 'Generate thumbnail derivatives for Offers.image and Profile.file uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate existing derivatives too.')
+
+    def handle(self, *args, **options):
+        if not thumbnails.available():
+            raise CommandError('Pillow is not installed.')
+        generated = failed = 0
+        for model, field, derivatives_field in TARGETS:
+            rows = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+            for pk, source, derivatives in rows.values_list('pk', field, derivatives_field).iterator():
+                if not isinstance(source, str):
+                    continue
+                if not options['all'] and (derivatives or {}).get('source') == source:
+                    continue
+                try:
+                    storage = model._meta.get_field(field).storage
+                    thumbnails.store(model, pk, field, derivatives_field, source, thumbnails.render_derivatives(storage, source))
+                    generated += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{model.__name__} {pk}: {source}: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives for {generated} uploads, {failed} failed.'))
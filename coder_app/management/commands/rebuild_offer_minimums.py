@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min, OuterRef, Subquery
+from coder_app.models import Offers, OfferDetails
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the denormalized min_price / min_delivery_time columns on Offers.
+
+    Purpose:
+        - Repairs the cached minimums after manual data changes or imports
+          that bypassed the offer serializers.
+
+    Behavior:
+        - Recomputes both columns for every offer with one UPDATE statement.
+        - Offers without details end up with NULL minimums.
+    """
+    help = 'Recompute Offers.min_price and Offers.min_delivery_time from OfferDetails.'
+
+    def handle(self, *args, **options):
+        details = OfferDetails.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+        with transaction.atomic():
+            updated = Offers.objects.update(
+                min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+                min_delivery_time=Subquery(details.annotate(value=Min('delivery_time')).values('value')),
+            )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt minimums for {updated} offers.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from coder_app.models import Offers, Orders, BusinessRating
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the denormalized order_count / rating / popularity columns on Offers.
+
+    Purpose:
+        - Repairs the sort columns after data changes that bypassed the
+          order and review views (imports, bulk inserts, raw updates) or
+          after changing OFFER_POPULARITY_RATING_WEIGHT.
+
+    Behavior:
+        - Recomputes order_count from Orders and rating from BusinessRating
+          with one UPDATE, then popularity from both with a second one.
+        - Run `manage.py reconcile_business_ratings` first if the business
+          ratings themselves may have drifted.
+    """
+    help = 'Recompute Offers.order_count, Offers.rating and Offers.popularity.'
+
+    def handle(self, *args, **options):
+        orders = (
+            Orders.objects.filter(offer_detail__offer=OuterRef('pk')).order_by()
+            .values('offer_detail__offer').annotate(total=Count('id')).values('total')
+        )
+        ratings = BusinessRating.objects.filter(business_user=OuterRef('user')).values('average_rating')
+        with transaction.atomic():
+            updated = Offers.objects.update(
+                order_count=Coalesce(Subquery(orders), Value(0), output_field=IntegerField()),
+                rating=Coalesce(Subquery(ratings), Value(0.0), output_field=FloatField()),
+            )
+            Offers.objects.update(popularity=Offers.popularity_for(F('order_count'), F('rating')))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt scores for {updated} offers.'))
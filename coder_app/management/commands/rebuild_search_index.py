@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from coder_app.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the offer full-text search index.
+
+    Purpose:
+        - Re-indexes offers written without signals (bulk_create, raw SQL,
+          data imports). Backends that index inside the database
+          (PostgreSQL generated column) need no rebuild.
+    """
+    help = 'Rebuild the full-text index used by the offer search.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt ({backend.name} backend).'))
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Floor
+from coder_app.models import Review, BusinessRating
+
+
+class Command(BaseCommand):
+    """
+    Recompute BusinessRating from Review and report drift.
+
+    Purpose:
+        - Verifies the running review aggregates used by the business
+          profiles and rating endpoints against the actual Review table.
+
+    Behavior:
+        - Aggregates reviews per business and whole rate in one query.
+        - Prints one line per business whose count, average or histogram
+          differ.
+        - Rewrites the drifted rows (and deletes rows of businesses without
+          reviews) unless --dry-run is given.
+    """
+    help = 'Recompute per-business review aggregates from Review and report drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drift, do not fix it.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            actual = {}
+            rows = (
+                Review.objects.annotate(bucket=Floor('rate')).values('business_user', 'bucket')
+                .annotate(total=Count('id'), rate_sum=Sum('rate')).order_by()
+            )
+            for row in rows:
+                entry = actual.setdefault(row['business_user'], BusinessRating(business_user_id=row['business_user']))
+                entry.histogram[BusinessRating.bucket(row['bucket'])] += row['total']
+                entry.review_count += row['total']
+                entry.rating_sum += row['rate_sum']
+            for entry in actual.values():
+                entry.average_rating = entry.rating_sum / entry.review_count
+
+            stored = {
+                rating.business_user_id: rating
+                for rating in BusinessRating.objects.select_for_update()
+            }
+
+            to_create, to_update, to_delete = [], [], []
+            for business_user_id in actual.keys() | stored.keys():
+                expected = actual.get(business_user_id)
+                rating = stored.get(business_user_id)
+                current = rating.summary() if rating else None
+                if expected is None:
+                    if not rating.review_count:
+                        continue
+                    to_delete.append(business_user_id)
+                    self.stdout.write(f'business {business_user_id}: {rating.review_count} reviews -> none')
+                    continue
+                if current == expected.summary():
+                    continue
+                before = f'{current["review_count"]} reviews, avg {current["average_rating"]}' if current else 'missing'
+                self.stdout.write(
+                    f'business {business_user_id}: {before} -> '
+                    f'{expected.review_count} reviews, avg {expected.summary()["average_rating"]}'
+                )
+                if rating is None:
+                    to_create.append(expected)
+                else:
+                    for field in ('review_count', 'rating_sum', 'average_rating', 'histogram'):
+                        setattr(rating, field, getattr(expected, field))
+                    to_update.append(rating)
+
+            drifted = len(to_create) + len(to_update) + len(to_delete)
+            if options['dry_run']:
+                self.stdout.write(f'{drifted} businesses drifted (dry run, nothing changed).')
+                return
+            BusinessRating.objects.bulk_create(to_create, batch_size=1000)
+            BusinessRating.objects.bulk_update(
+                to_update, ['review_count', 'rating_sum', 'average_rating', 'histogram'], batch_size=1000,
+            )
+            BusinessRating.objects.filter(business_user_id__in=to_delete).delete()
+        self.stdout.write(self.style.SUCCESS(f'{drifted} businesses drifted and were fixed.'))
@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from coder_app.models import Orders, OrderEvent, BusinessOrderStats, empty_completion_histogram
+
+COUNTERS = [status for status, _ in Orders.Status.choices]
+TIMINGS = ['completion_histogram', 'completion_time_sum']
+
+
+def empty_timings():
+    return {'completion_histogram': empty_completion_histogram(), 'completion_time_sum': 0}
+
+
+class Command(BaseCommand):
+    """
+    Recompute BusinessOrderStats from Orders and OrderEvent and report drift.
+
+    Purpose:
+        - Verifies the materialized order counters used by the order-count
+          endpoints against the actual Orders table, and the
+          time-to-complete histograms of the business dashboard against the
+          completion events.
+
+    Behavior:
+        - Prints one line per business whose counters differ.
+        - Rewrites the drifted rows unless --dry-run is given.
+    """
+    help = 'Recompute per-business order counters and completion times and report drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drift, do not fix it.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            actual = {}
+            rows = Orders.objects.values('business_user', 'status').annotate(total=Count('id')).order_by()
+            for row in rows:
+                actual.setdefault(row['business_user'], dict.fromkeys(COUNTERS, 0))[row['status']] = row['total']
+
+            timings = {}
+            # Events of deleted orders are kept for the record but no longer count.
+            completions = (
+                OrderEvent.objects.filter(to_status=Orders.Status.completed, order__isnull=False)
+                .values_list('business_user', 'duration')
+            )
+            for business_user_id, duration in completions.iterator(chunk_size=2000):
+                entry = timings.setdefault(business_user_id, empty_timings())
+                entry['completion_histogram'][BusinessOrderStats.completion_bucket(duration)] += 1
+                entry['completion_time_sum'] += duration
+
+            stored = {
+                stats.business_user_id: stats
+                for stats in BusinessOrderStats.objects.select_for_update()
+            }
+
+            to_create, to_update = [], []
+            for business_user_id in actual.keys() | timings.keys() | stored.keys():
+                expected = actual.get(business_user_id, dict.fromkeys(COUNTERS, 0))
+                expected_timings = timings.get(business_user_id) or empty_timings()
+                stats = stored.get(business_user_id)
+                current = {status: getattr(stats, status) for status in COUNTERS} if stats else dict.fromkeys(COUNTERS, 0)
+                current_histogram = stats.completion_histogram if stats else empty_completion_histogram()
+                current_sum = stats.completion_time_sum if stats else 0
+                timings_drifted = (
+                    current_histogram != expected_timings['completion_histogram']
+                    or abs(current_sum - expected_timings['completion_time_sum']) > 1
+                )
+                if current == expected and not timings_drifted:
+                    continue
+                drift = [
+                    f'{status} {current[status]} -> {expected[status]}'
+                    for status in COUNTERS if current[status] != expected[status]
+                ]
+                if timings_drifted:
+                    drift.append(f'completion histogram {current_histogram} -> {expected_timings["completion_histogram"]}')
+                self.stdout.write(f'business {business_user_id}: {", ".join(drift)}')
+                if stats is None:
+                    to_create.append(BusinessOrderStats(business_user_id=business_user_id, **expected, **expected_timings))
+                else:
+                    for field, value in {**expected, **expected_timings}.items():
+                        setattr(stats, field, value)
+                    to_update.append(stats)
+
+            drifted = len(to_create) + len(to_update)
+            if options['dry_run']:
+                self.stdout.write(f'{drifted} businesses drifted (dry run, nothing changed).')
+                return
+            BusinessOrderStats.objects.bulk_create(to_create, batch_size=1000)
+            BusinessOrderStats.objects.bulk_update(to_update, COUNTERS + TIMINGS, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f'{drifted} businesses drifted and were fixed.'))
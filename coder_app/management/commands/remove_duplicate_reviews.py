@@ -0,0 +1,69 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from coder_app.models import Review, BusinessRating
+from coder_app.stats import invalidate_platform_stats
+
+
+class Command(BaseCommand):
+    """
+    Delete duplicate reviews so unique_review_per_business can be added.
+
+    Purpose:
+        - Resolves the (reviewer, business_user) pairs with more than one
+          review that make migration coder_app 0003 refuse to run.
+
+    Behavior:
+        - Keeps the newest review (highest id) of each pair and deletes the
+          others, printing every deleted review.
+        - Only reports with --dry-run.
+        - Usually runs while coder_app is migrated only up to 0002, before
+          the BusinessRating table exists, so the rows are deleted with a
+          plain SQL DELETE that sends no Review signals. Afterwards the
+          review aggregates are brought back in line: the later migrations
+          build BusinessRating from the remaining reviews, and when the
+          table already exists the command runs reconcile_business_ratings
+          itself. The cached platform stats are dropped either way.
+    """
+    help = 'Delete all but the newest review of each (reviewer, business_user) pair.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report duplicates, do not delete them.')
+
+    def handle(self, *args, **options):
+        deleted, to_delete = 0, []
+        with transaction.atomic():
+            duplicates = (
+                Review.objects.values('reviewer', 'business_user')
+                .annotate(keep_id=Max('id'), total=Count('id'))
+                .filter(total__gt=1)
+                .order_by()
+            )
+            for pair in duplicates:
+                extra = Review.objects.filter(
+                    reviewer=pair['reviewer'], business_user=pair['business_user'],
+                ).exclude(id=pair['keep_id'])
+                for review_id, rate in extra.values_list('id', 'rate'):
+                    self.stdout.write(
+                        f'review {review_id} (reviewer {pair["reviewer"]}, business {pair["business_user"]}, '
+                        f'rate {rate}) duplicates review {pair["keep_id"]}'
+                    )
+                    deleted += 1
+                    to_delete.append(review_id)
+            if options['dry_run']:
+                self.stdout.write(f'{deleted} duplicate reviews found (dry run, nothing deleted).')
+                return
+            self.delete_rows(to_delete)
+            transaction.on_commit(invalidate_platform_stats)
+            if to_delete and BusinessRating._meta.db_table in connection.introspection.table_names():
+                call_command('reconcile_business_ratings', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'{deleted} duplicate reviews deleted.'))
+
+    def delete_rows(self, ids, batch_size=500):
+        # Review signals need tables that do not exist before migration 0003.
+        table = connection.ops.quote_name(Review._meta.db_table)
+        with connection.cursor() as cursor:
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                cursor.execute(f'DELETE FROM {table} WHERE id IN ({", ".join(["%s"] * len(batch))})', batch)
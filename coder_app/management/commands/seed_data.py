@@ -0,0 +1,59 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from auth_app.models import User
+from ._seed import make_rng, seed_users, seed_offers, seed_orders, seed_reviews, rebuild_derived
+
+
+class Command(BaseCommand):
+    """
+    Generate a reproducible synthetic dataset at a configurable scale.
+
+    Purpose:
+        - Fills a development or staging database with business and
+          customer users (with profiles), offers with a basic, standard and
+          premium detail each, orders and reviews, e.g. as the baseline for
+          `manage.py benchmark_endpoints --no-seed`.
+
+    Behavior:
+        - Rows are written with bulk_create in batches, in one transaction.
+        - The same --seed always produces the same dataset.
+        - Usernames are '<prefix>_business_<n>' and '<prefix>_customer_<n>'
+          (password 'benchmark'); the command refuses to run if that prefix
+          is already in use.
+        - Order counters, business ratings, offer scores, the search index
+          and the platform statistics are rebuilt afterwards, since
+          bulk_create bypasses the code that maintains them.
+    """
+    help = 'Generate a synthetic dataset (users, profiles, offers, orders, reviews) with bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--businesses', type=int, default=100)
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--offers', type=int, default=10000)
+        parser.add_argument('--orders', type=int, default=50000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default='seed')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if options['businesses'] < 1 or options['customers'] < 1:
+            raise CommandError('At least one business and one customer are needed.')
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Users with the prefix {prefix!r} already exist; pass another --prefix.')
+
+        rng = make_rng(options['seed'])
+        start = time.perf_counter()
+        with transaction.atomic():
+            businesses = seed_users(options['businesses'], User.UserType.business, f'{prefix}_business', rng)
+            customers = seed_users(options['customers'], User.UserType.customer, f'{prefix}_customer', rng)
+            self.stdout.write(f'{len(businesses)} businesses and {len(customers)} customers created...')
+            details = seed_offers(businesses, options['offers'], rng)
+            self.stdout.write(f'{options["offers"]} offers with {len(details)} details created...')
+            if details:
+                seed_orders(customers, details, options['orders'], rng)
+            seed_reviews(customers, businesses, options['reviews'], rng)
+            self.stdout.write('Orders and reviews created, rebuilding derived data...')
+            rebuild_derived()
+        self.stdout.write(self.style.SUCCESS(f'Dataset generated in {time.perf_counter() - start:.1f}s.'))
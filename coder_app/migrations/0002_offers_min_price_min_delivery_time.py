@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:54
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+
+def backfill_minimums(apps, schema_editor):
+    Offers = apps.get_model('coder_app', 'Offers')
+    OfferDetails = apps.get_model('coder_app', 'OfferDetails')
+    details = OfferDetails.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+    Offers.objects.update(
+        min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+        min_delivery_time=Subquery(details.annotate(value=Min('delivery_time')).values('value')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offers',
+            name='min_delivery_time',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='offers',
+            name='min_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_minimums, migrations.RunPython.noop),
+    ]
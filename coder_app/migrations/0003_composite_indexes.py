@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:55
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_reviews(apps, schema_editor):
+    """
+    Review creation used to check the one-review-per-business rule in
+    Python only. Refuse to continue if that let duplicates in rather than
+    deleting user reviews here; `manage.py remove_duplicate_reviews`
+    resolves them explicitly.
+    """
+    Review = apps.get_model('coder_app', 'Review')
+    duplicates = list(
+        Review.objects.values('reviewer', 'business_user').annotate(n=Count('id')).filter(n__gt=1)
+        .order_by().values_list('reviewer', 'business_user')[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot add unique_review_per_business, these (reviewer, business_user) pairs have more than one '
+            'review: ' + ', '.join(f'({reviewer}, {business})' for reviewer, business in duplicates)
+            + '. Run `manage.py remove_duplicate_reviews` first.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0002_offers_min_price_min_delivery_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offerdetails',
+            index=models.Index(fields=['offer', 'price'], name='offerdetails_offer_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offerdetails',
+            index=models.Index(fields=['offer', 'delivery_time'], name='offerdetails_offer_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orders',
+            index=models.Index(fields=['business_user', 'status'], name='orders_business_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['business_user', '-updated_at'], name='review_business_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['reviewer', '-updated_at'], name='review_reviewer_updated_idx'),
+        ),
+        migrations.RunPython(check_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('reviewer', 'business_user'), name='unique_review_per_business'),
+        ),
+    ]
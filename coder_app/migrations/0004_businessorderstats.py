@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_order_stats(apps, schema_editor):
+    Orders = apps.get_model('coder_app', 'Orders')
+    BusinessOrderStats = apps.get_model('coder_app', 'BusinessOrderStats')
+    stats = {}
+    rows = Orders.objects.values('business_user', 'status').annotate(total=Count('id')).order_by()
+    for row in rows:
+        entry = stats.setdefault(row['business_user'], BusinessOrderStats(business_user_id=row['business_user']))
+        setattr(entry, row['status'], row['total'])
+    BusinessOrderStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0001_initial'),
+        ('coder_app', '0003_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessOrderStats',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('canceled', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_order_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations, OperationalError
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                'CREATE VIRTUAL TABLE coder_app_offers_fts USING fts5(title, description)'
+            )
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to the simple backend.
+            return
+        schema_editor.execute(
+            'INSERT INTO coder_app_offers_fts (rowid, title, description) '
+            'SELECT id, title, description FROM coder_app_offers'
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE coder_app_offers ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+        )
+        schema_editor.execute(
+            'CREATE INDEX coder_app_offers_search_idx ON coder_app_offers USING GIN (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS coder_app_offers_fts')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS coder_app_offers_search_idx')
+        schema_editor.execute('ALTER TABLE coder_app_offers DROP COLUMN IF EXISTS search_vector')
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search index for offer title/description (see coder_app/search.py).
+
+    SQLite gets a standalone FTS5 table kept in sync by the Offers signals
+    (triggers would be lost whenever Django remakes the offers table);
+    PostgreSQL gets a generated tsvector column with a GIN index.
+    """
+
+    dependencies = [
+        ('coder_app', '0004_businessorderstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:18
+
+import coder_app.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Floor
+
+
+def backfill_business_ratings(apps, schema_editor):
+    Review = apps.get_model('coder_app', 'Review')
+    BusinessRating = apps.get_model('coder_app', 'BusinessRating')
+    ratings = {}
+    rows = (
+        Review.objects.annotate(bucket=Floor('rate')).values('business_user', 'bucket')
+        .annotate(total=Count('id'), rate_sum=Sum('rate')).order_by()
+    )
+    for row in rows:
+        entry = ratings.setdefault(row['business_user'], BusinessRating(
+            business_user_id=row['business_user'], histogram=[0] * 11,
+        ))
+        entry.histogram[min(int(row['bucket']), 10)] += row['total']
+        entry.review_count += row['total']
+        entry.rating_sum += row['rate_sum']
+    for entry in ratings.values():
+        entry.average_rating = entry.rating_sum / entry.review_count
+    BusinessRating.objects.bulk_create(ratings.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0002_unique_user_email'),
+        ('coder_app', '0005_offer_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessRating',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+                ('average_rating', models.FloatField(db_index=True, default=0)),
+                ('histogram', models.JSONField(default=coder_app.models.empty_histogram)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_business_ratings, migrations.RunPython.noop),
+    ]
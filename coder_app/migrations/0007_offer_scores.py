@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_offer_scores(apps, schema_editor):
+    Offers = apps.get_model('coder_app', 'Offers')
+    Orders = apps.get_model('coder_app', 'Orders')
+    BusinessRating = apps.get_model('coder_app', 'BusinessRating')
+    orders = (
+        Orders.objects.filter(offer_detail__offer=OuterRef('pk')).order_by()
+        .values('offer_detail__offer').annotate(total=Count('id')).values('total')
+    )
+    ratings = BusinessRating.objects.filter(business_user=OuterRef('user')).values('average_rating')
+    Offers.objects.update(
+        order_count=Coalesce(Subquery(orders), Value(0), output_field=IntegerField()),
+        rating=Coalesce(Subquery(ratings), Value(0.0), output_field=FloatField()),
+    )
+    weight = getattr(settings, 'OFFER_POPULARITY_RATING_WEIGHT', 10)
+    Offers.objects.update(popularity=F('order_count') + weight * F('rating'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0006_businessrating'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offers',
+            name='order_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='offers',
+            name='popularity',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='offers',
+            name='rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_offer_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='offers',
+            index=models.Index(fields=['order_count', 'id'], name='offers_order_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offers',
+            index=models.Index(fields=['rating', 'id'], name='offers_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offers',
+            index=models.Index(fields=['popularity', 'id'], name='offers_popularity_idx'),
+        ),
+    ]
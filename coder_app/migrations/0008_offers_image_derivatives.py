@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0007_offer_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offers',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
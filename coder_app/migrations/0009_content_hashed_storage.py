@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:28
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0008_offers_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='offers',
+            name='image',
+            field=models.FileField(default=True, null=True, storage=core.storage.ContentHashedStorage(), upload_to='Offers/'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:33
+
+import coder_app.models
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from bisect import bisect_left
+from django.db import migrations, models
+
+
+def backfill_order_events(apps, schema_editor):
+    """
+    Log one event per closed order, dated at its updated_at (the best
+    estimate of when it was closed), and fill the completion histograms.
+    """
+    Orders = apps.get_model('coder_app', 'Orders')
+    OrderEvent = apps.get_model('coder_app', 'OrderEvent')
+    BusinessOrderStats = apps.get_model('coder_app', 'BusinessOrderStats')
+    timings = {}
+    events = []
+    closed = Orders.objects.exclude(status='in_progress').values_list(
+        'id', 'business_user_id', 'status', 'created_at', 'updated_at',
+    )
+    for order_id, business_user_id, status, created_at, updated_at in closed.iterator(chunk_size=2000):
+        duration = max((updated_at - created_at).total_seconds(), 0)
+        events.append(OrderEvent(
+            order_id=order_id, business_user_id=business_user_id, from_status='in_progress',
+            to_status=status, duration=duration, created_at=updated_at,
+        ))
+        if status == 'completed':
+            histogram, total = timings.get(business_user_id, (coder_app.models.empty_completion_histogram(), 0))
+            histogram[bisect_left(coder_app.models.COMPLETION_TIME_BUCKETS, duration)] += 1
+            timings[business_user_id] = (histogram, total + duration)
+        if len(events) >= 2000:
+            OrderEvent.objects.bulk_create(events)
+            events = []
+    OrderEvent.objects.bulk_create(events)
+    for business_user_id, (histogram, total) in timings.items():
+        BusinessOrderStats.objects.filter(business_user_id=business_user_id).update(
+            completion_histogram=histogram, completion_time_sum=total,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0009_content_hashed_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessorderstats',
+            name='completion_histogram',
+            field=models.JSONField(default=coder_app.models.empty_completion_histogram),
+        ),
+        migrations.AddField(
+            model_name='businessorderstats',
+            name='completion_time_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('in_progress', 'in_progress'), ('completed', 'completed'), ('canceled', 'canceled')], max_length=20)),
+                ('to_status', models.CharField(choices=[('in_progress', 'in_progress'), ('completed', 'completed'), ('canceled', 'canceled')], max_length=20)),
+                ('duration', models.FloatField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('business_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_events', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='coder_app.orders')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business_user', 'to_status'], name='orderevent_business_to_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_order_events, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,12 @@
-from django.db import models
+from bisect import bisect_left
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Min
+from django.utils import timezone
 from auth_app.models import User
+from coder_app import response_cache
+from core.storage import ContentHashedStorage
+from jobs_app.queue import enqueue
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -10,23 +17,98 @@ class Offers(models.Model):
     Fields:
         - user: The business user who owns the offer.
         - title: Title of the offer.
-        - image: Optional image associated with the offer.
+        - image: Optional image associated with the offer, stored under a
+          content-hashed name (see core/storage.py).
         - description: Detailed description of the offer.
         - created_at: Timestamp when the offer was created.
         - updated_at: Timestamp when the offer was last updated.
+        - min_price: Cheapest price across the offer's details (denormalized).
+        - min_delivery_time: Shortest delivery time across the offer's details (denormalized).
+        - order_count: Number of orders placed for the offer's details (denormalized).
+        - rating: The owner's average review rating (denormalized from BusinessRating).
+        - popularity: order_count + OFFER_POPULARITY_RATING_WEIGHT * rating.
+        - image_derivatives: Names of the image's thumbnails (see core/thumbnails.py).
 
     Usage:
         - Main model for storing offers.
         - Linked to OfferDetails for pricing, delivery, and features.
+        - min_price and min_delivery_time are kept in sync by the offer serializers
+          and can be rebuilt with `manage.py rebuild_offer_minimums`.
+        - order_count, rating and popularity back the list orderings of the
+          same names. They are updated incrementally by `record_orders` and
+          `apply_business_rating` (from a background job after review
+          changes) and can be rebuilt with
+          `manage.py rebuild_offer_scores`.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
-    image = models.FileField(upload_to='Offers/', default=True, null=True,)
+    image = models.FileField(upload_to='Offers/', storage=ContentHashedStorage(), default=True, null=True,)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, db_index=True)
+    min_delivery_time = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    order_count = models.IntegerField(default=0)
+    rating = models.FloatField(default=0)
+    popularity = models.FloatField(default=0)
+    image_derivatives = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        # (key, id) pairs match the order and keyset filters of the list orderings.
+        indexes = [
+            models.Index(fields=['order_count', 'id'], name='offers_order_count_idx'),
+            models.Index(fields=['rating', 'id'], name='offers_rating_idx'),
+            models.Index(fields=['popularity', 'id'], name='offers_popularity_idx'),
+        ]
+
     def __str__(self):
         return self.title
+
+    @staticmethod
+    def popularity_for(order_count, rating):
+        """Popularity score; works on numbers and on F() expressions alike."""
+        return order_count + getattr(settings, 'OFFER_POPULARITY_RATING_WEIGHT', 10) * rating
+
+    def apply_rating(self, rating):
+        """Set rating and popularity for an unsaved offer (no query, no save)."""
+        self.rating = rating
+        self.popularity = self.popularity_for(self.order_count, rating)
+
+    @classmethod
+    def record_orders(cls, delta, **lookup):
+        """
+        Add `delta` to order_count (and popularity) of the offers matching
+        `lookup`, e.g. details__id=<offer detail id>, in a single UPDATE.
+        """
+        cls.objects.filter(**lookup).update(
+            order_count=F('order_count') + delta,
+            popularity=F('popularity') + delta,
+        )
+
+    @classmethod
+    def apply_business_rating(cls, business_user_id, rating):
+        """Copy a business's new average rating onto all its offers in a single UPDATE."""
+        cls.objects.filter(user_id=business_user_id).update(
+            rating=rating,
+            popularity=cls.popularity_for(F('order_count'), rating),
+        )
+
+    def apply_minimums(self, details):
+        """Set min_price and min_delivery_time from in-memory details (no query, no save)."""
+        details = list(details)
+        self.min_price = min((detail.price for detail in details), default=None)
+        self.min_delivery_time = min((detail.delivery_time for detail in details), default=None)
+
+    def refresh_minimums(self):
+        """
+        Recompute min_price and min_delivery_time from the offer's details
+        and write them with a single UPDATE (updated_at is left untouched).
+        """
+        minimums = self.details.aggregate(min_price=Min('price'), min_delivery_time=Min('delivery_time'))
+        self.min_price = minimums['min_price']
+        self.min_delivery_time = minimums['min_delivery_time']
+        Offers.objects.filter(pk=self.pk).update(**minimums)
+        response_cache.invalidate_offer(self.pk)
     
 
 
@@ -63,6 +145,13 @@ class OfferDetails(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     features = models.JSONField()
     offer_type = models.CharField(max_length=20, choices=OfferTyp.choices, default=OfferTyp.basic)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['offer', 'price'], name='offerdetails_offer_price_idx'),
+            models.Index(fields=['offer', 'delivery_time'], name='offerdetails_offer_time_idx'),
+        ]
+
     def __str__(self):
         return self.title
     
@@ -81,6 +170,9 @@ class Orders(models.Model):
     Usage:
         - Tracks the lifecycle of customer orders.
         - Used for order management and business statistics.
+        - Status changes must follow TRANSITIONS (in_progress -> completed
+          or canceled; both are final) and go through `record_transitions`,
+          which appends OrderEvents and updates BusinessOrderStats.
     """
 
     class Status(models.TextChoices):
@@ -88,6 +180,10 @@ class Orders(models.Model):
         completed = 'completed', 'completed'
         canceled = 'canceled', 'canceled'
 
+    TRANSITIONS = {
+        Status.in_progress: (Status.completed, Status.canceled),
+    }
+
     customer_user = models.ForeignKey(User, related_name='customer_orders', on_delete=models.CASCADE)
     business_user = models.ForeignKey(User, related_name='business_orders', on_delete=models.CASCADE)
     offer_detail = models.ForeignKey(OfferDetails, related_name='details', on_delete=models.CASCADE)
@@ -95,9 +191,120 @@ class Orders(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.in_progress)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['business_user', 'status'], name='orders_business_status_idx'),
+        ]
+
     def __str__(self):
         return f"Order {self.id} by {self.customer_user.username}"
-    
+
+    @classmethod
+    def can_transition(cls, old_status, new_status):
+        return new_status in cls.TRANSITIONS.get(old_status, ())
+
+    @classmethod
+    def record_transitions(cls, business_user_id, orders, new_status):
+        """
+        Book already applied status changes of one business's orders.
+
+        `orders` are (id, old_status, created_at) tuples of orders moved to
+        `new_status`. Appends one OrderEvent per order with a single bulk
+        insert and updates BusinessOrderStats (counters and, for
+        completions, the time-to-complete histogram). Must run in the
+        transaction that changed the orders.
+        """
+        if not orders:
+            return
+        now = timezone.now()
+        events = [
+            OrderEvent(
+                order_id=order_id, business_user_id=business_user_id, from_status=old_status,
+                to_status=new_status, created_at=now, duration=(now - created_at).total_seconds(),
+            )
+            for order_id, old_status, created_at in orders
+        ]
+        OrderEvent.objects.bulk_create(events, batch_size=1000)
+        deltas = {new_status: len(orders)}
+        for _, old_status, _ in orders:
+            deltas[old_status] = deltas.get(old_status, 0) - 1
+        completion_times = [event.duration for event in events] if new_status == cls.Status.completed else ()
+        BusinessOrderStats.record_transitions(business_user_id, deltas, completion_times)
+
+    @classmethod
+    def bulk_set_status(cls, business_user_id, ids, new_status):
+        """
+        Move the given orders of one business to `new_status`.
+
+        Reads ownership and current status of all ids with one query, moves
+        the owned orders with a single UPDATE and books the changes with
+        `record_transitions`. Returns {id: result} with result one of
+        'updated', 'unchanged' (already in new_status), 'invalid_transition'
+        (e.g. a completed order), 'forbidden' (another business's order) or
+        'not_found'.
+        """
+        results = dict.fromkeys(ids, 'not_found')
+        with transaction.atomic():
+            rows = cls.objects.select_for_update().filter(id__in=results).values_list(
+                'id', 'business_user_id', 'status', 'created_at',
+            )
+            moved = []
+            for order_id, owner_id, status, created_at in rows:
+                if owner_id != business_user_id:
+                    results[order_id] = 'forbidden'
+                elif status == new_status:
+                    results[order_id] = 'unchanged'
+                elif not cls.can_transition(status, new_status):
+                    results[order_id] = 'invalid_transition'
+                else:
+                    results[order_id] = 'updated'
+                    moved.append((order_id, status, created_at))
+            if moved:
+                cls.objects.filter(id__in=[order[0] for order in moved], business_user_id=business_user_id).update(
+                    status=new_status, updated_at=timezone.now(),
+                )
+                cls.record_transitions(business_user_id, moved, new_status)
+        return results
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only log of order status changes.
+
+    Fields:
+        - order: The order that changed; NULL once the order is deleted, so
+          the history outlives it.
+        - business_user: The order's business (denormalized for per-business scans).
+        - from_status / to_status: The transition.
+        - duration: Seconds between the order's creation and this change.
+        - created_at: When the change happened.
+
+    Usage:
+        - Written in bulk by `Orders.record_transitions`, never updated.
+        - Source of truth for the time-to-complete histograms in
+          BusinessOrderStats; `manage.py reconcile_order_stats` rebuilds
+          them from the events of orders that still exist.
+    """
+    order = models.ForeignKey(Orders, related_name='events', null=True, on_delete=models.SET_NULL)
+    business_user = models.ForeignKey(User, related_name='order_events', on_delete=models.CASCADE)
+    from_status = models.CharField(max_length=20, choices=Orders.Status.choices)
+    to_status = models.CharField(max_length=20, choices=Orders.Status.choices)
+    duration = models.FloatField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['business_user', 'to_status'], name='orderevent_business_to_idx'),
+        ]
+
+    def __str__(self):
+        return f"Order {self.order_id}: {self.from_status} -> {self.to_status}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Order events are append-only.')
+        super().save(*args, **kwargs)
+
 
 class Review(models.Model):
     """
@@ -114,6 +321,9 @@ class Review(models.Model):
     Usage:
         - Tracks customer feedback for businesses.
         - Used for calculating average ratings and review statistics.
+
+    Constraints:
+        - A reviewer can review a given business only once.
     """
     business_user = models.ForeignKey(User, related_name='reviews', on_delete=models.CASCADE)
     reviewer = models.ForeignKey(User, related_name='given_reviews', on_delete=models.CASCADE)
@@ -122,5 +332,287 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['business_user', '-updated_at'], name='review_business_updated_idx'),
+            models.Index(fields=['reviewer', '-updated_at'], name='review_reviewer_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['reviewer', 'business_user'], name='unique_review_per_business'),
+        ]
+
     def __str__(self):
-        return f"Review for {self.business_user.username} - Rating: {self.rate}"
\ No newline at end of file
+        return f"Review for {self.business_user.username} - Rating: {self.rate}"
+
+HOUR = 60 * 60
+# Upper bounds (seconds) of the time-to-complete histogram buckets, plus an overflow bucket.
+COMPLETION_TIME_BUCKETS = tuple(hours * HOUR for hours in (1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 336, 720, 1440))
+
+
+def empty_completion_histogram():
+    return [0] * (len(COMPLETION_TIME_BUCKETS) + 1)
+
+
+class BusinessOrderStats(models.Model):
+    """
+    Materialized order counters and fulfilment timings for a business user.
+
+    Fields:
+        - business_user: The business the counters belong to (primary key).
+        - in_progress: Number of orders with status 'in_progress'.
+        - completed: Number of orders with status 'completed'.
+        - canceled: Number of orders with status 'canceled'.
+        - completion_histogram: Completed orders per time-to-complete bucket
+          (COMPLETION_TIME_BUCKETS, last entry is the overflow bucket).
+        - completion_time_sum: Total time-to-complete in seconds.
+        - updated_at: Timestamp of the last counter change.
+
+    Usage:
+        - Read by the order-count endpoints instead of COUNT(*) over Orders,
+          and by the business dashboard (median time-to-complete and
+          cancellation rate from one row).
+        - Field names match the Orders.Status values, so a status can be used
+          directly as a counter name.
+        - Kept up to date by `Orders.record_transitions`, the order
+          serializers and the Orders post_delete signal;
+          `manage.py reconcile_order_stats` repairs any drift.
+    """
+    business_user = models.OneToOneField(User, primary_key=True, related_name='order_stats', on_delete=models.CASCADE)
+    in_progress = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    canceled = models.IntegerField(default=0)
+    completion_histogram = models.JSONField(default=empty_completion_histogram)
+    completion_time_sum = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Order stats for business {self.business_user_id}"
+
+    @classmethod
+    def adjust(cls, business_user_id, **deltas):
+        """
+        Atomically add the given deltas (e.g. completed=1, in_progress=-1)
+        to a business's counters, creating the row on first increment.
+        """
+        deltas = {status: delta for status, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        changes = {status: F(status) + delta for status, delta in deltas.items()}
+        changes['updated_at'] = timezone.now()
+        if cls.objects.filter(business_user_id=business_user_id).update(**changes):
+            return
+        if all(delta < 0 for delta in deltas.values()):
+            # Nothing to decrement (e.g. the business itself is being deleted).
+            return
+        cls.objects.get_or_create(business_user_id=business_user_id)
+        cls.objects.filter(business_user_id=business_user_id).update(**changes)
+
+    @classmethod
+    def record_transition(cls, business_user_id, old_status, new_status):
+        """Move one order from old_status to new_status (either may be None)."""
+        if old_status == new_status:
+            return
+        deltas = {}
+        if old_status:
+            deltas[old_status] = -1
+        if new_status:
+            deltas[new_status] = 1
+        cls.adjust(business_user_id, **deltas)
+
+    @staticmethod
+    def completion_bucket(seconds):
+        return bisect_left(COMPLETION_TIME_BUCKETS, seconds)
+
+    @classmethod
+    def record_transitions(cls, business_user_id, deltas, completion_times=(), removed_completion_times=()):
+        """
+        Apply counter deltas, add `completion_times` (seconds) to the
+        time-to-complete histogram and take `removed_completion_times`
+        (of deleted completed orders) out of it. Without timings this is
+        `adjust`; otherwise the row is locked for the read-modify-write of
+        the JSON histogram, like BusinessRating.record.
+        """
+        if not completion_times and not removed_completion_times:
+            cls.adjust(business_user_id, **deltas)
+            return
+        with transaction.atomic():
+            stats = cls.objects.select_for_update().filter(business_user_id=business_user_id).first()
+            if stats is None:
+                if not completion_times:
+                    # Nothing to take out (e.g. the business itself is being deleted).
+                    return
+                stats, _ = cls.objects.select_for_update().get_or_create(business_user_id=business_user_id)
+            for status, delta in deltas.items():
+                setattr(stats, status, getattr(stats, status) + delta)
+            histogram = list(stats.completion_histogram)
+            for seconds in completion_times:
+                histogram[cls.completion_bucket(seconds)] += 1
+            for seconds in removed_completion_times:
+                bucket = cls.completion_bucket(seconds)
+                histogram[bucket] = max(histogram[bucket] - 1, 0)
+            stats.completion_histogram = histogram
+            stats.completion_time_sum = max(
+                stats.completion_time_sum + sum(completion_times) - sum(removed_completion_times), 0,
+            )
+            stats.save()
+
+    def median_completion_time(self):
+        """
+        Median time-to-complete in seconds, interpolated within its
+        histogram bucket (None before the first completion). Orders in the
+        overflow bucket count as its lower bound.
+        """
+        total = sum(self.completion_histogram)
+        if not total:
+            return None
+        target = total / 2
+        seen = 0
+        lower = 0
+        for upper, count in zip(COMPLETION_TIME_BUCKETS + (None,), self.completion_histogram):
+            if count and seen + count >= target:
+                if upper is None:
+                    return lower
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+    def cancellation_rate(self):
+        """Share of closed (completed or canceled) orders that were canceled."""
+        closed = self.completed + self.canceled
+        return self.canceled / closed if closed else 0
+
+    def dashboard(self):
+        completions = sum(self.completion_histogram)
+        return {
+            'in_progress': self.in_progress,
+            'completed': self.completed,
+            'canceled': self.canceled,
+            'cancellation_rate': round(self.cancellation_rate(), 4),
+            'median_time_to_complete': self.median_completion_time(),
+            'average_time_to_complete': self.completion_time_sum / completions if completions else None,
+            'time_to_complete_histogram': [
+                {'le': upper, 'count': count}
+                for upper, count in zip(COMPLETION_TIME_BUCKETS + (None,), self.completion_histogram)
+            ],
+        }
+
+    @classmethod
+    def dashboard_for(cls, business_user_id):
+        """Dashboard figures of a business, read from its single stats row."""
+        stats = cls.objects.filter(business_user_id=business_user_id).first()
+        return (stats or cls(business_user_id=business_user_id)).dashboard()
+
+    @classmethod
+    def count_for(cls, business_user_id, status):
+        """Return the counter for one status, reading a single row."""
+        count = cls.objects.filter(business_user_id=business_user_id).values_list(status, flat=True).first()
+        return count or 0
+
+    @classmethod
+    async def acount_for(cls, business_user_id, status):
+        """Async version of count_for."""
+        count = await cls.objects.filter(business_user_id=business_user_id).values_list(status, flat=True).afirst()
+        return count or 0
+
+
+def empty_histogram():
+    return [0] * 11
+
+
+class BusinessRating(models.Model):
+    """
+    Running review aggregates for a business user.
+
+    Fields:
+        - business_user: The business the aggregates belong to (primary key).
+        - review_count: Number of reviews.
+        - rating_sum: Sum of all review rates.
+        - average_rating: rating_sum / review_count (0 without reviews), indexed for ranking.
+        - histogram: Review counts per whole rate, index 0 (0.0 - 0.9) to 10 (10.0).
+        - updated_at: Timestamp of the last change.
+
+    Usage:
+        - Read by the business profile responses and the business rating
+          endpoints instead of aggregating over Review.
+        - Kept up to date through `record` by the Review post_save and
+          post_delete signals, so admin, shell and cascaded writes are
+          counted too; `manage.py reconcile_business_ratings` repairs the
+          drift left by bulk writes, which send no signals.
+    """
+    business_user = models.OneToOneField(User, primary_key=True, related_name='rating', on_delete=models.CASCADE)
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.FloatField(default=0)
+    average_rating = models.FloatField(default=0, db_index=True)
+    histogram = models.JSONField(default=empty_histogram)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Rating for business {self.business_user_id}"
+
+    @staticmethod
+    def bucket(rate):
+        return min(int(rate), 10)
+
+    def apply(self, old_rate=None, new_rate=None):
+        """Move one review from old_rate to new_rate (either may be None) in memory."""
+        histogram = list(self.histogram)
+        if old_rate is not None:
+            self.review_count -= 1
+            self.rating_sum -= old_rate
+            histogram[self.bucket(old_rate)] -= 1
+        if new_rate is not None:
+            self.review_count += 1
+            self.rating_sum += new_rate
+            histogram[self.bucket(new_rate)] += 1
+        if not self.review_count:
+            # Drop the float residue left by repeated additions/subtractions.
+            self.rating_sum = 0
+        self.histogram = histogram
+        self.average_rating = self.rating_sum / self.review_count if self.review_count else 0
+
+    @classmethod
+    def record(cls, business_user_id, old_rate=None, new_rate=None):
+        """
+        Apply one review change to a business's aggregates: a new review
+        (new_rate only), an edit (both) or a deletion (old_rate only).
+
+        The row is locked for the read-modify-write, so concurrent reviews
+        of the same business are serialized instead of losing updates. A
+        changed average is copied onto the business's offers by a
+        background job (coder_app.tasks.sync_offer_ratings).
+        """
+        from coder_app.tasks import sync_offer_ratings
+        if old_rate == new_rate:
+            return
+        with transaction.atomic():
+            rating = cls.objects.select_for_update().filter(business_user_id=business_user_id).first()
+            if rating is None:
+                if new_rate is None:
+                    return
+                rating, _ = cls.objects.select_for_update().get_or_create(business_user_id=business_user_id)
+            previous = rating.average_rating
+            rating.apply(old_rate, new_rate)
+            rating.save()
+            if rating.average_rating != previous:
+                enqueue(sync_offer_ratings, business_user_id)
+
+    @classmethod
+    def average_for(cls, business_user_id):
+        average = cls.objects.filter(business_user_id=business_user_id).values_list('average_rating', flat=True).first()
+        return average or 0
+
+    def summary(self):
+        return {
+            'review_count': self.review_count,
+            'average_rating': round(self.average_rating, 1),
+            'histogram': self.histogram,
+        }
+
+    @classmethod
+    def summary_for(cls, user):
+        """Summary for a user whose `rating` may be select_related (or missing)."""
+        try:
+            return user.rating.summary()
+        except cls.DoesNotExist:
+            return cls().summary()
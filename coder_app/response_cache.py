@@ -0,0 +1,103 @@
+"""
+Per-object response cache for GET /api/offers/<pk>/ and /api/offerdetails/<pk>/.
+
+Entries hold the serialized response data together with the offer's
+`updated_at`, which is also the source of the conditional-request
+validators (ETag and Last-Modified), for both endpoints:
+
+    - offer entries are keyed by offer id and hold one body per scheme and
+      host, since the offer response contains absolute detail URLs;
+    - offer detail entries are keyed by detail id.
+
+Entries are deleted by the Offers/OfferDetails signals in
+coder_app.signals and explicitly where bulk writes bypass signals. Saving
+or deleting a detail also bumps its offer's `updated_at`, so validators
+change whenever either response can change. OFFER_RESPONSE_CACHE_TTL bounds
+the staleness left by writes nothing sees (e.g. raw queryset updates from
+management commands).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+OFFER_KEY = 'coder_app:offer_response:{}'
+DETAIL_KEY = 'coder_app:offerdetail_response:{}'
+
+
+def _ttl():
+    return getattr(settings, 'OFFER_RESPONSE_CACHE_TTL', 600)
+
+
+def host_key(request):
+    return f'{request.scheme}://{request.get_host()}'
+
+
+def get_offer(pk, host):
+    """Return (updated_at, data) for the offer response, or None."""
+    entry = cache.get(OFFER_KEY.format(pk))
+    if entry is None or host not in entry['bodies']:
+        return None
+    return entry['updated_at'], entry['bodies'][host]
+
+
+def set_offer(pk, host, updated_at, data):
+    key = OFFER_KEY.format(pk)
+    entry = cache.get(key)
+    if entry is None or entry['updated_at'] != updated_at:
+        entry = {'updated_at': updated_at, 'bodies': {}}
+    entry['bodies'][host] = data
+    cache.set(key, entry, _ttl())
+
+
+def get_detail(pk):
+    """Return (updated_at, data) for the offer detail response, or None."""
+    entry = cache.get(DETAIL_KEY.format(pk))
+    return None if entry is None else (entry['updated_at'], entry['data'])
+
+
+async def aget_detail(pk):
+    entry = await cache.aget(DETAIL_KEY.format(pk))
+    return None if entry is None else (entry['updated_at'], entry['data'])
+
+
+def set_detail(pk, updated_at, data):
+    cache.set(DETAIL_KEY.format(pk), {'updated_at': updated_at, 'data': data}, _ttl())
+
+
+async def aset_detail(pk, updated_at, data):
+    await cache.aset(DETAIL_KEY.format(pk), {'updated_at': updated_at, 'data': data}, _ttl())
+
+
+def invalidate_offer(pk):
+    cache.delete(OFFER_KEY.format(pk))
+
+
+def invalidate_details(pks):
+    cache.delete_many([DETAIL_KEY.format(pk) for pk in pks])
+
+
+def _validators(kind, pk, updated_at):
+    etag = quote_etag(f'{kind}-{pk}-{updated_at.timestamp():.6f}')
+    return etag, int(updated_at.timestamp())
+
+
+def not_modified(request, kind, pk, updated_at):
+    """Return a 304 (or 412) response if the client's copy is current, else None."""
+    etag, last_modified = _validators(kind, pk, updated_at)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        _set_headers(response, etag, last_modified)
+    return response
+
+
+def with_validators(response, kind, pk, updated_at):
+    _set_headers(response, *_validators(kind, pk, updated_at))
+    return response
+
+
+def _set_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Authenticated content: browsers may keep it but must revalidate.
+    patch_cache_control(response, private=True, no_cache=True)
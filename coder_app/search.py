@@ -0,0 +1,140 @@
+"""
+Pluggable full-text search for offer titles and descriptions.
+
+Backends:
+    - simple: icontains over title and description (DRF SearchFilter semantics).
+    - sqlite_fts: SQLite FTS5 table `coder_app_offers_fts`, ranked by bm25.
+    - postgres: Generated `search_vector` tsvector column with a GIN index,
+      ranked by ts_rank.
+
+The backend is picked by the OFFER_SEARCH_BACKEND setting. 'auto' (the
+default) uses the full-text backend of the active database when its index
+exists and falls back to 'simple' otherwise. The FTS tables and columns are
+created by migration 0005. The SQLite index is kept in sync by the Offers
+signals in coder_app.signals; PostgreSQL maintains the generated column
+itself.
+"""
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from coder_app.models import Offers
+
+FTS_TABLE = 'coder_app_offers_fts'
+
+
+class SimpleSearchBackend:
+    """Substring search; every term must appear in the title or description."""
+    name = 'simple'
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        return queryset
+
+    def index(self, offer):
+        pass
+
+    def index_many(self, offers):
+        pass
+
+    def remove(self, offer_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SQLiteFTSSearchBackend(SimpleSearchBackend):
+    """
+    SQLite FTS5 backend.
+
+    Terms are matched as token prefixes (so 'web' finds 'website') and all
+    terms must match. Results are ordered by bm25 with title hits weighted
+    above description hits.
+    """
+    name = 'sqlite_fts'
+
+    def build_query(self, terms):
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, queryset, terms):
+        offers_table = Offers._meta.db_table
+        # Joined rather than correlated so MATCH and bm25() run once per query.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {offers_table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[self.build_query(terms)],
+            select={'search_rank': f'bm25({FTS_TABLE}, 10.0, 1.0)'},
+        ).order_by('search_rank', 'id')
+
+    def index(self, offer):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [offer.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)',
+                [offer.pk, offer.title, offer.description],
+            )
+
+    def index_many(self, offers):
+        """Index newly inserted offers (e.g. after bulk_create)."""
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)',
+                [(offer.pk, offer.title, offer.description) for offer in offers],
+            )
+
+    def remove(self, offer_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [offer_id])
+
+    def rebuild(self):
+        offers_table = Offers._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description) '
+                f'SELECT id, title, description FROM {offers_table}'
+            )
+
+
+class PostgresSearchBackend(SimpleSearchBackend):
+    """
+    PostgreSQL backend on the generated `search_vector` column.
+
+    Uses websearch_to_tsquery, so clients can send quoted phrases and
+    '-term' exclusions. Results are ordered by ts_rank, best first.
+    """
+    name = 'postgres'
+    config = 'english'
+
+    def search(self, queryset, terms):
+        text = ' '.join(terms)
+        tsquery = f"websearch_to_tsquery('{self.config}', %s)"
+        offers_table = Offers._meta.db_table
+        matches = RawSQL(f'{offers_table}.search_vector @@ {tsquery}', (text,), output_field=BooleanField())
+        rank = RawSQL(f'ts_rank({offers_table}.search_vector, {tsquery})', (text,), output_field=FloatField())
+        return queryset.filter(matches).annotate(search_rank=rank).order_by('-search_rank', 'id')
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (SimpleSearchBackend, SQLiteFTSSearchBackend, PostgresSearchBackend)
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """Return the configured search backend instance (resolved once per process)."""
+    name = getattr(settings, 'OFFER_SEARCH_BACKEND', 'auto')
+    if name != 'auto':
+        return BACKENDS[name]()
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return SQLiteFTSSearchBackend()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            columns = connection.introspection.get_table_description(cursor, Offers._meta.db_table)
+        if any(column.name == 'search_vector' for column in columns):
+            return PostgresSearchBackend()
+    return SimpleSearchBackend()
@@ -0,0 +1,145 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from auth_app.models import User
+from coder_app.models import Offers, OfferDetails, Orders, OrderEvent, Review, BusinessOrderStats, BusinessRating
+from coder_app import response_cache
+from coder_app.stats import adjust_platform_stats, invalidate_platform_stats
+from coder_app.search import get_search_backend
+from core import thumbnails
+
+
+@receiver(pre_delete, sender=Orders)
+def remember_completion_time(sender, instance, **kwargs):
+    """
+    Read a completed order's time-to-complete while its OrderEvents still
+    point at it (they are detached, not deleted, when the order goes).
+    """
+    if instance.status == Orders.Status.completed:
+        instance._completion_time = (
+            OrderEvent.objects.filter(order_id=instance.pk, to_status=Orders.Status.completed)
+            .values_list('duration', flat=True).first()
+        )
+
+
+@receiver(post_delete, sender=Orders)
+def decrement_order_stats(sender, instance, **kwargs):
+    """
+    Keep BusinessOrderStats and the offer's order_count in sync when an
+    order is deleted; a completed order's time also leaves the
+    time-to-complete histogram.
+
+    Handled as a signal so cascaded deletes (offer, offer detail or
+    customer removal) are counted as well as direct order deletes.
+    """
+    completion_time = getattr(instance, '_completion_time', None)
+    BusinessOrderStats.record_transitions(
+        instance.business_user_id, {instance.status: -1},
+        removed_completion_times=() if completion_time is None else (completion_time,),
+    )
+    Offers.record_orders(-1, details__id=instance.offer_detail_id)
+
+
+def _after_commit(**deltas):
+    transaction.on_commit(partial(adjust_platform_stats, **deltas))
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rate(sender, instance, **kwargs):
+    """Read the stored business and rate of an edited review before it is overwritten."""
+    instance._previous = None
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous = (
+            Review.objects.filter(pk=instance.pk).values_list('business_user_id', 'rate').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    """
+    Add a new review to, or move an edited one within, the platform stats
+    and the business's BusinessRating.
+
+    Review create, edit and delete (below) all update BusinessRating here,
+    so API, admin and shell writes are counted alike. bulk_create,
+    bulk_update and QuerySet.update send no signals; run
+    `manage.py reconcile_business_ratings` after using them.
+    """
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        _after_commit(review_count=1, rating_sum=instance.rate)
+        BusinessRating.record(instance.business_user_id, new_rate=instance.rate)
+        return
+    business_user_id, rate = previous
+    _after_commit(rating_sum=instance.rate - rate)
+    if business_user_id == instance.business_user_id:
+        BusinessRating.record(business_user_id, old_rate=rate, new_rate=instance.rate)
+    else:
+        BusinessRating.record(business_user_id, old_rate=rate)
+        BusinessRating.record(instance.business_user_id, new_rate=instance.rate)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Take the review out of the platform stats and the business's
+    BusinessRating. Handled as a signal so cascaded deletes (reviewer or
+    business removal) and admin deletes are counted too.
+    """
+    _after_commit(review_count=-1, rating_sum=-instance.rate)
+    BusinessRating.record(instance.business_user_id, old_rate=instance.rate)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        if instance.type == User.UserType.business:
+            _after_commit(business_profile_count=1)
+    elif update_fields is None or 'type' in update_fields:
+        # The type may have changed; logins (update_fields=['last_login']) are ignored.
+        transaction.on_commit(invalidate_platform_stats)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    if instance.type == User.UserType.business:
+        _after_commit(business_profile_count=-1)
+
+
+@receiver(post_save, sender=Offers)
+def offer_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        _after_commit(offer_count=1)
+    else:
+        transaction.on_commit(partial(response_cache.invalidate_offer, instance.pk))
+    if update_fields is None or {'title', 'description'} & set(update_fields):
+        # Written in the same transaction as the offer itself.
+        get_search_backend().index(instance)
+    if update_fields is None or 'image' in update_fields:
+        thumbnails.schedule(instance, 'image', 'image_derivatives')
+
+
+@receiver(thumbnails.derivatives_stored, sender=Offers)
+def offer_thumbnails_stored(sender, pk, **kwargs):
+    transaction.on_commit(partial(response_cache.invalidate_offer, pk))
+
+
+@receiver(post_delete, sender=Offers)
+def offer_deleted(sender, instance, **kwargs):
+    _after_commit(offer_count=-1)
+    get_search_backend().remove(instance.pk)
+    transaction.on_commit(partial(response_cache.invalidate_offer, instance.pk))
+
+
+@receiver(post_save, sender=OfferDetails)
+@receiver(post_delete, sender=OfferDetails)
+def offer_detail_changed(sender, instance, **kwargs):
+    """
+    Bump the offer's updated_at, which the cached responses' ETag and
+    Last-Modified derive from, and drop both cached responses.
+    """
+    Offers.objects.filter(pk=instance.offer_id).update(updated_at=timezone.now())
+    transaction.on_commit(partial(response_cache.invalidate_details, [instance.pk]))
+    transaction.on_commit(partial(response_cache.invalidate_offer, instance.offer_id))
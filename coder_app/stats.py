@@ -0,0 +1,84 @@
+"""
+Cached platform statistics served by /api/base-info/.
+
+The cache entry holds running sums and counts (review count, rating sum,
+business user count, offer count) instead of the finished averages, so
+model signals can adjust it incrementally after each committed write.
+
+The entry is rebuilt from the database when it is missing or older than
+PLATFORM_STATS_TTL seconds. That bounds any drift caused by writes the
+signals never see (bulk operations, other processes using a local-memory
+cache, racing read-modify-write updates).
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from auth_app.models import User
+from coder_app.models import Offers, Review
+
+CACHE_KEY = 'coder_app:platform_stats'
+
+
+def _ttl():
+    return getattr(settings, 'PLATFORM_STATS_TTL', 300)
+
+
+def compute_platform_stats():
+    """Recompute the statistics from the database."""
+    reviews = Review.objects.aggregate(review_count=Count('id'), rating_sum=Sum('rate'))
+    return {
+        'review_count': reviews['review_count'],
+        'rating_sum': reviews['rating_sum'] or 0,
+        'business_profile_count': User.objects.filter(type=User.UserType.business).count(),
+        'offer_count': Offers.objects.count(),
+        'computed_at': time.time(),
+    }
+
+
+def get_platform_stats():
+    """Return the cached statistics, rebuilding them if missing or expired."""
+    stats = cache.get(CACHE_KEY)
+    if stats is None or time.time() - stats['computed_at'] > _ttl():
+        stats = compute_platform_stats()
+        cache.set(CACHE_KEY, stats, _ttl())
+    return stats
+
+
+async def acompute_platform_stats():
+    """Async ORM version of compute_platform_stats."""
+    reviews = await Review.objects.aaggregate(review_count=Count('id'), rating_sum=Sum('rate'))
+    return {
+        'review_count': reviews['review_count'],
+        'rating_sum': reviews['rating_sum'] or 0,
+        'business_profile_count': await User.objects.filter(type=User.UserType.business).acount(),
+        'offer_count': await Offers.objects.acount(),
+        'computed_at': time.time(),
+    }
+
+
+async def aget_platform_stats():
+    """Async version of get_platform_stats, for async views."""
+    stats = await cache.aget(CACHE_KEY)
+    if stats is None or time.time() - stats['computed_at'] > _ttl():
+        stats = await acompute_platform_stats()
+        await cache.aset(CACHE_KEY, stats, _ttl())
+    return stats
+
+
+def adjust_platform_stats(**deltas):
+    """
+    Add deltas (e.g. review_count=1, rating_sum=8.0) to the cached entry.
+
+    Does nothing when no entry is cached; the next read rebuilds it.
+    """
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        return
+    for key, delta in deltas.items():
+        stats[key] += delta
+    cache.set(CACHE_KEY, stats, max(1, int(_ttl() - (time.time() - stats['computed_at']))))
+
+
+def invalidate_platform_stats():
+    cache.delete(CACHE_KEY)
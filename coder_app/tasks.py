@@ -0,0 +1,14 @@
+"""Background jobs of coder_app (see jobs_app/queue.py)."""
+from jobs_app.queue import task
+from coder_app.models import Offers, BusinessRating
+
+
+@task
+def sync_offer_ratings(business_user_id):
+    """
+    Copy a business's current average rating onto all its offers.
+
+    Reads the average when the job runs rather than when it was queued, so
+    jobs of several reviews may run in any order and still converge.
+    """
+    Offers.apply_business_rating(business_user_id, BusinessRating.average_for(business_user_id))
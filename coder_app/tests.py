@@ -1,3 +1,812 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.throttling import UserRateThrottle
+from auth_app.models import User
+from profile_app.models import Profile
+from coder_app.models import Offers, OfferDetails, Orders, OrderEvent, Review, BusinessRating, BusinessOrderStats
+from coder_app.api import async_views
+from coder_app.api.seralizers import OfferCreateSeralizer
+from coder_app.api.views import OfferDetailRetrieveView
+from coder_app.search import get_search_backend
+from core import thumbnails
+from core.testing import ListQueryCountTestCase, client_for, create_detail, create_offer, create_user, reload_urls
+from jobs_app.queue import run_pending
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - the thumbnail tests are skipped then
+    Image = None
+
+
+class OfferListQueryCountTests(TestCase):
+    """
+    Regression tests for the /api/offers/ query plan.
+
+    A page must cost the same number of queries no matter how many offers
+    it contains: one COUNT for the paginator, one SELECT for the offers
+    (joined with user and profile) and one prefetch for the detail ids.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        business = User.objects.create_user(username='business', password='pass', type='business')
+        Profile.objects.create(user=business, first_name='Biz')
+        offers = Offers.objects.bulk_create([
+            Offers(user=business, title=f'Offer {i}', image=None, description='Description', min_price=10, min_delivery_time=1)
+            for i in range(100)
+        ])
+        OfferDetails.objects.bulk_create([
+            OfferDetails(offer=offer, revisions=1, title=offer_type, delivery_time=1, price=10, features=['a'], offer_type=offer_type)
+            for offer in offers
+            for offer_type in OfferDetails.OfferTyp.values
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_query_count_is_independent_of_page_size(self):
+        for page_size in (1, 10, 100):
+            with self.subTest(page_size=page_size), self.assertNumQueries(3):
+                response = self.client.get('/api/offers/', {'page_size': page_size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_list_items_expose_precomputed_fields(self):
+        response = self.client.get('/api/offers/', {'page_size': 1})
+        offer = response.json()['results'][0]
+        self.assertEqual(len(offer['details']), 3)
+        self.assertEqual(offer['min_price'], 10)
+        self.assertEqual(offer['min_delivery_time'], 1)
+        self.assertEqual(offer['user_details']['username'], 'business')
+
+
+class ListEndpointQueryCountTests(ListQueryCountTestCase):
+    """N+1 regression tests for the order, review and business rating lists."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.customer = create_user('customer', 'customer')
+        self.detail = create_detail(create_offer(self.business))
+
+    def test_order_list(self):
+        client = client_for(self.customer)
+
+        def fill(size):
+            Orders.objects.bulk_create([
+                Orders(customer_user=self.customer, business_user=self.business, offer_detail=self.detail)
+                for _ in range(size - Orders.objects.count())
+            ])
+
+        self.assertQueriesConstant(lambda: client.get('/api/orders/', {'page_size': 100}), fill)
+
+    def test_review_list(self):
+        client = client_for(self.customer)
+
+        def fill(size):
+            start = Review.objects.count()
+            reviewers = User.objects.bulk_create([
+                User(username=f'reviewer_{i}', type='customer') for i in range(start, size)
+            ])
+            Review.objects.bulk_create([
+                Review(reviewer=reviewer, business_user=self.business, rate=5) for reviewer in reviewers
+            ])
+
+        self.assertQueriesConstant(
+            lambda: client.get('/api/reviews/', {'business_user_id': self.business.id}), fill
+        )
+
+    def test_business_rating_list(self):
+        client = client_for(self.customer)
+
+        def fill(size):
+            start = BusinessRating.objects.count()
+            businesses = User.objects.bulk_create([
+                User(username=f'rated_{i}', type='business') for i in range(start, size)
+            ])
+            BusinessRating.objects.bulk_create([
+                BusinessRating(business_user=business, review_count=1, rating_sum=5, average_rating=5)
+                for business in businesses
+            ])
+
+        self.assertQueriesConstant(lambda: client.get('/api/business-ratings/'), fill)
+
+
+@skipUnless(thumbnails.available(), 'Pillow is not installed')
+class ThumbnailTests(TestCase):
+    """Derivatives are rendered by the background job and exposed by the offer serializers."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root, THUMBNAIL_SIZES={'thumb': (32, 24)}, THUMBNAIL_FORMATS=('webp', 'jpeg'))
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        self.business = create_user('business', 'business')
+
+    def png(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (120, 80), 'red').save(buffer, 'PNG')
+        return SimpleUploadedFile('logo.png', buffer.getvalue(), content_type='image/png')
+
+    def test_derivatives_are_rendered_and_serialized(self):
+        offer = create_offer(self.business, image=self.png())
+        create_detail(offer)
+        client = client_for(self.business)
+
+        # Cached with the empty map before the job ran.
+        self.assertEqual(client.get(f'/api/offers/{offer.pk}/').json()['thumbnails'], {})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_pending(), 1)
+
+        offer.refresh_from_db()
+        names = offer.image_derivatives['thumb']
+        self.assertEqual(offer.image_derivatives['source'], offer.image.name)
+        self.assertEqual(set(names), {'webp', 'jpeg'})
+        with offer.image.storage.open(names['webp']) as derivative:
+            self.assertEqual(Image.open(derivative).size, (32, 24))
+
+        thumbs = client.get(f'/api/offers/{offer.pk}/').json()['thumbnails']
+        self.assertEqual(set(thumbs), {'thumb'})
+        self.assertTrue(thumbs['thumb']['webp'].endswith(names['webp']))
+        self.assertTrue(thumbs['thumb']['jpeg'].endswith(names['jpeg']))
+
+    def test_batch_created_offers_get_thumbnails(self):
+        details = [
+            {'title': offer_type, 'revisions': 1, 'delivery_time_in_days': 1, 'price': 10, 'features': ['a'], 'offer_type': offer_type}
+            for offer_type in ('basic', 'standard', 'premium')
+        ]
+        data = [
+            {'title': 'With image', 'description': 'D', 'image': self.png(), 'details': details},
+            {'title': 'Without image', 'description': 'D', 'image': None, 'details': details},
+        ]
+        request = RequestFactory().post('/api/offers/batch/')
+        request.user = self.business
+        serializer = OfferCreateSeralizer(data=data, many=True, context={'request': request})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            with_image, without_image = serializer.save()
+        self.assertEqual(run_pending(), 1)
+
+        with_image.refresh_from_db()
+        without_image.refresh_from_db()
+        self.assertEqual(set(with_image.image_derivatives['thumb']), {'webp', 'jpeg'})
+        self.assertEqual(without_image.image_derivatives, {})
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor links walk the offer list forwards and backwards, NULL keys included."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.client = APIClient()
+        prices = [5, 5, 10, None, 20, None, 15]
+        self.offers = [
+            Offers.objects.create(user=self.business, title=f'Offer {i}', image=None, description='D', min_price=price)
+            for i, price in enumerate(prices)
+        ]
+
+    def expected(self, descending):
+        priced = sorted((o for o in self.offers if o.min_price is not None), key=lambda o: (o.min_price, o.pk), reverse=descending)
+        unpriced = sorted((o for o in self.offers if o.min_price is None), key=lambda o: o.pk, reverse=descending)
+        return [o.pk for o in priced + unpriced]
+
+    def walk(self, url, params, link):
+        pages = []
+        while url:
+            data = self.client.get(url, params).json()
+            params = None
+            pages.append([row['id'] for row in data['results']])
+            url = data[link]
+        return pages
+
+    def test_round_trip_on_nullable_key(self):
+        for ordering in ('min_price', '-min_price'):
+            with self.subTest(ordering=ordering):
+                params = {'pagination': 'cursor', 'ordering': ordering, 'page_size': 2}
+                forward = self.walk('/api/offers/', params, 'next')
+                self.assertEqual([pk for page in forward for pk in page], self.expected(ordering.startswith('-')))
+                self.assertEqual([len(page) for page in forward], [2, 2, 2, 1])
+
+                # Back from the last page through the previous links.
+                last = self.client.get('/api/offers/', params).json()
+                while last['next']:
+                    last = self.client.get(last['next']).json()
+                backward = self.walk(last['previous'], None, 'previous')
+                self.assertEqual(backward, forward[-2::-1])
+
+    def test_invalid_cursor_and_ordering(self):
+        self.assertEqual(self.client.get('/api/offers/', {'cursor': 'not-a-cursor'}).status_code, 404)
+        response = self.client.get('/api/offers/', {'pagination': 'cursor', 'ordering': 'title'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.json())
+
+    def test_business_ratings_ascending(self):
+        client = client_for(self.business)
+        for i, average in enumerate((8, 3, 5)):
+            user = create_user(f'rated_{i}', 'business')
+            BusinessRating.objects.create(business_user=user, review_count=1, rating_sum=average, average_rating=average)
+        response = client.get('/api/business-ratings/', {'pagination': 'cursor', 'ordering': 'average_rating'})
+        self.assertEqual([row['average_rating'] for row in response.json()['results']], [3, 5, 8])
+
+
+class BusinessRatingTests(TestCase):
+    """BusinessRating follows every review create, edit and delete, through the API or the ORM."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.customers = [create_user(f'customer_{i}', 'customer') for i in range(2)]
+
+    def assertRating(self, count, rating_sum, buckets):
+        rating = BusinessRating.objects.get(business_user=self.business)
+        self.assertEqual((rating.review_count, rating.rating_sum), (count, rating_sum))
+        self.assertEqual(rating.average_rating, rating_sum / count if count else 0)
+        self.assertEqual({i: n for i, n in enumerate(rating.histogram) if n}, buckets)
+
+    def test_orm_writes(self):
+        review = Review.objects.create(reviewer=self.customers[0], business_user=self.business, rate=4.5)
+        Review.objects.create(reviewer=self.customers[1], business_user=self.business, rate=8)
+        self.assertRating(2, 12.5, {4: 1, 8: 1})
+
+        review.rate = 9
+        review.save()
+        self.assertRating(2, 17, {8: 1, 9: 1})
+
+        review.delete()
+        self.assertRating(1, 8, {8: 1})
+
+    def test_api_writes_are_counted_once(self):
+        client = client_for(self.customers[0])
+        response = client.post('/api/reviews/', {'business_user': self.business.pk, 'rating': 6, 'description': 'ok'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertRating(1, 6, {6: 1})
+
+        review_id = Review.objects.get().pk
+        self.assertEqual(client.patch(f'/api/reviews/{review_id}/', {'rating': 3}, format='json').status_code, 200)
+        self.assertRating(1, 3, {3: 1})
+
+        self.assertEqual(client.delete(f'/api/reviews/{review_id}/').status_code, 204)
+        self.assertRating(0, 0, {})
+
+
+class OfferMinimumsTests(TestCase):
+    """Offers.min_price / min_delivery_time follow the offer's details on every write."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.client = client_for(self.business)
+
+    def create_offer(self):
+        details = [
+            {'title': offer_type, 'revisions': 1, 'delivery_time_in_days': days, 'price': price, 'features': ['a'], 'offer_type': offer_type}
+            for offer_type, price, days in (('basic', 100, 7), ('standard', 200, 5), ('premium', 300, 3))
+        ]
+        response = self.client.post('/api/offers/', {'title': 'Offer', 'description': 'D', 'image': None, 'details': details}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return Offers.objects.get(pk=response.json()['id'])
+
+    def test_create_and_update_maintain_minimums(self):
+        offer = self.create_offer()
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (100, 3))
+
+        response = self.client.patch(f'/api/offers/{offer.pk}/', {'details': [
+            {'offer_type': 'basic', 'price': 400, 'delivery_time_in_days': 9},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        offer.refresh_from_db()
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (200, 3))
+
+        listed = self.client.get('/api/offers/', {'ordering': 'min_price'}).json()['results'][0]
+        self.assertEqual((listed['min_price'], listed['min_delivery_time']), (200, 3))
+        self.assertEqual(self.client.get('/api/offers/', {'min_price': 250, 'ordering': 'min_price'}).json()['count'], 0)
+        self.assertEqual(self.client.get('/api/offers/', {'max_delivery_time': 3, 'ordering': 'min_price'}).json()['count'], 1)
+
+    def test_rebuild_command_repairs_drift(self):
+        offer = self.create_offer()
+        Offers.objects.filter(pk=offer.pk).update(min_price=1, min_delivery_time=None)
+        call_command('rebuild_offer_minimums', stdout=io.StringIO())
+        offer.refresh_from_db()
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (100, 3))
+
+
+class PlatformStatsTests(TestCase):
+    """/api/base-info/ is served from a cache entry that signals adjust after each commit."""
+
+    def setUp(self):
+        cache.clear()
+        self.business = create_user('business', 'business')
+        self.customer = create_user('customer', 'customer')
+        self.client = APIClient()
+
+    def base_info(self, queries=0):
+        with self.assertNumQueries(queries):
+            response = self.client.get('/api/base-info/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['review_count'], data['average_rating'], data['business_profile_count'], data['offer_count']
+
+    def test_writes_adjust_the_cached_entry(self):
+        # The first request builds the entry (three aggregate queries), later ones are served from the cache.
+        self.assertEqual(self.base_info(queries=3), (0, 0, 1, 0))
+        self.assertEqual(self.base_info(), (0, 0, 1, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review = Review.objects.create(reviewer=self.customer, business_user=self.business, rate=4)
+            create_offer(self.business)
+            create_user('business_2', 'business')
+        self.assertEqual(self.base_info(), (1, 4, 2, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review.rate = 8
+            review.save()
+        self.assertEqual(self.base_info(), (1, 8, 2, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review.delete()
+            Offers.objects.all().delete()
+        self.assertEqual(self.base_info(), (0, 0, 2, 0))
+
+    @override_settings(PLATFORM_STATS_TTL=0)
+    def test_expired_entry_is_rebuilt(self):
+        self.base_info(queries=3)
+        Review.objects.bulk_create([Review(reviewer=self.customer, business_user=self.business, rate=6)])
+        self.assertEqual(self.base_info(queries=3)[:2], (1, 6))
+
+
+class OfferUpdateTests(TestCase):
+    """PATCH /api/offers/<id>/ adding details that do not exist yet."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.offer = create_offer(self.business)
+        create_detail(self.offer, price=50, delivery_time=5)
+        self.client = client_for(self.business)
+
+    def test_new_detail_requires_all_fields(self):
+        detail = {'title': 'Premium', 'revisions': 3, 'delivery_time_in_days': 2, 'price': 200, 'features': ['b'], 'offer_type': 'premium'}
+        incomplete = {key: value for key, value in detail.items() if key != 'title'}
+        response = self.client.patch(f'/api/offers/{self.offer.pk}/', {'details': [incomplete]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()['details'])
+        self.assertFalse(OfferDetails.objects.filter(offer=self.offer, offer_type='premium').exists())
+
+        response = self.client.patch(f'/api/offers/{self.offer.pk}/', {'details': [detail]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        created = OfferDetails.objects.get(offer=self.offer, offer_type='premium')
+        self.assertEqual((created.title, created.delivery_time, created.price), ('Premium', 2, 200))
+        self.offer.refresh_from_db()
+        self.assertEqual((self.offer.min_price, self.offer.min_delivery_time), (50, 2))
+
+
+class ResponseCacheTests(TestCase):
+    """GET /api/offers/<pk>/ and /api/offerdetails/<pk>/ come from coder_app.response_cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.business = create_user('business', 'business')
+        self.offer = create_offer(self.business, title='Logo')
+        self.detail = create_detail(self.offer, price=50)
+        self.client = client_for(self.business)
+        self.paths = (f'/api/offers/{self.offer.pk}/', f'/api/offerdetails/{self.detail.pk}/')
+
+    def test_repeat_get_is_served_from_the_cache(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                first = self.client.get(path)
+                with self.assertNumQueries(0):
+                    second = self.client.get(path)
+                self.assertEqual(second.status_code, 200)
+                self.assertEqual(second.json(), first.json())
+                self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_validators_return_304(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+                self.assertEqual(self.client.get(path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_patch_invalidates_both_responses(self):
+        before = [self.client.get(path) for path in self.paths]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.paths[0], {
+                'title': 'Logo design', 'details': [{'offer_type': 'basic', 'price': 80}],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        offer, detail = [self.client.get(path) for path in self.paths]
+        self.assertEqual(offer.json()['title'], 'Logo design')
+        self.assertEqual(float(detail.json()['price']), 80)
+        for path, old, new in zip(self.paths, before, (offer, detail)):
+            self.assertNotEqual(new['ETag'], old['ETag'])
+            self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=old['ETag']).status_code, 200)
+
+
+class OfferSearchTests(TestCase):
+    """`?search=` on /api/offers/ through the configured full-text backend."""
+
+    def setUp(self):
+        get_search_backend.cache_clear()
+        self.addCleanup(get_search_backend.cache_clear)
+        self.business = create_user('business', 'business')
+        self.logo = create_offer(self.business, title='Logo design', description='Vector artwork for brands')
+        self.website = create_offer(self.business, title='Website', description='Landing page with a logo')
+        self.client = client_for(self.business)
+
+    def search(self, text):
+        response = self.client.get('/api/offers/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [offer['id'] for offer in response.json()['results']]
+
+    def test_finds_offers_by_title_and_description(self):
+        self.assertEqual(get_search_backend().name, 'sqlite_fts')
+        # The title match outranks the description match.
+        self.assertEqual(self.search('logo'), [self.logo.pk, self.website.pk])
+        self.assertEqual(self.search('landing'), [self.website.pk])
+        self.assertEqual(self.search('vect'), [self.logo.pk])
+        self.assertEqual(self.search('logo vector'), [self.logo.pk])
+        self.assertEqual(self.search('translation'), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.logo.title = 'Translation'
+        self.logo.save(update_fields=['title'])
+        self.assertEqual(self.search('translation'), [self.logo.pk])
+        self.assertEqual(self.search('design'), [])
+
+        self.website.delete()
+        self.assertEqual(self.search('logo'), [])
+
+    @override_settings(OFFER_SEARCH_BACKEND='simple')
+    def test_simple_backend_matches_substrings(self):
+        # setUp resolved the backend before the override applied.
+        get_search_backend.cache_clear()
+        self.assertEqual(get_search_backend().name, 'simple')
+        self.assertEqual(sorted(self.search('logo')), [self.logo.pk, self.website.pk])
+        self.assertEqual(self.search('anding pag'), [self.website.pk])
+        self.assertEqual(self.search('logo vector'), [self.logo.pk])
+
+
+class OfferScoreTests(TestCase):
+    """`?ordering=` on rating, order_count and popularity follows orders and reviews."""
+
+    def setUp(self):
+        self.customer = create_user('customer', 'customer')
+        self.ordered = create_offer(create_user('ordered', 'business'), title='Ordered')
+        self.rated_business = create_user('rated', 'business')
+        self.rated = create_offer(self.rated_business, title='Rated')
+        self.detail = create_detail(self.ordered)
+        self.client = client_for(self.customer)
+
+    def ordering(self, key):
+        response = self.client.get('/api/offers/', {'ordering': key})
+        self.assertEqual(response.status_code, 200)
+        return [offer['id'] for offer in response.json()['results']]
+
+    def scores(self, offer):
+        offer.refresh_from_db()
+        return offer.order_count, offer.rating, offer.popularity
+
+    def test_orders_and_reviews_update_the_scores(self):
+        order_ids = [
+            self.client.post('/api/orders/', {'offer_detail_id': self.detail.pk}, format='json').json()['id']
+            for _ in range(2)
+        ]
+        self.assertEqual(self.scores(self.ordered), (2, 0, 2))
+        self.assertEqual(self.ordering('-order_count'), [self.ordered.pk, self.rated.pk])
+        self.assertEqual(self.ordering('-popularity'), [self.ordered.pk, self.rated.pk])
+
+        Review.objects.create(reviewer=self.customer, business_user=self.rated_business, rate=4)
+        # The rating is copied onto the offers by a background job.
+        self.assertEqual(self.scores(self.rated), (0, 0, 0))
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(self.scores(self.rated), (0, 4, 40))
+        self.assertEqual(self.ordering('-rating'), [self.rated.pk, self.ordered.pk])
+        self.assertEqual(self.ordering('-popularity'), [self.rated.pk, self.ordered.pk])
+        # New offers start with their owner's rating.
+        details = [
+            {'title': offer_type, 'revisions': 1, 'delivery_time_in_days': 1, 'price': 10, 'features': ['a'], 'offer_type': offer_type}
+            for offer_type in ('basic', 'standard', 'premium')
+        ]
+        response = client_for(self.rated_business).post(
+            '/api/offers/', {'title': 'New', 'description': 'D', 'image': None, 'details': details}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.scores(Offers.objects.get(pk=response.json()['id'])), (0, 4, 40))
+
+        Orders.objects.get(pk=order_ids[0]).delete()
+        self.assertEqual(self.scores(self.ordered), (1, 0, 1))
+
+    def test_rebuild_offer_scores_repairs_drift(self):
+        Orders.objects.create(customer_user=self.customer, business_user=self.ordered.user, offer_detail=self.detail)
+        BusinessRating.objects.create(business_user=self.rated_business, review_count=1, rating_sum=3, average_rating=3)
+        Offers.objects.filter(pk=self.ordered.pk).update(order_count=5, popularity=5)
+        call_command('rebuild_offer_scores', stdout=io.StringIO())
+        self.assertEqual(self.scores(self.ordered), (1, 0, 1))
+        self.assertEqual(self.scores(self.rated), (0, 3, 30))
+
+
+class OrderCounterTests(TestCase):
+    """The order-count endpoints read BusinessOrderStats, which follows order writes."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.customer = create_user('customer', 'customer')
+        self.detail = create_detail(create_offer(self.business))
+        self.business_client = client_for(self.business)
+        self.customer_client = client_for(self.customer)
+
+    def counts(self):
+        in_progress = self.business_client.get(f'/api/order-count/{self.business.pk}/').json()['order_count']
+        completed = self.business_client.get(f'/api/completed-order-count/{self.business.pk}/').json()['completed_order_count']
+        return in_progress, completed
+
+    def test_counters_follow_orders(self):
+        ids = [
+            self.customer_client.post('/api/orders/', {'offer_detail_id': self.detail.pk}, format='json').json()['id']
+            for _ in range(3)
+        ]
+        self.assertEqual(self.counts(), (3, 0))
+        self.business_client.patch(f'/api/orders/{ids[0]}/', {'status': 'completed'}, format='json')
+        self.assertEqual(self.counts(), (2, 1))
+        Orders.objects.get(pk=ids[1]).delete()
+        self.assertEqual(self.counts(), (1, 1))
+
+        with self.assertNumQueries(1):
+            # The count itself is one primary key read; the token is cached by now.
+            self.business_client.get(f'/api/order-count/{self.business.pk}/')
+
+    def test_reconcile_repairs_drift(self):
+        # A plain ORM create bypasses the order serializers that maintain the counters.
+        Orders.objects.create(customer_user=self.customer, business_user=self.business, offer_detail=self.detail)
+        BusinessOrderStats.objects.create(business_user=self.business, in_progress=7, completed=2)
+        out = io.StringIO()
+        call_command('reconcile_order_stats', stdout=out)
+        self.assertIn('in_progress 7 -> 1', out.getvalue())
+        self.assertEqual(self.counts(), (1, 0))
+
+
+class OrderListTests(TestCase):
+    """GET /api/orders/ is paginated, newest first, and can be streamed as NDJSON."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.customer = create_user('customer', 'customer')
+        self.other = create_user('other', 'customer')
+        detail = create_detail(create_offer(self.business))
+        self.orders = Orders.objects.bulk_create([
+            Orders(customer_user=self.customer, business_user=self.business, offer_detail=detail) for _ in range(5)
+        ])
+        # created_at is auto_now_add; make the first order the newest.
+        for i, order in enumerate(self.orders):
+            Orders.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(minutes=i))
+        Orders.objects.create(customer_user=self.other, business_user=self.business, offer_detail=detail)
+        self.client = client_for(self.customer)
+
+    def test_pages_newest_first(self):
+        data = self.client.get('/api/orders/', {'page_size': 2, 'page': 2}).json()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual([row['id'] for row in data['results']], [self.orders[2].pk, self.orders[3].pk])
+        self.assertIsNotNone(data['next'])
+
+        data = self.client.get('/api/orders/', {'pagination': 'cursor', 'page_size': 3}).json()
+        self.assertEqual([row['id'] for row in data['results']], [o.pk for o in self.orders[:3]])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([row['id'] for row in data['results']], [o.pk for o in self.orders[3:]])
+
+    def test_stream(self):
+        response = self.client.get('/api/orders/', {'stream': '1'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [o.pk for o in self.orders])
+        self.assertEqual(rows[0], self.client.get('/api/orders/', {'page_size': 1}).json()['results'][0])
+
+
+class OrderStatusTests(TestCase):
+    """Order state machine, bulk status changes, event log and the business dashboard."""
+
+    def setUp(self):
+        self.business = create_user('business', 'business')
+        self.other_business = create_user('other', 'business')
+        self.customer = create_user('customer', 'customer')
+        self.detail = create_detail(create_offer(self.business))
+        self.other_detail = create_detail(create_offer(self.other_business, title='Other'))
+        self.customer_client = client_for(self.customer)
+        self.business_client = client_for(self.business)
+
+    def place_order(self, detail=None, hours_ago=0):
+        response = self.customer_client.post('/api/orders/', {'offer_detail_id': (detail or self.detail).id}, format='json')
+        self.assertEqual(response.status_code, 201)
+        order_id = response.json()['id']
+        Orders.objects.filter(pk=order_id).update(created_at=timezone.now() - timedelta(hours=hours_ago))
+        return order_id
+
+    def stats(self):
+        return BusinessOrderStats.objects.get(business_user=self.business)
+
+    def test_can_transition(self):
+        Status = Orders.Status
+        self.assertTrue(Orders.can_transition(Status.in_progress, Status.completed))
+        self.assertTrue(Orders.can_transition(Status.in_progress, Status.canceled))
+        self.assertFalse(Orders.can_transition(Status.completed, Status.in_progress))
+        self.assertFalse(Orders.can_transition(Status.completed, Status.canceled))
+        self.assertFalse(Orders.can_transition(Status.canceled, Status.completed))
+
+    def test_patch_records_event_and_rejects_closed_order(self):
+        order_id = self.place_order(hours_ago=5)
+        response = self.business_client.patch(f'/api/orders/{order_id}/', {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'completed')
+
+        event = OrderEvent.objects.get(order_id=order_id)
+        self.assertEqual((event.from_status, event.to_status), ('in_progress', 'completed'))
+        self.assertAlmostEqual(event.duration, 5 * 3600, delta=60)
+
+        for target in ('in_progress', 'canceled'):
+            response = self.business_client.patch(f'/api/orders/{order_id}/', {'status': target}, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(Orders.objects.get(pk=order_id).status, 'completed')
+        self.assertEqual(OrderEvent.objects.filter(order_id=order_id).count(), 1)
+
+    def test_bulk_status_results(self):
+        updated = self.place_order()
+        unchanged = self.place_order()
+        closed = self.place_order()
+        Orders.bulk_set_status(self.business.id, [unchanged], 'canceled')
+        Orders.bulk_set_status(self.business.id, [closed], 'completed')
+        foreign = self.place_order(detail=self.other_detail)
+
+        with self.assertNumQueries(7):
+            # Token lookup, savepoint, one ownership read, one UPDATE, one
+            # event insert, one counter UPDATE, release.
+            response = self.business_client.post('/api/orders/bulk-status/', {
+                'ids': [updated, unchanged, closed, foreign, 999999, updated], 'status': 'canceled',
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertEqual(
+            {row['id']: row['result'] for row in response.json()['results']},
+            {updated: 'updated', unchanged: 'unchanged', closed: 'invalid_transition', foreign: 'forbidden', 999999: 'not_found'},
+        )
+        self.assertEqual(Orders.objects.get(pk=foreign).status, 'in_progress')
+        self.assertEqual(Orders.objects.get(pk=closed).status, 'completed')
+        stats = self.stats()
+        self.assertEqual((stats.in_progress, stats.completed, stats.canceled), (0, 1, 2))
+
+    def test_bulk_status_requires_business_user(self):
+        order_id = self.place_order()
+        response = self.customer_client.post('/api/orders/bulk-status/', {'ids': [order_id], 'status': 'canceled'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_dashboard(self):
+        ids = [self.place_order(hours_ago=hours) for hours in (3, 6, 30)]
+        canceled = self.place_order()
+        Orders.bulk_set_status(self.business.id, ids, 'completed')
+        Orders.bulk_set_status(self.business.id, [canceled], 'canceled')
+        self.place_order()
+
+        with self.assertNumQueries(2):
+            response = self.business_client.get('/api/business-dashboard/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['in_progress'], data['completed'], data['canceled']), (1, 3, 1))
+        self.assertEqual(data['cancellation_rate'], 0.25)
+        self.assertAlmostEqual(data['average_time_to_complete'], 13 * 3600, delta=60)
+        # The median (6h) falls into the 4h-8h bucket.
+        self.assertTrue(4 * 3600 <= data['median_time_to_complete'] <= 8 * 3600)
+        self.assertEqual(sum(bucket['count'] for bucket in data['time_to_complete_histogram']), 3)
+
+        self.assertEqual(self.customer_client.get('/api/business-dashboard/').status_code, 403)
+
+    def test_deleting_completed_order_leaves_histogram(self):
+        ids = [self.place_order(hours_ago=hours) for hours in (3, 6)]
+        Orders.bulk_set_status(self.business.id, ids, 'completed')
+        Orders.objects.get(pk=ids[0]).delete()
+        stats = self.stats()
+        self.assertEqual(stats.completed, 1)
+        self.assertEqual(sum(stats.completion_histogram), 1)
+        self.assertAlmostEqual(stats.completion_time_sum, 6 * 3600, delta=60)
+
+        # The deleted order's event is kept, detached, and reconciling agrees with the counters.
+        self.assertEqual(OrderEvent.objects.filter(order__isnull=True).count(), 1)
+        self.assertEqual(OrderEvent.objects.count(), 2)
+        out = io.StringIO()
+        call_command('reconcile_order_stats', '--dry-run', stdout=out)
+        self.assertIn('0 businesses drifted', out.getvalue())
+
+
+class OneRequestThrottle(UserRateThrottle):
+    rate = '1/min'
+
+
+class AsyncViewTests(TestCase):
+    """
+    The async handlers behind ASYNC_API_VIEWS answer like the DRF views.
+
+    Every request is sent through the async dispatcher (AsyncClient) and to
+    the DRF view it wraps (`sync_view`); status, body and validators must
+    match.
+    """
+
+    def setUp(self):
+        override = override_settings(ASYNC_API_VIEWS=True)
+        override.enable()
+        self.addCleanup(reload_urls)
+        self.addCleanup(override.disable)
+        reload_urls()
+        cache.clear()
+        self.business = create_user('business', 'business')
+        self.customer = create_user('customer', 'customer')
+        self.token = Token.objects.create(user=self.customer).key
+        for i in range(3):
+            offer = create_offer(self.business, title=f'Offer {i}')
+            self.detail = create_detail(offer, price=10 + i)
+            offer.apply_minimums([self.detail])
+            offer.save()
+
+    def get_both(self, path, data=None, token=True, **headers):
+        if token:
+            headers['Authorization'] = f'Token {self.token}'
+        native = async_to_sync(self.async_client.get)(path, data, headers=headers)
+        match = resolve(path)
+        sync = match.func.sync_view(RequestFactory().get(path, data, headers=headers), *match.args, **match.kwargs)
+        if hasattr(sync, 'render'):
+            sync.render()
+        self.assertEqual(native.status_code, sync.status_code, path)
+        if sync.content:
+            self.assertEqual(json.loads(native.content), json.loads(sync.content), path)
+        for header in ('ETag', 'WWW-Authenticate', 'Retry-After'):
+            self.assertEqual(native.get(header), sync.get(header), f'{path} {header}')
+        return native
+
+    def test_urls_use_the_async_handlers(self):
+        self.assertIs(resolve('/api/offers/').func, async_views.offer_list_view)
+        self.assertIs(resolve(f'/api/offerdetails/{self.detail.pk}/').func, async_views.offer_detail_retrieve_view)
+        self.assertIs(resolve('/api/base-info/').func, async_views.base_info_view)
+
+    def test_authentication_and_not_found(self):
+        self.assertEqual(self.get_both(f'/api/offerdetails/{self.detail.pk}/', token=False).status_code, 401)
+        self.assertEqual(self.get_both('/api/offerdetails/999999/').status_code, 404)
+        self.assertEqual(self.get_both(f'/api/order-count/{self.business.pk}/').json(), {'order_count': 0})
+        self.assertEqual(self.get_both(f'/api/order-count/{self.customer.pk}/').status_code, 404)
+        self.assertEqual(self.get_both(f'/api/completed-order-count/{self.business.pk}/', token=False).status_code, 401)
+
+    def test_etag_not_modified(self):
+        for path in (f'/api/offerdetails/{self.detail.pk}/', '/api/base-info/'):
+            etag = self.get_both(path)['ETag']
+            self.assertEqual(self.get_both(path, **{'If-None-Match': etag}).status_code, 304)
+
+    def test_pagination(self):
+        data = self.get_both('/api/offers/', {'page_size': 2, 'page': 2, 'ordering': 'min_price'}).json()
+        self.assertEqual((data['count'], len(data['results'])), (3, 1))
+        self.assertEqual(self.get_both('/api/offers/', {'page_size': 2, 'page': 5, 'ordering': 'min_price'}).status_code, 404)
+        # Cursor requests are served by the DRF view in both cases.
+        self.assertEqual(self.get_both('/api/offers/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_browsable_api_requests_go_to_the_drf_view(self):
+        response = async_to_sync(self.async_client.get)('/api/base-info/', headers={'Accept': 'text/html'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+    def test_throttles_of_the_sync_view_apply(self):
+        path = f'/api/offerdetails/{self.detail.pk}/'
+        with mock.patch.object(OfferDetailRetrieveView, 'throttle_classes', [OneRequestThrottle]):
+            native = async_to_sync(self.async_client.get)(path, headers={'Authorization': f'Token {self.token}'})
+            self.assertEqual(native.status_code, 200)
+            native = async_to_sync(self.async_client.get)(path, headers={'Authorization': f'Token {self.token}'})
+            self.assertEqual(native.status_code, 429)
+            self.assertIn('Retry-After', native)
 
-# Create your tests here.
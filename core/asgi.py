@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Serve the read-heavy endpoints with their async-native handlers (see settings.ASYNC_API_VIEWS).
+os.environ.setdefault('ASYNC_API_VIEWS', '1')
 
 application = get_asgi_application()
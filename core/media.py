@@ -0,0 +1,165 @@
+"""
+Media file serving with conditional requests, byte ranges and long-lived caching.
+
+`serve_media` replaces django.conf.urls.static.static for MEDIA_URL:
+
+    - ETag (size and mtime) and Last-Modified validators, answered with
+      304 Not Modified for If-None-Match / If-Modified-Since.
+    - Single byte ranges (`Range: bytes=...`, honouring If-Range) answered
+      with 206 Partial Content, 416 when the range is unsatisfiable.
+    - Files stored under content-hashed names (core.storage) are sent with
+      `Cache-Control: public, max-age=31536000, immutable`; everything else
+      must be revalidated.
+
+MEDIA_SERVE_MODE selects how the bytes are sent:
+
+    - 'django': FileResponse. Whole files go through the WSGI server's
+      wsgi.file_wrapper, which uses sendfile() where available; ranges are
+      streamed in blocks.
+    - 'x-sendfile': an empty response with an X-Sendfile header holding the
+      absolute path (Apache mod_xsendfile, lighttpd).
+    - 'x-accel': an empty response with X-Accel-Redirect set to
+      MEDIA_ACCEL_REDIRECT_PREFIX + path (nginx `internal` location).
+
+In the two offload modes the front server handles Range itself; the
+validators and Cache-Control set here are passed through.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+from core.storage import is_hashed_name
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RangeReader:
+    """File-like object returning `length` bytes of `file` starting at `start`."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) (inclusive) for a single satisfiable byte range,
+    None when the header is absent, malformed or asks for several ranges
+    (the whole file is sent then), or False when it is unsatisfiable.
+    """
+    match = RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if size == 0:
+        # An empty file has no satisfiable byte range.
+        return False
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _cache_headers(response, path, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    if is_hashed_name(path):
+        response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve the file at `path` below MEDIA_ROOT (GET and HEAD only)."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(fullpath)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404('File not found.')
+    if not os.path.isfile(fullpath):
+        raise Http404('File not found.')
+
+    size, last_modified = stat.st_size, int(stat.st_mtime)
+    etag = quote_etag(f'{size:x}-{stat.st_mtime_ns:x}')
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _cache_headers(not_modified, path, etag, last_modified)
+
+    content_type, encoding = mimetypes.guess_type(path)
+    content_type = content_type or 'application/octet-stream'
+
+    mode = _setting('MEDIA_SERVE_MODE', 'django')
+    if mode in ('x-sendfile', 'x-accel'):
+        response = HttpResponse(content_type=content_type)
+        if mode == 'x-sendfile':
+            response['X-Sendfile'] = fullpath
+        else:
+            response['X-Accel-Redirect'] = _setting('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/') + path
+        return _cache_headers(response, path, etag, last_modified)
+
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.headers.get('Range'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return _cache_headers(response, path, etag, last_modified)
+
+    if byte_range is None:
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(RangeReader(open(fullpath, 'rb'), start, end - start + 1), content_type=content_type, status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return _cache_headers(response, path, etag, last_modified)
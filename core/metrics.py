@@ -0,0 +1,268 @@
+"""
+Per-endpoint request metrics: query count, DB time, app time and latency.
+
+RequestMetricsMiddleware times every request and, through a database
+`execute_wrapper`, counts the queries it runs and the time spent in them.
+The samples are folded into in-process histograms labelled with the
+resolved URL name (e.g. `offer-list`, `order-list-create`) and the HTTP
+method:
+
+    - coder_request_duration_seconds: total latency;
+    - coder_request_db_queries: number of queries;
+    - coder_request_db_duration_seconds: time spent executing queries;
+    - coder_request_app_duration_seconds: everything else (view code,
+      serializers, rendering, middleware). Serializer time is not split
+      out: DRF evaluates `serializer.data` inside the view, so it could
+      only be measured by instrumenting every serializer class.
+
+Requests above REQUEST_METRICS_QUERY_THRESHOLD queries or
+REQUEST_METRICS_LATENCY_THRESHOLD seconds are logged as warnings on the
+`core.metrics` logger, which is the quickest way to spot an N+1.
+
+MetricsView serves the histograms in the Prometheus text format to admin
+users. Histograms live in process memory, so each worker process reports
+its own; scrape every process or aggregate on the Prometheus side.
+
+Recording a request costs a few perf_counter() calls, one wrapper call per
+query and a bisect per histogram under a lock, so the middleware can stay
+enabled in production. Set REQUEST_METRICS_ENABLED = False to remove it.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+UNRESOLVED = '<unresolved>'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense (not thread-safe on its own)."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound, cumulative count) pairs, ending with '+Inf'."""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricFamily:
+    """A named histogram metric with one Histogram per label set."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.histograms = {}
+
+    def observe(self, labels, value):
+        histogram = self.histograms.get(labels)
+        if histogram is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+class MetricsRegistry:
+    """Process-wide set of request histograms, guarded by one lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.duration = MetricFamily(
+                'coder_request_duration_seconds', 'Total request latency.', SECONDS_BUCKETS)
+            self.queries = MetricFamily(
+                'coder_request_db_queries', 'Database queries per request.', QUERY_BUCKETS)
+            self.db_duration = MetricFamily(
+                'coder_request_db_duration_seconds', 'Time spent executing database queries.', SECONDS_BUCKETS)
+            self.app_duration = MetricFamily(
+                'coder_request_app_duration_seconds',
+                'Time spent outside the database (views, serializers, rendering, middleware).', SECONDS_BUCKETS)
+            self.families = [self.duration, self.queries, self.db_duration, self.app_duration]
+
+    def record(self, view, method, queries, db_time, total):
+        labels = (('view', view), ('method', method))
+        with self.lock:
+            self.duration.observe(labels, total)
+            self.queries.observe(labels, queries)
+            self.db_duration.observe(labels, db_time)
+            self.app_duration.observe(labels, max(total - db_time, 0))
+
+    def render(self):
+        """Return all histograms in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for family in self.families:
+                lines.append(f'# HELP {family.name} {family.help_text}')
+                lines.append(f'# TYPE {family.name} histogram')
+                for labels, histogram in sorted(family.histograms.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{family.name}_bucket{_label_text(labels, le=bound)} {count}')
+                    lines.append(f'{family.name}_sum{_label_text(labels)} {histogram.sum}')
+                    lines.append(f'{family.name}_count{_label_text(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+current_sample = ContextVar('request_metrics_sample', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute_wrapper that charges each query to the current request.
+
+    Installed once per connection object. The request sample lives in a
+    ContextVar, which sync_to_async copies into its worker threads, so
+    queries of async views run through the async ORM are counted as well.
+    """
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.db_time += time.perf_counter() - start
+        sample.queries += 1
+
+
+def install_query_recorder(connection, **kwargs):
+    # Outermost, so execute_wrapper() blocks entered later still pop their own wrapper.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class RequestSample:
+    """Query count and timings of one request."""
+
+    __slots__ = ('start', 'queries', 'db_time')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+
+    def finish(self, request, response):
+        total = time.perf_counter() - self.start
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or UNRESOLVED
+        registry.record(view, request.method, self.queries, self.db_time, total)
+
+        query_threshold = _setting('REQUEST_METRICS_QUERY_THRESHOLD', 50)
+        latency_threshold = _setting('REQUEST_METRICS_LATENCY_THRESHOLD', 1.0)
+        if (query_threshold is not None and self.queries > query_threshold) or \
+                (latency_threshold is not None and total > latency_threshold):
+            logger.warning(
+                '%s %s (%s): %d queries, %.1f ms in the database, %.1f ms total',
+                request.method, request.path, view, self.queries, self.db_time * 1000, total * 1000,
+            )
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, DB time, app time and latency per URL name.
+
+    Purpose:
+        - Makes N+1 queries and slow endpoints visible per endpoint.
+
+    Behavior:
+        - Works for sync and async views without a thread hop: async
+          requests are awaited directly.
+        - `record_query` is installed on every database connection when it
+          is opened (connection_created), plus on those already open.
+        - Should be listed first in MIDDLEWARE so the latency covers the
+          whole middleware stack.
+        - Raises MiddlewareNotUsed when REQUEST_METRICS_ENABLED is False.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not _setting('REQUEST_METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_recorder, dispatch_uid='core.metrics')
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        sample.finish(request, response)
+        return response
+
+    async def __acall__(self, request):
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        sample.finish(request, response)
+        return response
+
+
+class MetricsView(APIView):
+    """
+    Expose the request histograms in the Prometheus text format.
+
+    Permissions:
+        - Admin users only (is_staff); scrape with an admin's token.
+
+    Behavior:
+        - GET: Returns this process's histograms as text/plain.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,220 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Keyset pagination filters on the last row seen instead of using OFFSET,
+so every page costs the same no matter how deep the client scrolls. It
+is opt-in: a request switches to it with `?pagination=cursor` (first page)
+or by following a `cursor` link; all other requests are handled by
+`fallback_class`, or left unpaginated when no fallback is set.
+
+AsyncPageNumberMixin adds an async variant of page-number pagination for
+the async-native views in coder_app.api.async_views.
+"""
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from rest_framework import exceptions
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset pagination over a single sort key plus the primary key as tiebreaker.
+
+    Configuration:
+        - orderings: Allowed sort keys in `?ordering=` syntax (e.g. '-updated_at',
+          'min_price'). The first entry is the default; any other value is
+          rejected with 400. The primary key is always added as tiebreaker
+          in the same direction; NULL keys sort last.
+        - fallback_class: Paginator used when cursor mode is not requested.
+        - page_size / page_size_query_param / max_page_size: Page size limits.
+
+    Response:
+        - next / previous: Cursor links.
+        - results: The page.
+        - count: Only included when `?count=true` is passed, since an exact
+          count is what keyset pagination exists to avoid.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    ordering_query_param = 'ordering'
+    count_query_param = 'count'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    orderings = ['-id']
+    fallback_class = None
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.fallback = None
+
+    def is_cursor_mode(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or params.get(self.mode_query_param) == 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_cursor_mode(request):
+            if self.fallback_class is None:
+                return None
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.fallback = None
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        self.key, self.descending = self.ordering.lstrip('-'), self.ordering.startswith('-')
+
+        cursor = self.decode_cursor(request)
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        if cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = cursor['reverse'], cursor['position']
+
+        queryset = queryset.order_by(*self.order_expressions(reverse))
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.position_filter(position, reverse))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, request):
+        requested = request.query_params.get(self.ordering_query_param)
+        if not requested:
+            return self.orderings[0]
+        if requested not in self.orderings:
+            raise exceptions.ValidationError({
+                self.ordering_query_param: [
+                    f'Unsupported ordering for cursor pagination. Use one of: {", ".join(self.orderings)}.'
+                ],
+            })
+        return requested
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def order_expressions(self, reverse):
+        descending = self.descending != reverse
+        # NULL keys come last in the forward order, hence first when reversed.
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        if descending:
+            return [F(self.key).desc(**nulls), F('pk').desc()]
+        return [F(self.key).asc(**nulls), F('pk').asc()]
+
+    def position_filter(self, position, reverse):
+        """
+        Rows strictly after `position` in the requested direction, where the
+        forward order is (key, id) with NULL keys last.
+        """
+        value, last_id = position
+        descending = self.descending != reverse
+        key_op = 'lt' if descending else 'gt'
+        id_q = Q(**{f'pk__{key_op}': last_id})
+        null_key = Q(**{f'{self.key}__isnull': True})
+
+        if not reverse:
+            if value is None:
+                return null_key & id_q
+            return Q(**{f'{self.key}__{key_op}': value}) | (Q(**{self.key: value}) & id_q) | null_key
+        if value is None:
+            return ~null_key | (null_key & id_q)
+        return Q(**{f'{self.key}__{key_op}': value}) | (Q(**{self.key: value}) & id_q)
+
+    def encode_cursor(self, row, reverse):
+        value = getattr(row, self.key)
+        if value is not None and not isinstance(value, (int, float, str)):
+            value = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        raw = json.dumps({'p': [value, row.pk], 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            data = json.loads(raw)
+            value, last_id = data['p']
+            return {'position': (value, int(last_id)), 'reverse': bool(data.get('r'))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class AsyncPageNumberMixin:
+    """
+    Mixin for PageNumberPagination subclasses adding apaginate_queryset().
+
+    Same parameters, errors and response as paginate_queryset(), but the
+    count and the page rows are fetched with the async ORM, so it can be
+    awaited from an async view. get_paginated_response() works unchanged
+    afterwards.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property; fill it in so page() needs no query.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        self.page.object_list = [row async for row in self.page.object_list]
+        return self.page.object_list
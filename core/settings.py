@@ -45,10 +45,12 @@ INSTALLED_APPS = [
     'django_filters',
      'auth_app',
      'coder_app',
-     'profile_app'
+     'profile_app',
+     'jobs_app'
 ]
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -93,6 +95,23 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
+# PBKDF2 iterations are tunable through PASSWORD_PBKDF2_ITERATIONS; hashes
+# with another count are upgraded on the next successful login.
+PASSWORD_HASHERS = [
+    'auth_app.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = 1_000_000
+
+# Login password checks run on a pool of PASSWORD_HASH_WORKERS threads
+# (None: one per CPU core); more than PASSWORD_HASH_MAX_PENDING concurrent
+# checks are answered with 429 (see auth_app/hashers.py).
+PASSWORD_HASH_WORKERS = None
+PASSWORD_HASH_MAX_PENDING = 64
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -131,11 +150,86 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication'
+        'auth_app.authentication.CachingTokenAuthentication'
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 
 
 }
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Platform statistics for /api/base-info/ (see coder_app/stats.py).
+# Signals keep the cached values current; the TTL bounds drift from writes
+# they cannot see. Configure a shared CACHES backend when running several
+# processes so all of them see the same entry.
+PLATFORM_STATS_TTL = 300
+BASE_INFO_MAX_AGE = 60
+
+# Offer search backend (see coder_app/search.py): 'auto', 'sqlite_fts',
+# 'postgres' or 'simple'. 'auto' picks the full-text index of the active
+# database and falls back to icontains matching when it is missing.
+OFFER_SEARCH_BACKEND = 'auto'
+
+# Lifetime of cached GET /api/offers/<pk>/ and /api/offerdetails/<pk>/
+# responses (see coder_app/response_cache.py). Signals invalidate them on
+# writes; the TTL only bounds staleness from writes that bypass signals.
+OFFER_RESPONSE_CACHE_TTL = 600
+
+# Weight of the business rating (0-10) in the offer popularity score, which
+# is order_count + weight * rating. Changing it requires
+# `manage.py rebuild_offer_scores`.
+OFFER_POPULARITY_RATING_WEIGHT = 10
+
+# Token authentication cache (see auth_app/authentication.py). The local TTL
+# bounds how long another process may keep accepting a revoked token; set
+# AUTH_TOKEN_CACHE_ALIAS to a shared CACHES alias to add the shared tier.
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_LOCAL_TTL = 30
+AUTH_TOKEN_SHARED_TTL = 60
+AUTH_TOKEN_CACHE_ALIAS = None
+
+# Serve the read-heavy GET endpoints (offer list, offer detail, order counts,
+# base info) with the async-native handlers in coder_app/api/async_views.py.
+# Worth it under ASGI only; under WSGI (runserver, core/wsgi.py) every async
+# view pays for an event loop per request. Off by default; core/asgi.py
+# turns it on through the ASYNC_API_VIEWS environment variable.
+ASYNC_API_VIEWS = os.environ.get('ASYNC_API_VIEWS', '0') == '1'
+
+# Request metrics (see core/metrics.py). Requests running more queries or
+# taking longer (seconds) than these thresholds are logged as warnings; set
+# a threshold to None to disable it.
+REQUEST_METRICS_ENABLED = True
+REQUEST_METRICS_QUERY_THRESHOLD = 50
+REQUEST_METRICS_LATENCY_THRESHOLD = 1.0
+
+# Thumbnails of Offers.image and Profile.file uploads (see core/thumbnails.py).
+# Needs Pillow; without it no derivatives are generated. Each size is a
+# (width, height) box the image is cropped to, written in every format.
+THUMBNAIL_SIZES = {'thumb': (320, 240), 'card': (960, 720)}
+THUMBNAIL_FORMATS = ('webp', 'jpeg')
+THUMBNAIL_QUALITY = 80
+
+# How MEDIA_URL files are sent (see core/media.py): 'django' streams them
+# from the process (sendfile via wsgi.file_wrapper where available),
+# 'x-sendfile' hands the absolute path to Apache/lighttpd, 'x-accel' hands
+# MEDIA_ACCEL_REDIRECT_PREFIX + path to an nginx `internal` location.
+MEDIA_SERVE_MODE = 'django'
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Whether Django routes MEDIA_URL at all. Off outside DEBUG, where the front
+# server or a CDN serves uploads; turn it on in production only for the
+# offload modes above. Never routed when MEDIA_URL is an absolute URL.
+SERVE_MEDIA = DEBUG
+
+# Background jobs (see jobs_app/queue.py), run by `manage.py runworker`.
+# A failing job is retried up to JOBS_MAX_ATTEMPTS times, waiting
+# JOBS_RETRY_BACKOFF * 2**(attempt - 1) seconds (at most
+# JOBS_RETRY_BACKOFF_MAX) in between. Jobs running longer than
+# JOBS_LOCK_TIMEOUT seconds are assumed lost with their worker and requeued.
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 3600
+JOBS_LOCK_TIMEOUT = 600
+JOBS_WORKER_THREADS = 2
+JOBS_POLL_INTERVAL = 1.0
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Content-hashed file storage for user uploads.
+
+ContentHashedStorage stores every file under a name that embeds the first
+12 hex digits of the SHA-256 of its content, e.g. 'Offers/logo.png' is
+saved as 'Offers/logo.3f2a9c1b7d4e.png'. A name therefore never points to
+different bytes, which lets core.media serve such files with a one-year
+`immutable` Cache-Control and lets CDNs keep them forever.
+
+Uploading identical content again reuses the existing file instead of
+writing a copy.
+"""
+import hashlib
+import os
+import re
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_LENGTH = 12
+HASHED_NAME = re.compile(r'\.[0-9a-f]{%d}(\.[^./]+)?$' % HASH_LENGTH)
+
+
+def is_hashed_name(name):
+    """True for names produced by ContentHashedStorage."""
+    return HASHED_NAME.search(os.path.basename(name)) is not None
+
+
+@deconstructible
+class ContentHashedStorage(FileSystemStorage):
+    """FileSystemStorage that names files after a hash of their content."""
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        root, ext = os.path.splitext(name)
+        return f'{root}.{digest.hexdigest()[:HASH_LENGTH]}{ext}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            from django.core.files import File
+            content = File(content, name)
+        name = self.hashed_name(self.generate_filename(name), content)
+        if self.exists(name):
+            # Same name, same bytes: nothing to write.
+            return name
+        return super().save(name, content, max_length=max_length)
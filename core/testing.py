@@ -0,0 +1,79 @@
+"""
+Fixture factories and assertions shared by the apps' tests.
+
+Kept out of the apps' tests.py modules so that no app's tests import
+another app's test module.
+"""
+import importlib
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from auth_app.models import User
+from coder_app.models import Offers, OfferDetails
+from profile_app.models import Profile
+
+
+def reload_urls():
+    """Rebuild the URLconf after overriding a setting it reads at import time."""
+    import coder_app.api.urls
+    import core.urls
+    importlib.reload(coder_app.api.urls)
+    importlib.reload(core.urls)
+    clear_url_caches()
+
+
+def create_user(username, user_type, password='pass', email=''):
+    """A user of `user_type` with a profile named after it."""
+    user = User.objects.create_user(username=username, password=password, type=user_type, email=email)
+    Profile.objects.create(user=user, first_name=username)
+    return user
+
+
+def client_for(user):
+    """An APIClient authenticated with a new token of `user`."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+    return client
+
+
+def create_offer(user, title='Offer', image=None, description='Description'):
+    return Offers.objects.create(user=user, title=title, image=image, description=description)
+
+
+def create_detail(offer, offer_type='basic', price=10, delivery_time=1):
+    return OfferDetails.objects.create(
+        offer=offer, revisions=1, title=offer_type, delivery_time=delivery_time, price=price,
+        features=['a'], offer_type=offer_type,
+    )
+
+
+class ListQueryCountTestCase(TestCase):
+    """
+    Base class for N+1 regression tests of list endpoints.
+
+    `assertQueriesConstant` renders an endpoint with 1, 10 and 100 rows and
+    fails if the query count changes with the number of rows, which is what
+    a serializer field reaching into an unjoined relation looks like.
+    """
+    sizes = (1, 10, 100)
+
+    def assertQueriesConstant(self, get, fill):
+        """
+        `fill(n)` makes the endpoint return n rows (the sizes only grow);
+        `get()` requests it. A warm-up request first primes per-process
+        caches such as the token authentication cache.
+        """
+        get()
+        counts = {}
+        for size in self.sizes:
+            fill(size)
+            with CaptureQueriesContext(connection) as queries:
+                response = get()
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(len(data['results'] if isinstance(data, dict) else data), size)
+            counts[size] = len(queries)
+        self.assertEqual(len(set(counts.values())), 1, f'Query count grows with the number of rows: {counts}')
@@ -0,0 +1,133 @@
+import os
+import re
+import shutil
+import tempfile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from auth_app.models import User
+from core.media import parse_range
+from core.metrics import Histogram, registry
+from core.testing import client_for, reload_urls
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_satisfiable_ranges(self):
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=90-500', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+
+    def test_ignored_headers_send_the_whole_file(self):
+        for header in (None, '', 'bytes=-', 'bytes=9-0', 'bytes=0-1,5-6', 'items=0-1'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 100))
+
+    def test_unsatisfiable_ranges(self):
+        for header, size in (('bytes=100-', 100), ('bytes=-0', 100), ('bytes=0-', 0), ('bytes=-10', 0)):
+            with self.subTest(header=header, size=size):
+                self.assertIs(parse_range(header, size), False)
+
+
+class ServeMediaTests(SimpleTestCase):
+    """Conditional and range requests against files below MEDIA_ROOT."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root, MEDIA_SERVE_MODE='django', SERVE_MEDIA=True)
+        override.enable()
+        self.addCleanup(reload_urls)
+        self.addCleanup(override.disable)
+        reload_urls()
+        with open(os.path.join(media_root, 'file.txt'), 'wb') as file:
+            file.write(b'0123456789')
+        open(os.path.join(media_root, 'empty.txt'), 'wb').close()
+
+    def test_full_response_has_validators(self):
+        response = self.client.get('/media/file.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=0, must-revalidate')
+        self.assertIn('ETag', response)
+
+    def test_range_request_returns_206(self):
+        response = self.client.get('/media/file.txt', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(response['Content-Length'], '4')
+
+    def test_stale_if_range_returns_whole_file(self):
+        response = self.client.get('/media/file.txt', HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get('/media/file.txt')['ETag']
+        response = self.client.get('/media/file.txt', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_route_follows_serve_media_and_media_url(self):
+        for overrides in ({'SERVE_MEDIA': False}, {'MEDIA_URL': 'https://cdn.example.com/media/'}):
+            with self.subTest(**overrides), override_settings(**overrides):
+                reload_urls()
+                self.assertEqual(self.client.get('/media/file.txt').status_code, 404)
+        reload_urls()
+        self.assertEqual(self.client.get('/media/file.txt').status_code, 200)
+
+    def test_unsatisfiable_range_returns_416(self):
+        for path, header, size in (('file.txt', 'bytes=10-', 10), ('empty.txt', 'bytes=-5', 0)):
+            with self.subTest(path=path):
+                response = self.client.get(f'/media/{path}', HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], f'bytes */{size}')
+
+
+class MetricsTests(TestCase):
+    """RequestMetricsMiddleware samples and their Prometheus rendering."""
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((1, 5, 10))
+        for value in (0, 1, 3, 7, 50):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(1, 2), (5, 3), (10, 4), ('+Inf', 5)])
+        self.assertEqual((histogram.sum, histogram.count), (61, 5))
+
+    def test_app_time_is_total_minus_db_time(self):
+        registry.record('offer-list', 'GET', 3, 0.02, 0.05)
+        registry.record('offer-list', 'GET', 40, 0.3, 0.2)
+        text = registry.render()
+        labels = '{view="offer-list",method="GET"}'
+        self.assertIn(f'coder_request_db_queries_bucket{{view="offer-list",method="GET",le="3"}} 1', text)
+        self.assertIn(f'coder_request_db_queries_bucket{{view="offer-list",method="GET",le="55"}} 2', text)
+        self.assertIn(f'coder_request_db_queries_count{labels} 2', text)
+        app_sum = float(re.search(rf'coder_request_app_duration_seconds_sum{re.escape(labels)} (\S+)', text).group(1))
+        # The second sample's DB time exceeds its total (clock skew); app time is clamped to 0.
+        self.assertAlmostEqual(app_sum, 0.03)
+
+    def test_middleware_records_queries_per_view(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/offers/').status_code, 200)
+        histogram = registry.queries.histograms[(('view', 'offer-list'), ('method', 'GET'))]
+        self.assertEqual(histogram.count, 1)
+        self.assertEqual(histogram.sum, len(queries))
+        db = registry.db_duration.histograms[(('view', 'offer-list'), ('method', 'GET'))].sum
+        total = registry.duration.histograms[(('view', 'offer-list'), ('method', 'GET'))].sum
+        app = registry.app_duration.histograms[(('view', 'offer-list'), ('method', 'GET'))].sum
+        self.assertAlmostEqual(db + app, total)
+
+    def test_metrics_view_requires_admin(self):
+        user = User.objects.create_user(username='user', password='pass')
+        self.assertEqual(client_for(user).get('/metrics/').status_code, 403)
+        admin = User.objects.create_user(username='admin', password='pass', is_staff=True)
+        response = client_for(admin).get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE coder_request_duration_seconds histogram', response.content.decode())
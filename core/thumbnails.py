@@ -0,0 +1,162 @@
+"""
+Thumbnail and derivative images for uploaded pictures.
+
+Offers.image and Profile.file are uploaded at full size. For every new
+upload, fixed-size derivatives (THUMBNAIL_SIZES, each cropped to the exact
+box) are written next to the original in every format of THUMBNAIL_FORMATS,
+e.g. for 'Offers/logo.png':
+
+    Offers/derivatives/logo_thumb.webp
+    Offers/derivatives/logo_thumb.jpeg
+    Offers/derivatives/logo_card.webp
+    ...
+
+Generation runs off the request path as a background job (jobs_app),
+queued in the upload's transaction and run by `manage.py runworker`.
+The derivative names are then stored in a JSON field on the row itself
+(Offers.image_derivatives, Profile.file_derivatives):
+
+    {"source": "Offers/logo.png", "thumb": {"webp": "...", "jpeg": "..."}, ...}
+
+Serializers build the URLs from that field with `derivative_urls`, so list
+responses never touch the filesystem. "source" records the original the
+derivatives belong to; rows whose upload changed in the meantime are left
+alone and picked up by their own generation run.
+
+Storing derivatives bumps the row's `updated_at` (where it has one) and
+sends `derivatives_stored`, so response caches of the row can be dropped.
+
+Pillow is listed in requirements.txt. Without it no derivatives are
+generated and the serializers expose empty thumbnail maps; the
+`check_pillow` system check reports that as an error while
+THUMBNAIL_SIZES is set.
+"""
+import io
+import os
+from django.apps import apps
+from django.conf import settings
+from django.core import checks
+from django.core.files.base import ContentFile
+from django.dispatch import Signal
+from django.utils import timezone
+from jobs_app.queue import enqueue, task
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - reported by check_pillow
+    Image = ImageOps = None
+
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+
+# Sent with sender=<model> and pk after new derivatives were written to a row.
+derivatives_stored = Signal()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def available():
+    return Image is not None
+
+
+def check_pillow(app_configs=None, **kwargs):
+    """System check: thumbnails are configured but cannot be generated."""
+    if _setting('THUMBNAIL_SIZES', {}) and not available():
+        return [checks.Error(
+            'THUMBNAIL_SIZES is set but Pillow is not installed, so no thumbnails will be generated.',
+            hint='Install the requirements (pip install -r requirements.txt) or set THUMBNAIL_SIZES = {}.',
+            id='thumbnails.E001',
+        )]
+    return []
+
+
+def derivative_name(source, size, fmt):
+    directory, filename = os.path.split(source)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'derivatives', f'{stem}_{size}.{fmt}')
+
+
+def render_derivatives(storage, source):
+    """
+    Write every size/format derivative of `source` to `storage` and return
+    the derivatives map for the row's JSON field.
+    """
+    with storage.open(source, 'rb') as original:
+        image = Image.open(original)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    quality = _setting('THUMBNAIL_QUALITY', 80)
+
+    derivatives = {'source': source}
+    for size, box in _setting('THUMBNAIL_SIZES', {}).items():
+        resized = ImageOps.fit(image, tuple(box), Image.Resampling.LANCZOS)
+        names = {}
+        for fmt in _setting('THUMBNAIL_FORMATS', ('webp', 'jpeg')):
+            frame = resized if fmt == 'webp' or resized.mode == 'RGB' else resized.convert('RGB')
+            buffer = io.BytesIO()
+            frame.save(buffer, PIL_FORMATS[fmt], quality=quality)
+            name = derivative_name(source, size, fmt)
+            names[fmt] = storage.save(name, ContentFile(buffer.getvalue()))
+        derivatives[size] = names
+    return derivatives
+
+
+@task
+def generate(model_label, pk, field, derivatives_field, source):
+    """Background job: render the derivatives and store them on the row."""
+    model = apps.get_model(model_label)
+    storage = model._meta.get_field(field).storage
+    store(model, pk, field, derivatives_field, source, render_derivatives(storage, source))
+
+
+def store(model, pk, field, derivatives_field, source, derivatives):
+    """
+    Save `derivatives` on the row if its upload is still `source`, bump its
+    updated_at so conditional-request validators change, and send
+    `derivatives_stored`.
+    """
+    changes = {derivatives_field: derivatives}
+    if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+        changes['updated_at'] = timezone.now()
+    if model._default_manager.filter(pk=pk, **{field: source}).update(**changes):
+        derivatives_stored.send(sender=model, pk=pk)
+
+
+def schedule(instance, field, derivatives_field):
+    """
+    Queue derivative generation for `instance.<field>` with the current
+    transaction, if its derivatives are missing or belong to an older
+    upload. A cleared upload clears its derivatives right away.
+    """
+    source = getattr(instance, field).name
+    if not isinstance(source, str):
+        source = ''
+    current = getattr(instance, derivatives_field) or {}
+    if current.get('source', '') == source:
+        return
+    model = type(instance)
+    if not source:
+        model._default_manager.filter(pk=instance.pk).update(**{derivatives_field: {}})
+        return
+    if not available():
+        return
+    enqueue(generate, model._meta.label, instance.pk, field, derivatives_field, source)
+
+
+def derivative_urls(instance, field, derivatives_field, request=None):
+    """
+    Return {size: {format: url}} for the derivatives stored on `instance`.
+    Only the storage's URL scheme is consulted, never the files themselves.
+    """
+    storage = instance._meta.get_field(field).storage
+    urls = {}
+    for size, names in (getattr(instance, derivatives_field) or {}).items():
+        if size == 'source':
+            continue
+        urls[size] = {}
+        for fmt, name in names.items():
+            url = storage.url(name)
+            urls[size][fmt] = request.build_absolute_uri(url) if request is not None else url
+    return urls
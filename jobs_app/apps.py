@@ -0,0 +1,5 @@
+from django.apps import AppConfig
+
+
+class JobsAppConfig(AppConfig):
+    name = 'jobs_app'
@@ -0,0 +1,80 @@
+import logging
+import os
+import signal
+import socket
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from jobs_app import queue
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Process queued jobs (see jobs_app/queue.py).
+
+    Purpose:
+        - Runs the post-write side effects enqueued by the API (thumbnails,
+          denormalized offer ratings...) outside the request path.
+
+    Behavior:
+        - Starts --threads worker threads (JOBS_WORKER_THREADS by default),
+          each claiming and running one due job at a time and sleeping
+          --poll-interval seconds when the queue is empty.
+        - For more parallelism across processes, start the command several
+          times; workers coordinate through the Job table only.
+        - Requeues jobs left running by dead workers every poll round.
+        - With --once, drains the due jobs and exits instead of polling.
+        - Stops after the running jobs on SIGINT/SIGTERM.
+    """
+    help = 'Run background jobs from the database queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=getattr(settings, 'JOBS_WORKER_THREADS', 2))
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'JOBS_POLL_INTERVAL', 1.0))
+        parser.add_argument('--once', action='store_true', help='Run the due jobs, then exit.')
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        self.poll_interval = options['poll_interval']
+        self.once = options['once']
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stopping.set())
+
+        threads = [
+            threading.Thread(target=self.work, args=(f'{prefix}:{n}',), name=f'jobs-worker-{n}')
+            for n in range(max(options['threads'], 1))
+        ]
+        self.stdout.write(f'Starting {len(threads)} worker threads ({prefix}).')
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # Short joins keep the main thread responsive to signals.
+            while thread.is_alive():
+                thread.join(0.5)
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
+
+    def work(self, worker_id):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    queue.requeue_stale()
+                    job = queue.claim(worker_id)
+                    if job is not None:
+                        queue.run_job(job)
+                except Exception:
+                    # The queue itself is unreachable (e.g. database restart); retry after a pause.
+                    logger.exception('Worker %s could not process the queue', worker_id)
+                    job = None
+                if job is None:
+                    if self.once:
+                        return
+                    self.stopping.wait(self.poll_interval)
+        finally:
+            connections.close_all()
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A queued call of a registered task (see jobs_app/queue.py).
+
+    Fields:
+        - task: Registered task name, by default '<module>.<function>'.
+        - args / kwargs: JSON-serializable arguments of the call.
+        - status: queued (waiting for run_at), running (claimed by a worker)
+          or failed (gave up after max_attempts).
+        - attempts: Number of times a worker has started the job.
+        - max_attempts: Attempts before the job is marked failed.
+        - run_at: Earliest time the job may run; pushed back on each retry.
+        - locked_by / locked_at: Worker that claimed the job and when.
+        - last_error: Traceback of the latest failed attempt.
+        - created_at: Timestamp when the job was enqueued.
+
+    Usage:
+        - Rows are created by `enqueue` and processed by `manage.py runworker`.
+        - Successful jobs are deleted; failed ones stay for inspection in the
+          admin and can be requeued by setting their status back to queued.
+    """
+    class Status(models.TextChoices):
+        queued = 'queued', 'queued'
+        running = 'running', 'running'
+        failed = 'failed', 'failed'
+
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.queued)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Workers poll for the oldest due job of a status.
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task} ({self.status}, attempt {self.attempts}/{self.max_attempts})'
@@ -0,0 +1,154 @@
+"""
+Database-backed job queue for side effects that do not belong on the request path.
+
+Usage:
+
+    from jobs_app.queue import enqueue, task
+
+    @task
+    def send_welcome_mail(user_id):
+        ...
+
+    enqueue(send_welcome_mail, user.pk)
+
+`enqueue` inserts a Job row through the current database connection, so
+inside a transaction the job is committed (and becomes visible to workers)
+together with the write that caused it, and vanishes if that write rolls
+back. That is the on_commit guarantee without the window in which a crash
+after the commit would lose the job.
+
+`manage.py runworker` claims due jobs and runs them on a pool of threads.
+A failing job is retried up to its max_attempts with exponential backoff
+(JOBS_RETRY_BACKOFF * 2**(attempt - 1) seconds, capped at
+JOBS_RETRY_BACKOFF_MAX) and then marked failed. Delivery is at least once:
+a job whose worker died is requeued after JOBS_LOCK_TIMEOUT seconds, so
+tasks must be idempotent.
+
+Arguments are stored as JSON; pass primary keys and labels, not model
+instances. Tests can drain the queue synchronously with `run_pending()`.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+from importlib import import_module
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from jobs_app.models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Register `func` as a task; usable as @task or @task(max_attempts=...)."""
+    def register(func):
+        func.task_name = name or f'{func.__module__}.{func.__qualname__}'
+        func.max_attempts = max_attempts
+        _tasks[func.task_name] = func
+        return func
+    return register(func) if func is not None else register
+
+
+def resolve(name):
+    """Return the task registered as `name`, importing its module if needed."""
+    if name not in _tasks and '.' in name:
+        try:
+            import_module(name.rsplit('.', 1)[0])
+        except ImportError:
+            pass
+    return _tasks.get(name)
+
+
+def enqueue(func, *args, **kwargs):
+    """Queue a call of the task `func` and return the Job."""
+    if getattr(func, 'task_name', None) not in _tasks:
+        raise ValueError(f'{func!r} is not a registered task.')
+    return Job.objects.create(
+        task=func.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=func.max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5),
+    )
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying a job that failed `attempts` times (with jitter)."""
+    delay = min(
+        _setting('JOBS_RETRY_BACKOFF', 10) * 2 ** (attempts - 1),
+        _setting('JOBS_RETRY_BACKOFF_MAX', 3600),
+    )
+    return delay * random.uniform(0.75, 1.0)
+
+
+def claim(worker_id):
+    """
+    Claim the oldest due job for `worker_id` and return it, or None.
+
+    Claiming is a conditional UPDATE on the queued status, so two workers
+    racing for the same row cannot both win; the loser moves on to the
+    next candidate. This works on every backend, SQLite included.
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=Job.Status.queued, run_at__lte=now)
+        .order_by('run_at', 'id').values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.Status.queued).update(
+            status=Job.Status.running, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Run a claimed job, then delete it, schedule a retry or mark it failed."""
+    owned = Job.objects.filter(pk=job.pk, status=Job.Status.running, locked_by=job.locked_by)
+    func = resolve(job.task)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {job.task!r}.')
+        func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if func is None or job.attempts >= job.max_attempts:
+            logger.error('Job %s (%s) failed after %d attempts:\n%s', job.pk, job.task, job.attempts, error)
+            owned.update(status=Job.Status.failed, last_error=error, locked_by='', locked_at=None)
+            return False
+        delay = backoff(job.attempts)
+        logger.warning('Job %s (%s) failed, retrying in %.0f s:\n%s', job.pk, job.task, delay, error)
+        owned.update(
+            status=Job.Status.queued, last_error=error, locked_by='', locked_at=None,
+            run_at=timezone.now() + timedelta(seconds=delay),
+        )
+        return False
+    owned.delete()
+    return True
+
+
+def requeue_stale():
+    """Requeue running jobs whose worker has not finished them within JOBS_LOCK_TIMEOUT."""
+    cutoff = timezone.now() - timedelta(seconds=_setting('JOBS_LOCK_TIMEOUT', 600))
+    return Job.objects.filter(status=Job.Status.running, locked_at__lt=cutoff).update(
+        status=Job.Status.queued, locked_by='', locked_at=None,
+    )
+
+
+def run_pending(worker_id='inline', limit=None):
+    """Run due jobs in the calling thread until none are left; return how many ran."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
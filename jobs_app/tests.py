@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from jobs_app.models import Job
+from jobs_app.queue import claim, enqueue, requeue_stale, run_job, run_pending, task
+
+calls = []
+
+
+@task
+def record_call(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def always_fails():
+    raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_job_runs_and_is_deleted(self):
+        enqueue(record_call, 'a')
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['a'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue_rolls_back_with_the_transaction(self):
+        try:
+            with transaction.atomic():
+                enqueue(record_call, 'a')
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(Job.objects.exists())
+
+    def test_unregistered_function_is_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue(print, 'a')
+
+    @override_settings(JOBS_RETRY_BACKOFF=60)
+    def test_failing_job_is_retried_with_backoff_then_failed(self):
+        job = enqueue(always_fails)
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.queued)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=40))
+        self.assertIn('boom', job.last_error)
+        # Not due yet.
+        self.assertEqual(run_pending(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.failed)
+        self.assertEqual(job.attempts, 2)
+
+    def test_claimed_job_cannot_be_claimed_twice(self):
+        enqueue(record_call, 'a')
+        job = claim('worker-1')
+        self.assertIsNotNone(job)
+        self.assertIsNone(claim('worker-2'))
+        self.assertTrue(run_job(job))
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_stale_running_job_is_requeued(self):
+        enqueue(record_call, 'a')
+        job = claim('worker-1')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['a'])
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from profile_app.models import Profile
 from auth_app.models import User
+from coder_app.models import BusinessRating
+from core import thumbnails
 
 
 class DetailProfileSerializer(serializers.ModelSerializer):
@@ -92,18 +94,31 @@ class BusinessProfileSeralizer(serializers.ModelSerializer):
         - tel: Contact number
         - description: Profile description
         - working_hours: Business working hours
+        - business_rating: Precomputed review aggregates (review_count,
+          average_rating, histogram) from BusinessRating; select_related
+          'user__rating' to avoid a query per profile.
+        - thumbnails: Profile picture thumbnail URLs per size and format, read
+          from Profile.file_derivatives (empty until generated)
     """
 
     user = serializers.SerializerMethodField()
     type = serializers.CharField(source='user.type', read_only=True)
     username = serializers.CharField(source='user.username', read_only=True)
+    business_rating = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'location', 'tel', 'description', 'working_hours', 'type']
+        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'location', 'tel', 'description', 'working_hours', 'type', 'business_rating', 'thumbnails']
 
     def get_user(self, obj):
-        return obj.user.id
+        return obj.user_id
+
+    def get_business_rating(self, obj):
+        return BusinessRating.summary_for(obj.user)
+
+    def get_thumbnails(self, obj):
+        return thumbnails.derivative_urls(obj, 'file', 'file_derivatives', self.context.get('request'))
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -138,7 +153,7 @@ class CustomerProfileSeralizer(serializers.ModelSerializer):
         fields = ['user', 'username', 'first_name', 'last_name', 'file', 'type']
 
     def get_user(self, obj):
-        return obj.user.id
+        return obj.user_id
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
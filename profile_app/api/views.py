@@ -4,6 +4,12 @@ from profile_app.models import Profile
 from auth_app.models import User
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from .permission import IsOwnerOrReadOnly
+from core.pagination import KeysetPagination
+
+
+class ProfileKeysetPagination(KeysetPagination):
+    # Profile lists stay unpaginated unless cursor mode is requested
+    orderings = ['-created_at', 'created_at']
 
 class ProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
@@ -38,10 +44,16 @@ class BusinessDetailView(generics.ListAPIView):
 
     Queryset:
         - Filters profiles where the related user's type is 'business'.
+        - Joins in the user and its BusinessRating for the business_rating field.
+
+    Pagination:
+        Unpaginated by default. `?pagination=cursor` switches to keyset
+        pagination on (created_at, id).
     """
     serializer_class = BusinessProfileSeralizer
     permission_classes = [IsAuthenticated]
-    queryset = Profile.objects.filter(user__type=User.UserType.business)
+    pagination_class = ProfileKeysetPagination
+    queryset = Profile.objects.filter(user__type=User.UserType.business).select_related('user__rating')
 
 class CustomerDetailView(generics.ListAPIView):
     """
@@ -56,8 +68,13 @@ class CustomerDetailView(generics.ListAPIView):
 
     Queryset:
         - Filters profiles where the related user's type is 'customer'.
+        - Joins in the user for the username and type fields.
 
+    Pagination:
+        Unpaginated by default. `?pagination=cursor` switches to keyset
+        pagination on (created_at, id).
     """
     serializer_class = CustomerProfileSeralizer
     permission_classes = [IsAuthenticated]
-    queryset = Profile.objects.filter(user__type=User.UserType.customer)    
+    pagination_class = ProfileKeysetPagination
+    queryset = Profile.objects.filter(user__type=User.UserType.customer).select_related('user')    
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ProfileAppConfig(AppConfig):
     name = 'profile_app'
+
+    def ready(self):
+        from profile_app import signals  # noqa: F401
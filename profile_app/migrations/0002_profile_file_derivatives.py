@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='file_derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:28
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_app', '0002_profile_file_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=core.storage.ContentHashedStorage(), upload_to='profiles/'),
+        ),
+    ]
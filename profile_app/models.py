@@ -1,5 +1,6 @@
 from django.db import models
 from auth_app.models import User
+from core.storage import ContentHashedStorage
 
 
 class Profile(models.Model):
@@ -15,7 +16,9 @@ class Profile(models.Model):
         tel: Optional telephone number.
         description: Optional textual description or bio.
         working_hours: Optional working hours info (for business users).
-        file: Optional profile picture or document upload.
+        file: Optional profile picture or document upload, stored under a
+            content-hashed name (see core/storage.py).
+        file_derivatives: Names of the picture's thumbnails (see core/thumbnails.py).
         created_at: Timestamp for when the profile was created.
 
     Methods:
@@ -28,7 +31,8 @@ class Profile(models.Model):
     tel = models.CharField(max_length=15, blank=True)
     description = models.TextField(blank=True)
     working_hours = models.CharField(max_length=100, blank=True)
-    file = models.FileField(upload_to='profiles/', blank=True, null=True)
+    file = models.FileField(upload_to='profiles/', storage=ContentHashedStorage(), blank=True, null=True)
+    file_derivatives = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     def __str__(self):
         return f"{self.user.username}'s profile"
\ No newline at end of file
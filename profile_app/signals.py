@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from core import thumbnails
+from profile_app.models import Profile
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'file' in update_fields:
+        thumbnails.schedule(instance, 'file', 'file_derivatives')
@@ -1,3 +1,37 @@
-from django.test import TestCase
+from auth_app.models import User
+from profile_app.models import Profile
+from coder_app.models import BusinessRating
+from core.testing import ListQueryCountTestCase, client_for
 
-# Create your tests here.
+
+class ProfileListQueryCountTests(ListQueryCountTestCase):
+    """N+1 regression tests for the business and customer profile lists."""
+
+    def setUp(self):
+        # The viewer has no profile, so it never shows up in the lists.
+        self.client = client_for(User.objects.create_user(username='viewer', password='pass'))
+
+    def fill_profiles(self, user_type):
+        def fill(size):
+            start = Profile.objects.filter(user__type=user_type).count()
+            users = User.objects.bulk_create([
+                User(username=f'{user_type}_{i}', type=user_type) for i in range(start, size)
+            ])
+            Profile.objects.bulk_create([Profile(user=user, first_name=user.username) for user in users])
+            if user_type == User.UserType.business:
+                # Half of the businesses have a rating row, half fall back to the empty summary.
+                BusinessRating.objects.bulk_create([
+                    BusinessRating(business_user=user, review_count=1, rating_sum=8, average_rating=8)
+                    for user in users[::2]
+                ])
+        return fill
+
+    def test_business_profile_list(self):
+        self.assertQueriesConstant(
+            lambda: self.client.get('/api/profiles/business/'), self.fill_profiles(User.UserType.business)
+        )
+
+    def test_customer_profile_list(self):
+        self.assertQueriesConstant(
+            lambda: self.client.get('/api/profiles/customer/'), self.fill_profiles(User.UserType.customer)
+        )